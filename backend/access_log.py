@@ -0,0 +1,166 @@
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+access_logger = logging.getLogger("access")
+
+# Fields handlers attach to the current request's access record (see ``note``)
+_fields: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("access_fields", default=None)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; access records carry their fields in ``record.access``"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        access = getattr(record, "access", None)
+        if access is not None:
+            entry.update(access)
+        else:
+            entry["message"] = record.getMessage()
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Rendered by _Enqueue before the record was queued
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _Enqueue(logging.handlers.QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            # Tracebacks hold frames; render them now, while they are valid
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(level: int = logging.INFO):
+    """Route all logging through a queue drained by a background thread, as JSON lines.
+
+    The request path only enqueues the record; formatting and the write to
+    stderr happen on the listener thread. Like ``logging.basicConfig`` this
+    does nothing when the root logger already has handlers.
+    """
+    global _listener
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    output = logging.StreamHandler()
+    output.setFormatter(JsonFormatter())
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    root.addHandler(_Enqueue(records))
+    root.setLevel(level)
+
+
+def stop_logging():
+    """Flush queued records (call on shutdown)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def note(**fields: Any):
+    """Attach fields (cache outcome, industry, ...) to the current request's access record"""
+    current = _fields.get()
+    if current is not None:
+        current.update(fields)
+
+
+@contextmanager
+def upstream():
+    """Time a call to an upstream service; the total is logged as ``upstream_ms``"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        current = _fields.get()
+        if current is not None:
+            current["upstream_ms"] = round(current.get("upstream_ms", 0.0) + (time.perf_counter() - started) * 1000, 2)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """``"/api/leads=0.1,/api/cached-tweets=0.05"`` -> {route: rate}"""
+    rates = {}
+    for part in spec.split(","):
+        route, _, rate = part.strip().partition("=")
+        if route and rate:
+            rates[route] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class AccessLogMiddleware:
+    """ASGI middleware writing one structured access record per (sampled) request.
+
+    Routes listed in ``sample_rates`` are logged at that rate, others at
+    ``default_rate``; errors (5xx) and requests slower than ``slow_ms`` are
+    always logged. Each record carries the rate it was sampled at.
+    """
+
+    def __init__(self, app, sample_rates: Optional[Dict[str, float]] = None, default_rate: float = 1.0,
+                 slow_ms: float = 1000.0):
+        self.app = app
+        self.sample_rates = sample_rates or {}
+        self.default_rate = default_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        fields: Dict[str, Any] = {}
+        token = _fields.set(fields)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _fields.reset(token)
+            latency_ms = (time.perf_counter() - started) * 1000
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            rate = self.sample_rates.get(route, self.default_rate)
+            if status >= 500 or latency_ms >= self.slow_ms or random.random() < rate:
+                record = {
+                    "route": route,
+                    "method": scope["method"],
+                    "status": status,
+                    "latency_ms": round(latency_ms, 2),
+                    "sample_rate": rate,
+                }
+                record.update(fields)
+                access_logger.info("access", extra={"access": record})
+
+
+def middleware_options_from_env() -> Dict[str, Any]:
+    return {
+        "sample_rates": parse_sample_rates(os.environ.get("ACCESS_LOG_SAMPLE_RATES", "")),
+        "default_rate": float(os.environ.get("ACCESS_LOG_DEFAULT_RATE", "1.0")),
+        "slow_ms": float(os.environ.get("ACCESS_LOG_SLOW_MS", "1000")),
+    }
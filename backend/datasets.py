@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from records import Record, compact
+
+# Namespace for deterministic record IDs, so a lead keeps its ID across
+# reloads, restarts and workers.
+DATASET_NAMESPACE = uuid.UUID("6f1d2c3e-8a4b-5c6d-9e7f-0a1b2c3d4e5f")
+
+# Fields used as the natural key of each record kind when the file does not
+# carry an explicit "id".
+NATURAL_KEYS = {
+    "leads": ("name", "company"),
+    "tweets": ("author_handle", "content"),
+    "news": ("title",),
+    "deals": ("title",),
+}
+
+RECORD_KINDS = tuple(NATURAL_KEYS)
+
+
+def stable_id(industry: str, kind: str, item: Dict) -> str:
+    """Deterministic ID derived from the record's natural key"""
+    key = "/".join(str(item.get(field, "")) for field in NATURAL_KEYS.get(kind, ("title",)))
+    return str(uuid.uuid5(DATASET_NAMESPACE, f"{industry}/{kind}/{key}"))
+
+
+class Dataset:
+    """Immutable snapshot of one industry's data file.
+
+    Records are held as slotted ``Record`` objects (see records.py) rather
+    than dicts; handlers turn them into response dicts with ``to_dict()``.
+    """
+
+    __slots__ = ("industry", "version", "leads", "news", "deals", "tweets", "_derived", "__weakref__")
+
+    def __init__(self, industry: str, version: Tuple[int, int], records: Dict[str, List[Dict]]):
+        self.industry = industry
+        self.version = version
+        for kind in RECORD_KINDS:
+            items = []
+            for item in records.get(kind, []):
+                if kind in ("leads", "tweets") and "id" not in item:
+                    item["id"] = stable_id(industry, kind, item)
+                items.append(item)
+            setattr(self, kind, compact(kind, items))
+        # Per-snapshot derived structures (indexes etc.), built on demand and
+        # dropped together with the snapshot when the file is reloaded.
+        self._derived = {}
+
+    def __getitem__(self, kind: str) -> Tuple[Record, ...]:
+        if kind not in RECORD_KINDS:
+            raise KeyError(kind)
+        return getattr(self, kind)
+
+    def derived(self, name: str, factory):
+        """Return a structure computed once from this snapshot"""
+        value = self._derived.get(name)
+        if value is None:
+            value = factory(self)
+            self._derived[name] = value
+        return value
+
+
+class DatasetRegistry:
+    """Lazily loads industry data files and hot-reloads them when they change.
+
+    Files are parsed on first use. Afterwards the file is stat'ed at most once
+    per ``check_interval`` seconds; a changed file is re-parsed on a background
+    thread while requests keep being served from the previous snapshot, which
+    is then swapped out in a single assignment. At most ``max_resident``
+    snapshots are kept in memory (least recently used are evicted).
+    """
+
+    def __init__(self, root: Path, default: str, check_interval: float = 2.0, max_resident: int = 64):
+        self.root = Path(root)
+        self.default = default
+        self.check_interval = check_interval
+        self.max_resident = max_resident
+        self._snapshots: "OrderedDict[str, Dataset]" = OrderedDict()
+        self._last_check: Dict[str, float] = {}
+        self._reloading = set()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._names: Optional[Tuple[Tuple[int, int], List[str]]] = None
+
+    def path_for(self, industry: str) -> Path:
+        return self.root / f"{industry}.json"
+
+    def industries(self) -> List[str]:
+        """Names of all industries with a data file"""
+        try:
+            stat = self.root.stat()
+        except OSError:
+            return []
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._names
+        if cached is None or cached[0] != version:
+            names = sorted(p.stem for p in self.root.glob("*.json"))
+            self._names = cached = (version, names)
+        return cached[1]
+
+    def get(self, industry: str) -> Dataset:
+        """Current snapshot for an industry, falling back to the default industry"""
+        snapshot = self._snapshots.get(industry)
+        if snapshot is None:
+            snapshot = self._load_first(industry)
+            if snapshot is None:
+                if industry == self.default:
+                    raise FileNotFoundError(self.path_for(industry))
+                return self.get(self.default)
+        else:
+            self._maybe_reload(industry, snapshot)
+            try:
+                self._snapshots.move_to_end(industry)
+            except KeyError:
+                pass
+        return snapshot
+
+    def _read(self, industry: str) -> Optional[Dataset]:
+        path = self.path_for(industry)
+        try:
+            stat = path.stat()
+            with open(path, "rb") as f:
+                records = json.load(f)
+        except FileNotFoundError:
+            return None
+        return Dataset(industry, (stat.st_mtime_ns, stat.st_size), records)
+
+    def _load_first(self, industry: str) -> Optional[Dataset]:
+        with self._lock:
+            load_lock = self._load_locks.setdefault(industry, threading.Lock())
+        with load_lock:
+            snapshot = self._snapshots.get(industry)
+            if snapshot is not None:
+                return snapshot
+            snapshot = self._read(industry)
+            if snapshot is None:
+                return None
+            self._store(industry, snapshot)
+            logging.info(f"Loaded {industry} dataset ({len(snapshot.leads)} leads)")
+            return snapshot
+
+    def _store(self, industry: str, snapshot: Dataset):
+        with self._lock:
+            self._snapshots[industry] = snapshot
+            self._snapshots.move_to_end(industry)
+            self._last_check[industry] = time.monotonic()
+            while len(self._snapshots) > self.max_resident:
+                evicted, _ = self._snapshots.popitem(last=False)
+                self._last_check.pop(evicted, None)
+
+    def _maybe_reload(self, industry: str, snapshot: Dataset):
+        now = time.monotonic()
+        if now - self._last_check.get(industry, 0.0) < self.check_interval:
+            return
+        self._last_check[industry] = now
+        try:
+            stat = self.path_for(industry).stat()
+        except OSError:
+            return
+        if (stat.st_mtime_ns, stat.st_size) == snapshot.version:
+            return
+        with self._lock:
+            if industry in self._reloading:
+                return
+            self._reloading.add(industry)
+        threading.Thread(target=self._reload, args=(industry,), daemon=True).start()
+
+    def _reload(self, industry: str):
+        try:
+            snapshot = self._read(industry)
+            if snapshot is not None:
+                self._store(industry, snapshot)
+                logging.info(f"Reloaded {industry} dataset")
+        except Exception as e:
+            # Keep serving the previous snapshot if the new file is broken
+            logging.error(f"Reloading {industry} dataset failed: {e}")
+        finally:
+            with self._lock:
+                self._reloading.discard(industry)
+
+
+def registry_from_env(root: Path, default: str) -> DatasetRegistry:
+    return DatasetRegistry(
+        root,
+        default=default,
+        check_interval=float(os.environ.get("DATASET_RELOAD_INTERVAL", "2.0")),
+        max_resident=int(os.environ.get("DATASET_CACHE_SIZE", "64")),
+    )
@@ -0,0 +1,18 @@
+# Boost range applied to a record's score, scaled by its relevance to the context
+MIN_BOOST = 0.1
+MAX_BOOST = 0.8
+
+
+def normalize_context(context: str) -> str:
+    return " ".join(context.lower().split())
+
+
+def relevance_boost(item: dict) -> float:
+    """Score boost from the relevance signals already attached to the record.
+
+    Plain arithmetic, and deterministic: identical requests get identical
+    scores, so there is nothing worth caching.
+    """
+    relevance = max(item.get("text_relevance", 0.0), item.get("semantic_score", 0.0))
+    relevance = min(max(relevance, 0.0), 1.0)
+    return round(MIN_BOOST + (MAX_BOOST - MIN_BOOST) * relevance, 3)
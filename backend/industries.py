@@ -0,0 +1,129 @@
+import json
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class IndustryMatch(NamedTuple):
+    industry: str
+    confidence: float
+    score: float
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class KeywordIndex:
+    """Token -> [(industry, weight)] map built from the industry config.
+
+    Multi-word keywords ("machine learning") are stored as space-joined
+    n-grams, so a context is scored with one pass over its n-grams up to the
+    longest keyword, no matter how many industries are configured.
+    """
+
+    def __init__(self, industries: Dict[str, Dict[str, float]]):
+        self.industries = list(industries)
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        # Words in the longest keyword
+        self.max_words = 1
+        for idx, keywords in enumerate(industries.values()):
+            for keyword, weight in keywords.items():
+                words = tokenize(keyword)
+                if words:
+                    self.postings.setdefault(" ".join(words), []).append((idx, float(weight)))
+                    self.max_words = max(self.max_words, len(words))
+
+    def _lookup(self, token: str) -> Optional[List[Tuple[int, float]]]:
+        postings = self.postings.get(token)
+        # Cheap plural folding: "clinics" -> "clinic"
+        if postings is None and len(token) > 3 and token.endswith("s"):
+            postings = self.postings.get(token[:-1])
+        return postings
+
+    def rank(self, text: str, limit: Optional[int] = None) -> List[IndustryMatch]:
+        scores: Dict[int, float] = {}
+        seen = set()
+        tokens = tokenize(text)
+        for end, token in enumerate(tokens, 1):
+            # Every n-gram ending at this token, shortest first
+            candidates = [" ".join(tokens[start:end]) for start in range(end - 1, max(end - self.max_words, 0) - 1, -1)]
+            for candidate in candidates:
+                # A repeated keyword counts once
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                postings = self._lookup(candidate)
+                if postings:
+                    for idx, weight in postings:
+                        scores[idx] = scores.get(idx, 0.0) + weight
+
+        total = sum(scores.values())
+        if total <= 0:
+            return []
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [IndustryMatch(self.industries[idx], round(score / total, 4), score) for idx, score in ranked]
+
+
+class IndustryRegistry:
+    """Config-driven industry keywords, reloaded when the config file changes"""
+
+    def __init__(self, path: Path, check_interval: float = 2.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.default = "saas_startup"
+        self._index = KeywordIndex({})
+        self._version = None
+        self._last_check = 0.0
+        self._reloading = threading.Lock()
+        self._load()
+
+    def _load(self):
+        stat = self.path.stat()
+        with open(self.path, "rb") as f:
+            config = json.load(f)
+        industries = {name: spec.get("keywords", {}) for name, spec in config.get("industries", {}).items()}
+        self.default = config.get("default", self.default)
+        self._index = KeywordIndex(industries)
+        self._version = (stat.st_mtime_ns, stat.st_size)
+
+    def _reload(self):
+        try:
+            self._load()
+            logging.info(f"Reloaded industry config ({len(self._index.industries)} industries)")
+        except Exception as e:
+            logging.error(f"Reloading industry config failed: {e}")
+        finally:
+            self._reloading.release()
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return
+        if (stat.st_mtime_ns, stat.st_size) != self._version and self._reloading.acquire(blocking=False):
+            threading.Thread(target=self._reload, daemon=True).start()
+
+    @property
+    def industries(self) -> List[str]:
+        return list(self._index.industries)
+
+    def rank(self, text: str, limit: Optional[int] = None) -> List[IndustryMatch]:
+        """All matching industries, best first, with confidences summing to 1"""
+        self._maybe_reload()
+        return self._index.rank(text, limit)
+
+    def detect(self, text: str) -> str:
+        ranked = self.rank(text, limit=1)
+        return ranked[0].industry if ranked else self.default
@@ -0,0 +1,111 @@
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Type
+
+# Low-cardinality string fields shared by many records; interning makes every
+# record point at one copy of e.g. "High" or "CEO" instead of its own.
+INTERNED_FIELDS = frozenset({"priority", "role", "source", "type", "geography", "company", "author_name"})
+
+
+class Record:
+    """Read-only record with one slot per field instead of a per-record dict.
+
+    Concrete classes are generated per field layout by ``record_type``.
+    Fields absent from the source row stay unset, so ``to_dict`` returns
+    exactly the keys the row had. Reads support the mapping idioms the
+    server uses (``record["id"]``, ``record.get("score")``).
+    """
+
+    __slots__ = ("_extra",)
+    _fields: Tuple[str, ...] = ()
+    _slotted: frozenset = frozenset()
+
+    def __init__(self, row: Dict[str, Any]):
+        for name, value in row.items():
+            if isinstance(value, str) and name in INTERNED_FIELDS:
+                value = sys.intern(value)
+            if name in self._slotted:
+                object.__setattr__(self, name, value)
+            else:
+                # Keys that cannot be slots (not identifiers, or method names)
+                try:
+                    extra = self._extra
+                except AttributeError:
+                    extra = {}
+                    object.__setattr__(self, "_extra", extra)
+                extra[name] = value
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def _lookup(self, name: str) -> Any:
+        if name in self._slotted:
+            return getattr(self, name)
+        try:
+            return self._extra[name]
+        except (AttributeError, KeyError):
+            raise AttributeError(name) from None
+
+    def get(self, name: str, default: Any = None) -> Any:
+        try:
+            return self._lookup(name)
+        except AttributeError:
+            return default
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._lookup(name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __contains__(self, name: str) -> bool:
+        try:
+            self._lookup(name)
+        except AttributeError:
+            return False
+        return True
+
+    def keys(self) -> Iterator[str]:
+        return (name for name in self._fields if name in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """A new dict for a response; nested values are shallow-copied so callers may edit them"""
+        row = {}
+        for name in self._fields:
+            try:
+                value = self._lookup(name)
+            except AttributeError:
+                continue
+            if isinstance(value, (dict, list)):
+                value = value.copy()
+            row[name] = value
+        return row
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+_RESERVED = frozenset(dir(Record))
+_types: Dict[Tuple[str, Tuple[str, ...]], Type[Record]] = {}
+
+
+def record_type(kind: str, fields: Iterable[str]) -> Type[Record]:
+    """Slotted Record subclass for a kind and field layout (created once)"""
+    fields = tuple(fields)
+    key = (kind, fields)
+    cls = _types.get(key)
+    if cls is None:
+        slotted = tuple(f for f in fields if f.isidentifier() and f not in _RESERVED)
+        name = kind.title().rstrip("s") + "Record"
+        cls = _types[key] = type(name, (Record,), {
+            "__slots__": slotted, "_fields": fields, "_slotted": frozenset(slotted),
+        })
+    return cls
+
+
+def compact(kind: str, rows: List[Dict[str, Any]]) -> Tuple[Record, ...]:
+    """Convert parsed rows of one kind into slotted records"""
+    fields: Dict[str, None] = {}
+    for row in rows:
+        fields.update(dict.fromkeys(row))
+    cls = record_type(kind, fields)
+    return tuple(cls(row) for row in rows)
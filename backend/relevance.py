@@ -0,0 +1,88 @@
+import math
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from industries import tokenize
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or our the their this to was we with".split()
+)
+
+
+def terms(text: str) -> List[str]:
+    """Tokens with stopwords removed and plurals folded ("clinics" -> "clinic")"""
+    folded = []
+    for token in tokenize(text):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        folded.append(token)
+    return folded
+
+
+class TfidfIndex:
+    """Sparse TF-IDF index stored as per-term postings (a CSC matrix by column).
+
+    Documents are added incrementally; each one stores its L2-normalized
+    sublinear term frequencies. IDF is applied at query time from the current
+    document frequencies, so adding documents never rewrites existing
+    postings. Scoring a query is a sparse matrix-vector product that only
+    touches the postings of the query's terms.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self._postings: Dict[str, Tuple[array, array]] = {}
+
+    def add(self, text: str) -> int:
+        """Index a document; returns its position"""
+        doc = self.size
+        counts: Dict[str, int] = {}
+        for term in terms(text):
+            counts[term] = counts.get(term, 0) + 1
+        weights = {term: 1.0 + math.log(count) for term, count in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("i"), array("f"))
+            postings[0].append(doc)
+            postings[1].append(weight / norm)
+        self.size += 1
+        return doc
+
+    def extend(self, texts: Iterable[str]):
+        for text in texts:
+            self.add(text)
+
+    def idf(self, term: str) -> float:
+        postings = self._postings.get(term)
+        df = len(postings[0]) if postings else 0
+        return math.log((1 + self.size) / (1 + df)) + 1.0
+
+    def scores(self, query: str) -> np.ndarray:
+        """Cosine-style relevance of every document to the query"""
+        scores = np.zeros(self.size, dtype=np.float32)
+        counts: Dict[str, int] = {}
+        for term in terms(query):
+            counts[term] = counts.get(term, 0) + 1
+        matched = {term: count for term, count in counts.items() if term in self._postings}
+        if not matched:
+            return scores
+        query_weights = {term: (1.0 + math.log(count)) * self.idf(term) for term, count in matched.items()}
+        query_norm = math.sqrt(sum(w * w for w in query_weights.values()))
+        for term, weight in query_weights.items():
+            docs, doc_weights = self._postings[term]
+            factor = weight / query_norm * self.idf(term)
+            np.add.at(scores, np.frombuffer(docs, dtype=np.int32), np.frombuffer(doc_weights, dtype=np.float32) * factor)
+        return scores
+
+    def rank(self, query: str, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """(position, score) of documents scoring above ``min_score``, best first"""
+        scores = self.scores(query)
+        hits = np.flatnonzero(scores > min_score)
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(int(doc), float(scores[doc])) for doc in hits]
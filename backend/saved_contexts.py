@@ -0,0 +1,191 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from enhancement import normalize_context
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+SAVED_CONTEXT_NAMESPACE = uuid.UUID("3b0e7c52-91d4-4a8e-b6f1-2c9d5e7a8f10")
+
+
+class SavedContextStore:
+    """Targeting contexts saved server-side, persisted to a JSON file.
+
+    A context's id is derived from its normalized text, so saving the same
+    string twice returns the existing entry. Other workers share the file:
+    every access stats it and re-reads it when its mtime or size changed, and
+    changes hold an exclusive lock on a ``.lock`` file next to it from the
+    re-read to the write.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._contexts: Dict[str, Dict[str, str]] = {}
+        self._version: Optional[Tuple[int, int]] = None
+        with self._lock:
+            self._reload()
+
+    def _reload(self):
+        """Re-read the file if another process changed it (call with the lock held)"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._contexts, self._version = {}, None
+            return
+        version = (stat.st_mtime_ns, stat.st_size)
+        if version == self._version:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                entries = json.load(f).get("contexts", [])
+        except (OSError, ValueError) as e:
+            logging.error(f"Reading saved contexts failed: {e}")
+            return
+        self._contexts = {entry["id"]: entry for entry in entries}
+        self._version = version
+
+    @staticmethod
+    def id_for(context: str) -> str:
+        return str(uuid.uuid5(SAVED_CONTEXT_NAMESPACE, normalize_context(context)))
+
+    def list(self) -> List[Dict[str, str]]:
+        with self._lock:
+            self._reload()
+            return [dict(entry) for entry in self._contexts.values()]
+
+    def get(self, context_id: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            self._reload()
+            entry = self._contexts.get(context_id)
+            return dict(entry) if entry else None
+
+    def __contains__(self, context: str) -> bool:
+        with self._lock:
+            self._reload()
+            return self.id_for(context) in self._contexts
+
+    @contextmanager
+    def _changing(self):
+        """Hold this process's lock and the cross-process file lock, with the contexts re-read"""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path.with_name(self.path.name + ".lock"), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._reload()
+                yield
+
+    def add(self, context: str) -> Dict[str, str]:
+        context = " ".join(context.split())
+        context_id = self.id_for(context)
+        with self._changing():
+            entry = self._contexts.get(context_id)
+            if entry is None:
+                entry = self._contexts[context_id] = {
+                    "id": context_id, "context": context, "created_at": datetime.utcnow().isoformat(),
+                }
+                self._save()
+            return dict(entry)
+
+    def remove(self, context_id: str) -> bool:
+        with self._changing():
+            if self._contexts.pop(context_id, None) is None:
+                return False
+            self._save()
+            return True
+
+    def _save(self):
+        # Write-then-rename, so a crash never leaves a truncated file
+        with tempfile.NamedTemporaryFile("w", dir=self.path.parent, prefix=self.path.name, suffix=".tmp",
+                                         delete=False) as f:
+            json.dump({"contexts": list(self._contexts.values())}, f, indent=2)
+        try:
+            os.replace(f.name, self.path)
+        except OSError:
+            os.unlink(f.name)
+            raise
+        stat = self.path.stat()
+        self._version = (stat.st_mtime_ns, stat.st_size)
+
+
+class SnapshotRefresher:
+    """Precomputed panel results for every saved context, rebuilt every ``interval`` seconds.
+
+    ``build(context)`` returns the full panel for a context; it runs on a
+    worker thread so a refresh never blocks the event loop. Reads go to
+    ``get``, which only looks up the latest snapshot, so the work done
+    scales with the number of saved contexts rather than with traffic.
+    """
+
+    def __init__(self, store: SavedContextStore, build: Callable[[str], Dict[str, Any]], interval: float = 300.0):
+        self.store = store
+        self.build = build
+        self.interval = interval
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, context: str) -> Optional[Dict[str, Any]]:
+        return self._snapshots.get(normalize_context(context))
+
+    def drop(self, context: str):
+        self._snapshots.pop(normalize_context(context), None)
+
+    async def refresh(self, context: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        panel = await asyncio.to_thread(self.build, context)
+        snapshot = {
+            "context": context,
+            "panel": panel,
+            "refreshed_at": datetime.utcnow().isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        if context in self.store:
+            # One assignment: readers see either the previous snapshot or this one
+            self._snapshots[normalize_context(context)] = snapshot
+        else:
+            # Deleted while it was being built
+            self.drop(context)
+        return snapshot
+
+    async def refresh_all(self):
+        saved = {normalize_context(entry["context"]): entry["context"] for entry in self.store.list()}
+        for key in set(self._snapshots) - set(saved):
+            self._snapshots.pop(key, None)
+        for context in saved.values():
+            try:
+                await self.refresh(context)
+            except Exception as e:
+                # Keep serving the previous snapshot
+                logging.error(f"Refreshing saved context snapshot failed: {e}")
+
+    async def _run(self):
+        while True:
+            await self.refresh_all()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
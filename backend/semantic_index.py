@@ -0,0 +1,187 @@
+import os
+import re
+import threading
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+WORD_RE = re.compile(r"[a-z0-9$%]+")
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest scores, best first"""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= scores.size:
+        return np.argsort(-scores, kind="stable")
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+class HashingEmbedder:
+    """Offline text embedder: hashed n-gram features, randomly projected.
+
+    Word unigrams, word bigrams and character trigrams are hashed (crc32, so
+    vectors are identical across processes) into ``buckets`` slots; each slot
+    owns a fixed Gaussian row of a ``buckets x dim`` projection, and a text's
+    embedding is the L2-normalized weighted sum of its rows. Texts sharing
+    words or word fragments end up with a high cosine similarity.
+    """
+
+    def __init__(self, dim: int = 128, buckets: int = 1 << 14, seed: int = 1729):
+        self.dim = dim
+        self.buckets = buckets
+        rng = np.random.default_rng(seed)
+        self.projection = rng.standard_normal((buckets, dim), dtype=np.float32) / np.float32(np.sqrt(dim))
+
+    def features(self, text: str) -> Tuple[List[int], List[float]]:
+        words = WORD_RE.findall(text.lower())
+        slots, weights = [], []
+
+        def add(feature: str, weight: float):
+            slots.append(zlib.crc32(feature.encode()) % self.buckets)
+            weights.append(weight)
+
+        previous = None
+        for word in words:
+            add(word, 1.0)
+            if previous is not None:
+                add(f"{previous} {word}", 0.7)
+            previous = word
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                add(padded[i:i + 3], 0.25)
+        return slots, weights
+
+    def embed(self, text: str) -> np.ndarray:
+        slots, weights = self.features(text)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if slots:
+            vector = np.asarray(weights, dtype=np.float32) @ self.projection[slots]
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector /= norm
+        return vector
+
+    def embed_many(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            matrix[i] = self.embed(text)
+        return matrix
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class IVFIndex:
+    """Approximate inner-product index (inverted file over k-means cells).
+
+    Vectors are clustered into ``nlist`` cells and stored contiguously, cell
+    by cell. A query scores the centroids, then scans only the ``nprobe``
+    closest cells, so it touches roughly ``nprobe / nlist`` of the corpus.
+    """
+
+    def __init__(self, vectors: np.ndarray, nlist: Optional[int] = None, nprobe: int = 32,
+                 train_size: int = 50_000, iterations: int = 8, seed: int = 0):
+        n = len(vectors)
+        self.nlist = max(1, min(nlist or int(np.sqrt(n)), n))
+        self.nprobe = min(nprobe, self.nlist)
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, size=min(train_size, n), replace=False)]
+        self.centroids = self._train(sample, iterations, rng)
+
+        assignment = self._assign(vectors)
+        self.order = np.argsort(assignment, kind="stable")
+        self.vectors = np.ascontiguousarray(vectors[self.order])
+        counts = np.bincount(assignment, minlength=self.nlist)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def _train(self, sample: np.ndarray, iterations: int, rng: np.random.Generator) -> np.ndarray:
+        centroids = sample[rng.choice(len(sample), size=self.nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=self.nlist)
+            filled = counts > 0
+            # Empty cells keep their previous centroid
+            centroids[filled] = normalize_rows(sums[filled])
+        return centroids
+
+    def _assign(self, vectors: np.ndarray, chunk: int = 65_536) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            labels[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ self.centroids.T, axis=1)
+        return labels
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        cells = top_k(self.centroids @ query, self.nprobe)
+        ids, scores = [], []
+        for cell in cells:
+            start, end = self.offsets[cell], self.offsets[cell + 1]
+            if end > start:
+                scores.append(self.vectors[start:end] @ query)
+                ids.append(self.order[start:end])
+        if not scores:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = np.concatenate(scores)
+        ids = np.concatenate(ids)
+        best = top_k(scores, k)
+        return ids[best], scores[best]
+
+
+class SemanticIndex:
+    """Cosine top-K over a contiguous float32 matrix of normalized vectors.
+
+    Small corpora are searched exactly (one matrix-vector product); corpora of
+    ``approximate_threshold`` vectors or more also get an IVF index, which
+    ``search`` uses unless ``exact=True`` is passed.
+    """
+
+    def __init__(self, vectors: np.ndarray, approximate_threshold: int = 100_000, **ivf_options):
+        self.vectors = normalize_rows(vectors) if len(vectors) else np.zeros((0, 1), dtype=np.float32)
+        self.ivf = IVFIndex(self.vectors, **ivf_options) if len(vectors) >= approximate_threshold else None
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def similarities(self, query: np.ndarray) -> np.ndarray:
+        """Exact cosine similarity of the query to every vector"""
+        return self.vectors @ query if len(self.vectors) else np.empty(0, dtype=np.float32)
+
+    def search(self, query: np.ndarray, k: int = 10, exact: bool = False) -> List[Tuple[int, float]]:
+        if self.ivf is not None and not exact:
+            ids, scores = self.ivf.search(query, k)
+        else:
+            scores = self.similarities(query)
+            ids = top_k(scores, k)
+            scores = scores[ids]
+        return [(int(i), float(s)) for i, s in zip(ids, scores)]
+
+
+_embedder: Optional[HashingEmbedder] = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> HashingEmbedder:
+    """Process-wide embedder; the projection matrix is built on first use"""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = HashingEmbedder(
+                    dim=int(os.environ.get("EMBEDDING_DIM", "128")),
+                    buckets=int(os.environ.get("EMBEDDING_BUCKETS", str(1 << 14))),
+                )
+    return _embedder
+
+
+def build_index(texts: Iterable[str], embedder: Optional[HashingEmbedder] = None) -> SemanticIndex:
+    embedder = embedder or get_embedder()
+    return SemanticIndex(embedder.embed_many(texts))
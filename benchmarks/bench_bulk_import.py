@@ -0,0 +1,101 @@
+"""Benchmark /api/leads/bulk imports of synthetic NDJSON and CSV leads.
+
+Runs the server's BulkImporter over a streamed body, the way the endpoint
+does, and reports rows/s for parsing + validation alone (writes discarded)
+and for inserts and upserts into the in-memory store. Against MongoDB the
+write side is bounded by the server instead.
+
+    python benchmarks/bench_bulk_import.py --leads 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "growth-signals-repo" / "backend"))
+os.environ.pop("MONGO_URL", None)
+
+import server  # noqa: E402
+from bulk_import import BulkImporter, iter_csv, iter_lines, iter_ndjson  # noqa: E402
+from memstore import MemoryCollection  # noqa: E402
+
+ROLES = ["CEO", "CTO", "Founder", "VP Sales", "CRO", "Head of Growth", "VP Marketing", "RevOps Lead"]
+PLACES = ["Austin, TX", "San Francisco, CA", "New York, NY", "London, UK", "Berlin", "Toronto", "Sydney"]
+CHUNK_SIZE = 64 * 1024
+
+
+class DiscardCollection:
+    """Accepts writes without storing them, to time parsing and validation alone"""
+
+    async def insert_many(self, docs, ordered=True):
+        return type("Result", (), {"inserted_ids": [None] * len(docs)})()
+
+
+def synthetic_leads(n, rng):
+    for i in range(n):
+        yield {
+            "company": f"Company {i}", "name": f"Lead {i}", "role": rng.choice(ROLES),
+            "geography": rng.choice(PLACES), "score": round(rng.uniform(0, 10), 1),
+            "intent_signals": [
+                {"signal": s, "confidence": round(rng.random(), 2), "reasoning": "synthetic"}
+                for s in rng.sample(server.INTENT_SIGNALS, 2)
+            ],
+            "social_content": "We are hiring across the go-to-market team",
+        }
+
+
+def ndjson_body(leads):
+    return "\n".join(json.dumps(lead) for lead in leads).encode()
+
+
+def csv_body(leads):
+    import csv
+    import io
+
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(leads[0]))
+    writer.writeheader()
+    for lead in leads:
+        writer.writerow(dict(lead, intent_signals=json.dumps(lead["intent_signals"])))
+    return out.getvalue().encode()
+
+
+async def chunks(body):
+    for i in range(0, len(body), CHUNK_SIZE):
+        yield body[i:i + CHUNK_SIZE]
+
+
+def run(collection, body, parse, **options):
+    importer = BulkImporter(
+        collection, server.Lead, insert_only=("id", "timestamp"), batch_size=server.BULK_IMPORT_BATCH_SIZE,
+        **options,
+    )
+    start = time.perf_counter()
+    report = asyncio.run(importer.run(parse(iter_lines(chunks(body)))))
+    return time.perf_counter() - start, report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leads", type=int, default=100_000)
+    args = parser.parse_args()
+    leads = list(synthetic_leads(args.leads, random.Random(1)))
+
+    for fmt, body, parse in (("ndjson", ndjson_body(leads), iter_ndjson), ("csv", csv_body(leads), iter_csv)):
+        print(f"{fmt}: {len(body) / 1e6:.1f} MB")
+        elapsed, _ = run(DiscardCollection(), body, parse)
+        print(f"  validate only  {args.leads / elapsed:9,.0f} rows/s")
+        collection = MemoryCollection("leads")
+        asyncio.run(collection.create_index([(f, 1) for f in server.LEAD_KEY_FIELDS], unique=True))
+        elapsed, report = run(collection, body, parse)
+        print(f"  insert         {args.leads / elapsed:9,.0f} rows/s  ({report['inserted']} inserted)")
+        elapsed, report = run(collection, body, parse, key_fields=server.LEAD_KEY_FIELDS)
+        print(f"  upsert         {args.leads / elapsed:9,.0f} rows/s  ({report['updated']} updated)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark /api/leads/facets counting over synthetic leads.
+
+Builds the bitmap facet index the way the server does (batched loads) and
+times facet queries of increasing selectivity, plus single-lead upserts.
+
+    python benchmarks/bench_facets.py --leads 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "growth-signals-repo" / "backend"))
+os.environ.pop("MONGO_URL", None)
+
+import server  # noqa: E402
+from facets import FacetIndex  # noqa: E402
+
+ROLES = ["CEO", "CTO", "Founder", "VP Sales", "CRO", "Head of Growth", "VP Marketing", "RevOps Lead"]
+PLACES = ["Austin, TX", "San Francisco, CA", "New York, NY", "London, UK", "Berlin", "Toronto", "Sydney"]
+
+QUERIES = {
+    "no filter": {},
+    "priority=High": {"priority": ["High"]},
+    "geography=North America": {"geo": ["region:north-america"]},
+    "High CEOs in Texas": {"priority": ["High"], "role": ["CEO"], "geo": ["state:us-tx"]},
+}
+
+
+def synthetic_leads(n, rng):
+    located = {place: server.Lead(
+        company="c", name="n", role="CEO", geography=place, score=5, intent_signals=[], social_content=""
+    ) for place in PLACES}
+    for i in range(n):
+        place = located[rng.choice(PLACES)]
+        yield {
+            "company": f"Company {i}", "name": f"Lead {i}", "role": rng.choice(ROLES),
+            "priority": rng.choice(["High", "Medium", "Low"]), "region": place.region, "geo_keys": place.geo_keys,
+            "intent_signals": [{"signal": s} for s in rng.sample(server.INTENT_SIGNALS, 2)],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leads", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(1)
+
+    leads = list(synthetic_leads(args.leads, rng))
+    index = FacetIndex(server.LEAD_FACETS, server.lead_identity)
+    start = time.perf_counter()
+    for i in range(0, len(leads), server.EXPORT_BATCH_SIZE):
+        index.load(leads[i:i + server.EXPORT_BATCH_SIZE])
+    print(f"build: {time.perf_counter() - start:.1f} s for {len(index)} leads")
+
+    for name, filters in QUERIES.items():
+        index.counts(filters, server.FACET_DIMENSIONS)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            result = index.counts(filters, server.FACET_DIMENSIONS)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{name:28s} {elapsed * 1e3:7.2f} ms  ({result['total']} matching)")
+
+    start = time.perf_counter()
+    for lead in leads[:1000]:
+        index.upsert(dict(lead, priority="Low"))
+    print(f"upsert: {(time.perf_counter() - start) * 1e3:.1f} us per lead")
+
+
+if __name__ == "__main__":
+    main()
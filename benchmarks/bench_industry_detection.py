@@ -0,0 +1,71 @@
+"""Benchmark industry detection with a large synthetic registry.
+
+Compares the token->industry index against a linear scan of every
+industry's keyword list (the old if/elif approach).
+
+    python benchmarks/bench_industry_detection.py --industries 500
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from industries import KeywordIndex  # noqa: E402
+
+WORDS = [f"kw{i}" for i in range(20000)]
+
+
+def build_config(n_industries: int, keywords_per_industry: int, rng: random.Random):
+    return {
+        f"industry_{i}": {rng.choice(WORDS): round(rng.uniform(0.5, 3.0), 1) for _ in range(keywords_per_industry)}
+        for i in range(n_industries)
+    }
+
+
+def linear_scan(config, text):
+    lowered = text.lower()
+    scores = {}
+    for industry, keywords in config.items():
+        score = sum(weight for keyword, weight in keywords.items() if keyword in lowered)
+        if score:
+            scores[industry] = score
+    return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def timed(fn, contexts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for context in contexts:
+            fn(context)
+    return (time.perf_counter() - start) / (repeat * len(contexts))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--industries", type=int, default=500)
+    parser.add_argument("--keywords", type=int, default=20)
+    parser.add_argument("--contexts", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    config = build_config(args.industries, args.keywords, rng)
+    contexts = [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(args.contexts)]
+
+    start = time.perf_counter()
+    index = KeywordIndex(config)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    indexed = timed(index.rank, contexts, args.repeat)
+    scanned = timed(lambda text: linear_scan(config, text), contexts, args.repeat)
+
+    print(f"industries={args.industries} keywords/industry={args.keywords} index build={build_ms:.1f} ms")
+    print(f"token index : {indexed * 1e6:8.1f} us/context")
+    print(f"linear scan : {scanned * 1e6:8.1f} us/context  ({scanned / indexed:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark the time-decayed lead ranking behind /api/leads.
+
+Scores synthetic leads the way the server builds its ranking, then times
+top-K queries with and without a batch of dirty (re-imported) leads to
+rescore first.
+
+    python benchmarks/bench_ranking.py --leads 1000000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "growth-signals-repo" / "backend"))
+
+from ranking import LeadRanker  # noqa: E402
+
+
+def synthetic_lead(i, rng, now):
+    return {
+        "company": f"Company {i}", "name": f"Lead {i}", "score": rng.uniform(1, 10),
+        "signals_at": now - rng.uniform(0, 90 * 86400),
+        "intent_signals": [{"confidence": rng.random()} for _ in range(rng.randint(0, 3))],
+    }
+
+
+def identity(lead):
+    return lead["company"], lead["name"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leads", type=int, default=1_000_000)
+    parser.add_argument("--top", type=int, default=100)
+    parser.add_argument("--dirty", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(1)
+    now = time.time()
+
+    leads = [synthetic_lead(i, rng, now) for i in range(args.leads)]
+    ranker = LeadRanker(identity, half_life=72 * 3600, k=args.top)
+    start = time.perf_counter()
+    ranker.load(leads)
+    ranker.top()
+    print(f"build: {time.perf_counter() - start:.1f} s for {len(ranker)} leads")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        ranker.top()
+    print(f"top {args.top}: {(time.perf_counter() - start) / args.repeat * 1e3:.3f} ms")
+
+    elapsed = 0.0
+    for _ in range(args.repeat):
+        ranker.mark_dirty(synthetic_lead(rng.randrange(args.leads), rng, now) for _ in range(args.dirty))
+        start = time.perf_counter()
+        ranker.top()
+        elapsed += time.perf_counter() - start
+    print(f"top {args.top} after {args.dirty} dirty leads: {elapsed / args.repeat * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
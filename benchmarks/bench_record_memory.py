@@ -0,0 +1,82 @@
+"""Measure retained memory per record: parsed dicts vs slotted records.
+
+Synthetic leads, tweets and news (shaped like the industry data files) are
+parsed from JSON the way the dataset loader does, then kept either as dicts
+or converted with records.compact. Reported as bytes per record.
+
+    python benchmarks/bench_record_memory.py --rows 200000
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from records import compact  # noqa: E402
+
+ROLES = ["CEO", "CTO", "Founder & CEO", "VP Sales", "Head of Growth", "Practice Owner"]
+PRIORITIES = ["High", "Medium", "Low"]
+CITIES = ["San Francisco, CA", "Austin, TX", "New York, NY", "Boston, MA", "London, UK"]
+SOURCES = ["TechCrunch", "Forbes", "AI Business", "SaaStr", "Healthcare Dive"]
+
+
+def synthetic(kind: str, rows: int, rng: random.Random):
+    def text(words):
+        return " ".join(rng.choice(["scaling", "sales", "GPU", "Series", "B", "hiring", "team", "growth"]) for _ in range(words))
+
+    out = []
+    for i in range(rows):
+        if kind == "leads":
+            out.append({
+                "id": f"{i:032x}", "name": f"Person {i}", "role": rng.choice(ROLES), "company": f"Company {i % 5000}",
+                "geography": rng.choice(CITIES), "social_content": text(20), "score": round(rng.uniform(5, 10), 1),
+                "priority": rng.choice(PRIORITIES), "linkedin_url": f"https://linkedin.com/in/p{i}",
+            })
+        elif kind == "tweets":
+            out.append({
+                "id": f"{i:032x}", "content": text(25), "author_name": f"Author {i % 20000}",
+                "author_handle": f"@author{i}", "engagement_metrics": {"like_count": i % 300, "retweet_count": i % 40},
+                "relevance_score": round(rng.uniform(5, 10), 1),
+            })
+        else:
+            out.append({
+                "title": text(8), "description": text(15), "source": rng.choice(SOURCES),
+                "relevance_score": round(rng.uniform(5, 10), 1),
+            })
+    return json.dumps(out)
+
+
+def retained(build):
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    for kind in ("leads", "tweets", "news"):
+        payload = synthetic(kind, args.rows, rng)
+        dicts, dict_bytes = retained(lambda: json.loads(payload))
+        del dicts
+        records, record_bytes = retained(lambda: compact(kind, json.loads(payload)))
+        del records
+        print(
+            f"{kind:7s} dicts {dict_bytes / args.rows:7.0f} B/record  "
+            f"records {record_bytes / args.rows:7.0f} B/record  ({1 - record_bytes / dict_bytes:.0%} smaller)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark semantic top-K queries on a large synthetic corpus.
+
+Compares exact search (one matrix-vector product) against the IVF index and
+reports recall@K of the approximate results.
+
+    python benchmarks/bench_semantic_index.py --vectors 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from semantic_index import SemanticIndex, get_embedder  # noqa: E402
+
+
+def clustered_vectors(n: int, dim: int, topics: int, rng: np.random.Generator) -> np.ndarray:
+    """Vectors scattered around topic centres, like embeddings of real text"""
+    centres = rng.standard_normal((topics, dim), dtype=np.float32)
+    vectors = centres[rng.integers(0, topics, size=n)]
+    vectors += 0.6 * rng.standard_normal((n, dim), dtype=np.float32)
+    return vectors
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return (time.perf_counter() - start) / len(queries), results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=32)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    vectors = clustered_vectors(args.vectors, args.dim, args.topics, rng)
+
+    start = time.perf_counter()
+    index = SemanticIndex(vectors, approximate_threshold=1, nprobe=args.nprobe)
+    build_s = time.perf_counter() - start
+    del vectors
+
+    queries = index.vectors[rng.integers(0, len(index), size=args.queries)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape, dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    exact_s, exact = timed(lambda q: index.search(q, args.k, exact=True), queries)
+    approx_s, approx = timed(lambda q: index.search(q, args.k), queries)
+    recall = np.mean([
+        len({i for i, _ in a} & {i for i, _ in e}) / args.k for a, e in zip(approx, exact)
+    ])
+
+    embedder = get_embedder()
+    text = "Series B AI infrastructure startup hiring a VP of Sales"
+    embed_s, _ = timed(embedder.embed, [text] * 1000)
+
+    print(f"vectors={len(index)} dim={args.dim} nlist={index.ivf.nlist} nprobe={index.ivf.nprobe} build={build_s:.1f} s")
+    print(f"embed query : {embed_s * 1e6:8.1f} us")
+    print(f"exact top-{args.k}: {exact_s * 1e3:8.2f} ms/query")
+    print(f"IVF top-{args.k}  : {approx_s * 1e3:8.2f} ms/query  recall@{args.k}={recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
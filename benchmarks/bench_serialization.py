@@ -0,0 +1,80 @@
+"""Benchmark response serialization of the Growth Signals API payloads.
+
+For each endpoint's payload shape, compares the previous path (timestamps
+converted in a Python loop, then starlette's stdlib JSONResponse) with
+FastJSONResponse (orjson when installed, datetime/ObjectId handled natively).
+
+    python benchmarks/bench_serialization.py --rows 1000
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "growth-signals-repo" / "backend"))
+os.environ.pop("MONGO_URL", None)
+
+from fastapi.responses import JSONResponse  # noqa: E402
+
+import fast_json  # noqa: E402
+import server  # noqa: E402
+
+
+def scaled(records, rows):
+    out = []
+    for i in range(rows):
+        record = copy.deepcopy(records[i % len(records)])
+        record["id"] = str(uuid.uuid4())
+        record["timestamp"] = datetime.utcnow()
+        out.append(record)
+    return out
+
+
+def legacy_render(payload, key):
+    for item in payload[key]:
+        if isinstance(item.get("timestamp"), datetime):
+            item["timestamp"] = item["timestamp"].isoformat()
+    return JSONResponse(content=payload).body
+
+
+def fast_render(payload, key):
+    return fast_json.FastJSONResponse(content=payload).body
+
+
+def timed(fn, payloads, key):
+    start = time.perf_counter()
+    for payload in payloads:
+        fn(payload, key)
+    return (time.perf_counter() - start) / len(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    endpoints = {
+        "/api/leads": ("leads", server.FALLBACK_LEADS),
+        "/api/cached-tweets": ("tweets", server.FALLBACK_CACHED_TWEETS),
+        "/api/startup-news": ("news", server.FALLBACK_NEWS),
+    }
+    print(f"encoder: {'orjson' if fast_json.orjson else 'stdlib'}  rows/response={args.rows}")
+    for path, (key, records) in endpoints.items():
+        base = {key: scaled(records, args.rows), "total": args.rows}
+        # Fresh copies per run: the legacy path rewrites timestamps in place
+        legacy = timed(legacy_render, [copy.deepcopy(base) for _ in range(args.repeat)], key)
+        fast = timed(fast_render, [copy.deepcopy(base) for _ in range(args.repeat)], key)
+        size = len(fast_render(base, key))
+        print(
+            f"{path:20s} legacy {legacy * 1e3:7.2f} ms  fast {fast * 1e3:7.2f} ms  "
+            f"({legacy / fast:4.1f}x, {size / fast / 1e6:6.1f} MB/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure worker startup cost of the Growth Signals API.
+
+Each run starts a fresh interpreter (like a restarted gunicorn worker) and
+reports how long ``import server`` takes and how long until the first
+``/api/leads`` response is served. Pass --max-import-ms / --max-first-ms to
+fail (exit 1) on regressions.
+
+    python benchmarks/bench_startup.py --runs 5 --max-import-ms 400
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent / "growth-signals-repo" / "backend"
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import server
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client_ready = time.perf_counter()
+with TestClient(server.app) as client:
+    first_start = time.perf_counter()
+    response = client.get("/api/leads")
+    first_done = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    # excludes importing the test client itself
+    "first_response_ms": (imported - start + first_done - client_ready) * 1000,
+    "request_ms": (first_done - first_start) * 1000,
+}))
+"""
+
+
+def run_once(env):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-first-ms", type=float)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+    samples = [run_once(env) for _ in range(args.runs)]
+
+    failed = False
+    for key, limit in (("import_ms", args.max_import_ms), ("first_response_ms", args.max_first_ms), ("request_ms", None)):
+        values = [s[key] for s in samples]
+        median = statistics.median(values)
+        line = f"{key:18s} median={median:8.1f}  min={min(values):8.1f}  max={max(values):8.1f}"
+        if limit is not None and median > limit:
+            line += f"  REGRESSION (limit {limit:.0f})"
+            failed = True
+        print(line)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
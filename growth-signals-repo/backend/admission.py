@@ -0,0 +1,196 @@
+"""Admission control and load shedding for expensive routes.
+
+Each limited route gets a concurrency limit and a bounded wait queue. A
+request beyond both, or one that waits longer than the queue timeout, is
+shed before any handler work is done: it is answered with the last good
+response for the same URL (marked ``X-Stale: true`` with its ``Age``) when
+one is recent enough, and with ``503`` plus ``Retry-After`` otherwise.
+Routes without a limit pass straight through, so cheap endpoints keep their
+latency while expensive ones are saturated.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import metrics
+from fast_json import dumps
+
+# Responses larger than this are not kept for stale fallback
+MAX_STALE_BODY = 1 << 20
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """``"/api/live-tweets=8:16,/api/export=2:0"`` -> {prefix: (concurrency, queue)}"""
+    limits = {}
+    for part in spec.split(","):
+        prefix, _, limit = part.strip().partition("=")
+        if prefix and limit:
+            concurrency, _, queue = limit.partition(":")
+            limits[prefix.rstrip("/")] = (max(int(concurrency), 1), max(int(queue or 0), 0))
+    return limits
+
+
+class RouteLimiter:
+    """At most ``max_concurrent`` requests in flight and ``max_queue`` waiting"""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.shed = 0
+        self.stale_served = 0
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if there is room; False means shed"""
+        if not self._slots.locked():
+            await self._slots.acquire()
+        elif self.waiting >= self.max_queue:
+            return False
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                self.waiting -= 1
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, float]:
+        prefix = f"admission.{self.name}"
+        return {
+            f"{prefix}.in_flight": self.in_flight,
+            f"{prefix}.waiting": self.waiting,
+            f"{prefix}.shed": self.shed,
+            f"{prefix}.stale_served": self.stale_served,
+        }
+
+
+class StaleStore:
+    """Last good (200, JSON) response per URL, kept for serving while shedding"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, List, bytes]]" = OrderedDict()
+
+    def put(self, key: str, headers: List, body: bytes):
+        self._entries[key] = (time.monotonic(), headers, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str, max_age: float) -> Optional[Tuple[float, List, bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[0]
+        if age > max_age:
+            return None
+        return age, entry[1], entry[2]
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying per-route limits (matched by path prefix)"""
+
+    def __init__(self, app, limits: Dict[str, Tuple[int, int]], queue_timeout: float = 2.0,
+                 retry_after: int = 5, stale_max_age: float = 600.0):
+        self.app = app
+        self.limiters = {
+            prefix: RouteLimiter(prefix, concurrency, queue, queue_timeout)
+            for prefix, (concurrency, queue) in limits.items()
+        }
+        self.retry_after = retry_after
+        self.stale_max_age = stale_max_age
+        self.stale = StaleStore()
+        _middlewares.append(self)
+
+    def limiter_for(self, path: str) -> Optional[RouteLimiter]:
+        path = path.rstrip("/")
+        for prefix, limiter in self.limiters.items():
+            if path == prefix or path.startswith(prefix + "/"):
+                return limiter
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limiter_for(scope["path"]) if scope["type"] == "http" else None
+        if limiter is None:
+            return await self.app(scope, receive, send)
+
+        cacheable = scope["method"] == "GET"
+        key = scope["path"] + "?" + scope.get("query_string", b"").decode("latin-1")
+        if not await limiter.acquire():
+            limiter.shed += 1
+            return await self._shed(limiter, key if cacheable else None, send)
+
+        try:
+            if not cacheable:
+                return await self.app(scope, receive, send)
+            await self.app(scope, receive, self._recorder(key, send))
+        finally:
+            limiter.release()
+
+    def _recorder(self, key: str, send):
+        """Wrap ``send`` to keep a copy of a successful JSON response"""
+        start = None
+        chunks: Optional[List[bytes]] = []
+        size = 0
+
+        async def record(message):
+            nonlocal start, chunks, size
+            if message["type"] == "http.response.start":
+                start = message
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                if message["status"] != 200 or not content_type.startswith(b"application/json"):
+                    chunks = None
+            elif message["type"] == "http.response.body" and chunks is not None:
+                body = message.get("body", b"")
+                size += len(body)
+                if size > MAX_STALE_BODY:
+                    chunks = None
+                else:
+                    chunks.append(body)
+                    if not message.get("more_body", False):
+                        headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"]
+                        self.stale.put(key, headers, b"".join(chunks))
+            await send(message)
+
+        return record
+
+    async def _shed(self, limiter: RouteLimiter, key: Optional[str], send):
+        entry = self.stale.get(key, self.stale_max_age) if key is not None else None
+        if entry is not None:
+            limiter.stale_served += 1
+            age, headers, body = entry
+            headers = headers + [
+                (b"content-length", str(len(body)).encode()),
+                (b"x-stale", b"true"),
+                (b"age", str(int(age)).encode()),
+            ]
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        body = dumps({"detail": "Server is busy, please retry later"})
+        await send({"type": "http.response.start", "status": 503, "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(self.retry_after).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
+
+
+_middlewares: List[AdmissionMiddleware] = []
+
+metrics.register_collector(lambda: {
+    k: v for m in _middlewares for limiter in m.limiters.values() for k, v in limiter.stats().items()
+})
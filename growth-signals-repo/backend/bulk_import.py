@@ -0,0 +1,225 @@
+"""Streaming bulk import of records (CSV or NDJSON request bodies).
+
+The body is consumed chunk by chunk and split into rows, rows are validated
+in batches against a Pydantic model, and each batch is written with one
+unordered bulk operation while the next batch is being parsed. At most two
+batches are held in memory, whatever the size of the upload.
+"""
+import asyncio
+import csv
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+FORMATS = ("csv", "ndjson")
+
+# Mongo's error code for a write that would repeat a unique index key
+DUPLICATE_KEY = 11000
+
+
+class ImportFormatError(ValueError):
+    """The upload cannot be parsed at all (e.g. a CSV without a header row)"""
+
+
+def detect_format(content_type: Optional[str], explicit: Optional[str] = None) -> str:
+    if explicit:
+        if explicit not in FORMATS:
+            raise ImportFormatError(f"format must be one of {', '.join(FORMATS)}")
+        return explicit
+    content_type = (content_type or "").lower()
+    return "csv" if "csv" in content_type else "ndjson"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines without buffering the whole body"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8-sig")
+    if pending:
+        yield pending.rstrip(b"\r").decode("utf-8-sig")
+
+
+async def iter_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    """(row number, parsed object or ImportFormatError) per non-blank line"""
+    row = 0
+    async for line in lines:
+        row += 1
+        if not line.strip():
+            continue
+        try:
+            yield row, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, ImportFormatError(f"invalid JSON: {e.msg}")
+
+
+def _csv_value(value: str) -> Any:
+    # Structured columns (e.g. intent_signals) are given as JSON in the cell
+    stripped = value.strip()
+    if stripped[:1] in ("[", "{"):
+        try:
+            return json.loads(stripped)
+        except json.JSONDecodeError:
+            pass
+    return value
+
+
+async def iter_csv(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    """(row number, dict keyed by the header) per CSV record; quoted newlines are supported"""
+    header: Optional[List[str]] = None
+    record, row = "", 0
+    async for line in lines:
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue  # inside a quoted field that spans lines
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, ImportFormatError(f"expected {len(header)} columns, got {len(values)}")
+            continue
+        # Empty cells are left out so model defaults apply
+        yield row, {name: _csv_value(value) for name, value in zip(header, values) if value != ""}
+    if header is None:
+        raise ImportFormatError("CSV upload has no header row")
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+        )
+    return str(error)
+
+
+def _write_error_message(error: Dict) -> str:
+    key_value = error.get("keyValue")
+    if error.get("code") == DUPLICATE_KEY and key_value:
+        return "duplicate " + ", ".join(f"{field}={value!r}" for field, value in key_value.items())
+    return error.get("errmsg", "write failed")
+
+
+class BulkImporter:
+    """Validates rows against ``model`` and writes them in unordered batches.
+
+    With ``key_fields`` rows are upserted on that natural key (existing
+    documents are updated, except for the ``insert_only`` fields which are
+    only set when the document is created); otherwise they are inserted.
+    Rows rejected by a unique index are reported like invalid rows.
+    ``on_written`` is called with the documents of each batch that were
+    written.
+    """
+
+    def __init__(self, collection, model: Type[BaseModel], key_fields: Sequence[str] = (),
+                 insert_only: Sequence[str] = (), batch_size: int = 1000, max_errors: int = 1000,
+                 on_written: Optional[Callable[[List[Dict]], None]] = None):
+        self.collection = collection
+        self.on_written = on_written
+        self.model = model
+        self.key_fields = tuple(key_fields)
+        self.insert_only = tuple(insert_only)
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.report: Dict[str, Any] = {
+            "received": 0, "inserted": 0, "updated": 0, "failed": 0, "errors": [], "errors_truncated": False,
+        }
+
+    def _fail(self, row: int, message: str):
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < self.max_errors:
+            self.report["errors"].append({"row": row, "error": message})
+        else:
+            self.report["errors_truncated"] = True
+
+    def _validate(self, batch: List[Tuple[int, Any]]) -> List[Tuple[int, Dict]]:
+        documents = []
+        for row, value in batch:
+            if isinstance(value, Exception):
+                self._fail(row, _error_message(value))
+                continue
+            if not isinstance(value, dict):
+                self._fail(row, "row must be an object")
+                continue
+            try:
+                documents.append((row, self.model.model_validate(value).model_dump()))
+            except ValidationError as e:
+                self._fail(row, _error_message(e))
+        return documents
+
+    async def _write(self, documents: List[Tuple[int, Dict]]):
+        if not documents:
+            return
+        rows = [row for row, _ in documents]
+        try:
+            if self.key_fields:
+                from pymongo import UpdateOne
+
+                operations = []
+                for _, doc in documents:
+                    # Split off rather than popped: on_written gets the whole document
+                    changes = {field: value for field, value in doc.items() if field not in self.insert_only}
+                    update = {"$set": changes}
+                    on_insert = {field: doc[field] for field in self.insert_only if field in doc}
+                    if on_insert:
+                        update["$setOnInsert"] = on_insert
+                    key = {field: doc[field] for field in self.key_fields}
+                    operations.append(UpdateOne(key, update, upsert=True))
+                result = await self.collection.bulk_write(operations, ordered=False)
+                self.report["inserted"] += result.upserted_count
+                self.report["updated"] += result.matched_count
+            else:
+                result = await self.collection.insert_many([doc for _, doc in documents], ordered=False)
+                self.report["inserted"] += len(result.inserted_ids)
+            failed = set()
+        except Exception as e:
+            details = getattr(e, "details", None) or {}
+            write_errors = details.get("writeErrors")
+            if write_errors is None:
+                for row in rows:
+                    self._fail(row, f"write failed: {e}")
+                return
+            # Unordered writes: everything but the reported operations went through
+            failed = {error["index"] for error in write_errors}
+            for error in write_errors:
+                self._fail(rows[error["index"]], _write_error_message(error))
+            self.report["inserted"] += details.get("nInserted", 0) + details.get("nUpserted", 0)
+            self.report["updated"] += details.get("nMatched", 0)
+        if self.on_written is not None:
+            self.on_written([doc for i, (_, doc) in enumerate(documents) if i not in failed])
+
+    async def run(self, rows: AsyncIterator[Tuple[int, Any]]) -> Dict[str, Any]:
+        pending_write: Optional[asyncio.Task] = None
+        batch: List[Tuple[int, Any]] = []
+
+        async def flush(batch):
+            nonlocal pending_write
+            documents = self._validate(batch)
+            # Parse the next batch while this one is being written
+            if pending_write is not None:
+                await pending_write
+            pending_write = asyncio.ensure_future(self._write(documents))
+
+        try:
+            async for row in rows:
+                self.report["received"] += 1
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    await flush(batch)
+                    batch = []
+            if batch:
+                await flush(batch)
+            if pending_write is not None:
+                await pending_write
+        except BaseException:
+            if pending_write is not None:
+                pending_write.cancel()
+            raise
+        return self.report
@@ -0,0 +1,146 @@
+"""Streaming exports of a Mongo cursor as CSV, NDJSON or Parquet.
+
+Rows are pulled from the async cursor batch by batch and encoded as they
+arrive, so an export of any size holds only one batch (one Parquet row group)
+in memory at a time.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportUnavailable(RuntimeError):
+    """The requested format needs an optional dependency that is not installed"""
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+async def _batches(cursor, size: int) -> AsyncIterator[List[Dict]]:
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def export_csv(cursor, fields: Sequence[str], batch_size: int = 1000) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for batch in _batches(cursor, batch_size):
+        for doc in batch:
+            writer.writerow(["" if doc.get(f) is None else _plain(doc.get(f)) for f in fields])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header only: the cursor was empty
+        yield buffer.getvalue().encode()
+
+
+async def export_ndjson(cursor, fields: Sequence[str], batch_size: int = 1000) -> AsyncIterator[bytes]:
+    async for batch in _batches(cursor, batch_size):
+        yield "".join(
+            json.dumps({f: doc.get(f) for f in fields}, default=str) + "\n" for doc in batch
+        ).encode()
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands out whatever was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _arrow_type(pa, values: List[Any]):
+    """Column type from its first non-null value: bool, float64 (any number) or string"""
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return pa.bool_()
+        if isinstance(value, (int, float)):
+            return pa.float64()
+        break
+    return pa.string()
+
+
+def _coerce(pa, arrow_type, values: List[Any]) -> List[Any]:
+    # Values that do not fit the column type become nulls rather than failing the export
+    if pa.types.is_boolean(arrow_type):
+        return [v if isinstance(v, bool) else None for v in values]
+    if pa.types.is_floating(arrow_type):
+        return [float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else None for v in values]
+    return [None if v is None else str(v) for v in values]
+
+
+async def export_parquet(cursor, fields: Sequence[str], batch_size: int = 10000) -> AsyncIterator[bytes]:
+    """One Parquet row group per cursor batch; the schema is fixed by the first batch"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportUnavailable("Parquet export requires pyarrow")
+
+    sink = _Sink()
+    writer = None
+    schema = None
+    async for batch in _batches(cursor, batch_size):
+        columns = {f: [_plain(doc.get(f)) for doc in batch] for f in fields}
+        if schema is None:
+            schema = pa.schema([(f, _arrow_type(pa, columns[f])) for f in fields])
+            writer = pq.ParquetWriter(sink, schema)
+        columns = {f: _coerce(pa, schema.field(f).type, columns[f]) for f in fields}
+        writer.write_table(pa.table(columns, schema=schema))
+        yield sink.drain()
+    if writer is None:
+        writer = pq.ParquetWriter(sink, pa.schema([(f, pa.string()) for f in fields]))
+    writer.close()
+    yield sink.drain()
+
+
+EXPORTERS = {"csv": export_csv, "ndjson": export_ndjson, "parquet": export_parquet}
+
+
+def ensure_available(fmt: str):
+    """Fail before the response starts if the format cannot be produced"""
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ExportUnavailable("Parquet export requires pyarrow")
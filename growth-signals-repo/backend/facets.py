@@ -0,0 +1,302 @@
+"""Facet counts over leads from in-memory bitmap indexes.
+
+Every indexed document gets a slot number; for each dimension value (a
+role, a priority, a region ...) a bitmap holds the slots of the documents
+having it. A filter is the AND of its dimensions' bitmaps (OR across the
+values given for one dimension) and a facet count is the popcount of a value
+bitmap ANDed with the filter, so counting never touches the documents.
+
+Bitmaps are split into 64K-slot chunks (as in Roaring bitmaps) of uint64
+words: empty chunks are not stored, an update flips one bit in place, and
+intersections and popcounts run over whole chunks in numpy. Freed slots are
+reused so the slot space stays dense.
+"""
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK_SIZE - 1
+CHUNK_WORDS = CHUNK_SIZE // 64
+
+if hasattr(np, "bitwise_count"):
+    def _row_popcounts(words: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:  # numpy < 2.0
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _row_popcounts(words: np.ndarray) -> np.ndarray:
+        return _BYTE_COUNTS[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def _popcount(words: np.ndarray) -> int:
+    return int(_row_popcounts(words))
+
+
+class Bitmap:
+    """Set of non-negative ints as 64K-bit chunks of uint64 words; absent chunks are empty"""
+
+    __slots__ = ("chunks", "_size")
+
+    def __init__(self, chunks: Optional[Dict[int, np.ndarray]] = None):
+        self.chunks = chunks if chunks is not None else {}
+        self._size: Optional[int] = None if chunks else 0
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[int]) -> "Bitmap":
+        positions = np.unique(np.fromiter(positions, dtype=np.int64))
+        chunks = {}
+        for key in np.unique(positions >> CHUNK_BITS).tolist():
+            bits = np.zeros(CHUNK_SIZE, dtype=bool)
+            in_chunk = positions[(positions >> CHUNK_BITS) == key]
+            bits[in_chunk & CHUNK_MASK] = True
+            chunks[key] = np.packbits(bits, bitorder="little").view(np.uint64)
+        bitmap = cls(chunks)
+        bitmap._size = len(positions)
+        return bitmap
+
+    def add(self, position: int):
+        key, offset = position >> CHUNK_BITS, position & CHUNK_MASK
+        words = self.chunks.get(key)
+        if words is None:
+            words = self.chunks[key] = np.zeros(CHUNK_WORDS, dtype=np.uint64)
+        bit = np.uint64(1 << (offset & 63))
+        if not words[offset >> 6] & bit:
+            words[offset >> 6] |= bit
+            if self._size is not None:
+                self._size += 1
+
+    def discard(self, position: int):
+        key, offset = position >> CHUNK_BITS, position & CHUNK_MASK
+        words = self.chunks.get(key)
+        bit = np.uint64(1 << (offset & 63))
+        if words is None or not words[offset >> 6] & bit:
+            return
+        words[offset >> 6] &= ~bit
+        if self._size is not None:
+            self._size -= 1
+        if not words.any():
+            del self.chunks[key]
+
+    def __contains__(self, position: int) -> bool:
+        words = self.chunks.get(position >> CHUNK_BITS)
+        offset = position & CHUNK_MASK
+        return words is not None and bool(words[offset >> 6] & np.uint64(1 << (offset & 63)))
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        small, large = sorted((self.chunks, other.chunks), key=len)
+        chunks = {}
+        for key, words in small.items():
+            if key in large:
+                both = words & large[key]
+                if both.any():
+                    chunks[key] = both
+        return Bitmap(chunks)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        chunks = dict(self.chunks)
+        for key, words in other.chunks.items():
+            chunks[key] = chunks[key] | words if key in chunks else words.copy()
+        return Bitmap(chunks)
+
+    def count(self) -> int:
+        if self._size is None:
+            self._size = sum(_popcount(words) for words in self.chunks.values())
+        return self._size
+
+    def count_and(self, other: "Bitmap") -> int:
+        """``(self & other).count()`` without keeping the intersection"""
+        small, large = sorted((self.chunks, other.chunks), key=len)
+        return sum(_popcount(words & large[key]) for key, words in small.items() if key in large)
+
+    @staticmethod
+    def count_each_and(bitmaps: Sequence["Bitmap"], other: "Bitmap") -> List[int]:
+        """``[(b & other).count() for b in bitmaps]``, one vectorized pass per chunk of ``other``"""
+        counts = np.zeros(len(bitmaps), dtype=np.int64)
+        for key, words in other.chunks.items():
+            rows = [i for i, bitmap in enumerate(bitmaps) if key in bitmap.chunks]
+            if not rows:
+                continue
+            stacked = np.stack([bitmaps[i].chunks[key] for i in rows])
+            stacked &= words
+            counts[rows] += _row_popcounts(stacked)
+        return counts.tolist()
+
+    def positions(self) -> np.ndarray:
+        """Set positions, ascending"""
+        parts = [
+            np.flatnonzero(np.unpackbits(self.chunks[key].view(np.uint8), bitorder="little")) + (key << CHUNK_BITS)
+            for key in sorted(self.chunks)
+        ]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+Extractor = Callable[[Mapping], Iterable[Optional[str]]]
+
+
+class FacetIndex:
+    """Bitmap indexes over a set of documents, one per dimension value.
+
+    ``dimensions`` maps a dimension name to a function returning the
+    document's values for it (several for multi-valued fields). Documents
+    are identified by ``key(document)``; ``upsert`` and ``remove`` keep the
+    bitmaps current as documents change.
+    """
+
+    def __init__(self, dimensions: Dict[str, Extractor], key: Callable[[Mapping], Hashable]):
+        self.dimensions = dimensions
+        self.key = key
+        self.built_at = time.monotonic()
+        self._slots: Dict[Hashable, int] = {}
+        self._values: List[Optional[Dict[str, tuple]]] = []
+        # Key of the document in each slot
+        self._keys: List[Optional[Hashable]] = []
+        self._free: List[int] = []
+        self._all = Bitmap()
+        self._bitmaps: Dict[str, Dict[str, Bitmap]] = {name: {} for name in dimensions}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _extract(self, document: Mapping) -> Dict[str, tuple]:
+        return {
+            name: tuple({value for value in extract(document) if value})
+            for name, extract in self.dimensions.items()
+        }
+
+    def load(self, documents: Iterable[Mapping]):
+        """Index many documents at once: each touched bitmap chunk is
+        rewritten once per call rather than once per document"""
+        positions: Dict[str, Dict[str, List[int]]] = {name: {} for name in self.dimensions}
+        added: List[int] = []
+        seen: List[Mapping] = []
+        with self._lock:
+            for document in documents:
+                key = self.key(document)
+                if key in self._slots:
+                    # Already indexed (or repeated in this batch): update it afterwards
+                    seen.append(document)
+                    continue
+                slot = self._slots[key] = len(self._values)
+                values = self._extract(document)
+                self._values.append(values)
+                self._keys.append(key)
+                added.append(slot)
+                for name, dimension_values in values.items():
+                    for value in dimension_values:
+                        positions[name].setdefault(value, []).append(slot)
+            for name, by_value in positions.items():
+                bitmaps = self._bitmaps[name]
+                for value, slots in by_value.items():
+                    bitmap = Bitmap.from_positions(slots)
+                    bitmaps[value] = bitmaps[value] | bitmap if value in bitmaps else bitmap
+            self._all = self._all | Bitmap.from_positions(added)
+            for document in seen:
+                self.upsert(document)
+
+    def upsert(self, document: Mapping):
+        with self._lock:
+            key = self.key(document)
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._free.pop() if self._free else len(self._values)
+                if slot == len(self._values):
+                    self._values.append(None)
+                    self._keys.append(None)
+                self._slots[key] = slot
+                self._keys[slot] = key
+                self._all.add(slot)
+            else:
+                self._unset(slot)
+            values = self._values[slot] = self._extract(document)
+            for name, dimension_values in values.items():
+                bitmaps = self._bitmaps[name]
+                for value in dimension_values:
+                    bitmap = bitmaps.get(value)
+                    if bitmap is None:
+                        bitmap = bitmaps[value] = Bitmap()
+                    bitmap.add(slot)
+
+    def remove(self, document: Mapping):
+        with self._lock:
+            slot = self._slots.pop(self.key(document), None)
+            if slot is None:
+                return
+            self._unset(slot)
+            self._values[slot] = None
+            self._keys[slot] = None
+            self._all.discard(slot)
+            self._free.append(slot)
+
+    def _unset(self, slot: int):
+        for name, dimension_values in (self._values[slot] or {}).items():
+            bitmaps = self._bitmaps[name]
+            for value in dimension_values:
+                bitmap = bitmaps[value]
+                bitmap.discard(slot)
+                if not bitmap.chunks:
+                    del bitmaps[value]
+
+    def _matching(self, name: str, wanted: Sequence[str]) -> Bitmap:
+        """OR of the bitmaps of the wanted values of a dimension (case-insensitive)"""
+        wanted = {value.lower() for value in wanted}
+        result = Bitmap()
+        for value, bitmap in self._bitmaps[name].items():
+            if value.lower() in wanted:
+                result = result | bitmap
+        return result
+
+    def filter(self, filters: Mapping[str, Sequence[str]]) -> Bitmap:
+        result = self._all
+        for name, wanted in filters.items():
+            if wanted:
+                result = result & self._matching(name, wanted)
+        return result
+
+    def values(self, name: str) -> List[str]:
+        """The distinct values of a dimension"""
+        with self._lock:
+            return list(self._bitmaps[name])
+
+    def keys(self, filters: Mapping[str, Sequence[str]]) -> List[Hashable]:
+        """Keys of the documents matching ``filters``"""
+        with self._lock:
+            return [self._keys[slot] for slot in self.filter(filters).positions().tolist()]
+
+    def counts(self, filters: Mapping[str, Sequence[str]], dimensions: Optional[Sequence[str]] = None,
+               limit: int = 20) -> Dict[str, object]:
+        """Matching total and, per dimension, the ``limit`` most frequent values among matches"""
+        with self._lock:
+            selected = self.filter(filters)
+            total = selected.count()
+            dimensions = dimensions or tuple(self.dimensions)
+            if selected is self._all:
+                # No filter: bitmap cardinalities are the counts
+                tallies = {
+                    name: [(value, bitmap.count()) for value, bitmap in self._bitmaps[name].items()]
+                    for name in dimensions
+                }
+            elif total * len(dimensions) < len(selected.chunks) * sum(len(self._bitmaps[n]) for n in dimensions):
+                # Few matches relative to the bitmaps to intersect (one chunk of
+                # one bitmap costs about one tallied value): tally their values
+                tallies = {name: Counter() for name in dimensions}
+                for slot in selected.positions().tolist():
+                    values = self._values[slot]
+                    for name in dimensions:
+                        tallies[name].update(values[name])
+                tallies = {name: list(counter.items()) for name, counter in tallies.items()}
+            else:
+                tallies = {}
+                for name in dimensions:
+                    values, bitmaps = list(self._bitmaps[name]), list(self._bitmaps[name].values())
+                    tallies[name] = list(zip(values, Bitmap.count_each_and(bitmaps, selected)))
+            facets = {
+                name: dict(sorted((c for c in counts if c[1]), key=lambda c: (-c[1], c[0]))[:limit])
+                for name, counts in tallies.items()
+            }
+            return {"total": total, "facets": facets}
@@ -0,0 +1,58 @@
+"""Single JSON encoding path for API responses.
+
+Uses orjson when it is installed (datetime and numpy natively, ObjectId via
+``default``) and falls back to the stdlib encoder with the same conversions.
+Either way raw Mongo documents, with their ``_id`` and datetime fields, can
+be returned without converting them first.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def _convert(obj: Any) -> Any:
+    """Values neither encoder handles on its own"""
+    # bson.ObjectId and other id/hash types: their str() is the canonical form
+    if type(obj).__name__ in ("ObjectId", "UUID", "Binary"):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class CustomJSONEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        return _convert(obj)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_convert, option=_OPTIONS)
+else:
+    def dumps(content: Any) -> bytes:
+        return json.dumps(
+            content, cls=CustomJSONEncoder, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through ``dumps``"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
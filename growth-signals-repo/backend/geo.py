@@ -0,0 +1,280 @@
+"""Geography normalization and hierarchical location keys.
+
+Free-text geographies ("San Francisco, CA", "London, UK", "Remote - Canada")
+are parsed into city / state / country / region when a lead is written. Each
+lead also stores ``geo_keys``: one key per level of the hierarchy it belongs
+to, e.g.::
+
+    ["region:north-america", "country:us", "state:us-ca", "city:us-ca:san-francisco"]
+
+With a multikey index on ``geo_keys``, a geography filter at any level
+("North America", "USA", "California", "San Francisco, CA", "SF") resolves
+to a single key (or, for groupings such as "EMEA", a few) and becomes an
+indexed lookup instead of a regex scan.
+"""
+import re
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+REGIONS = {
+    "north-america": "North America",
+    "latin-america": "Latin America",
+    "europe": "Europe",
+    "middle-east-africa": "Middle East & Africa",
+    "asia-pacific": "Asia Pacific",
+}
+
+# Alternative names for regions
+REGION_ALIASES = {
+    "na": "north-america", "north america": "north-america", "americas": "north-america",
+    "latam": "latin-america", "latin america": "latin-america", "south america": "latin-america",
+    "europe": "europe", "eu": "europe", "western europe": "europe",
+    "middle east": "middle-east-africa", "africa": "middle-east-africa",
+    "mea": "middle-east-africa", "middle east & africa": "middle-east-africa",
+    "apac": "asia-pacific", "asia": "asia-pacific", "asia pacific": "asia-pacific", "asia-pacific": "asia-pacific",
+    "oceania": "asia-pacific",
+}
+
+# Names that span several regions: a lead in either matches a filter on them.
+# A lead located in one is placed in the first.
+REGION_GROUPS = {
+    "emea": ("europe", "middle-east-africa"),
+}
+
+# ISO code -> (name, region)
+COUNTRIES = {
+    "us": ("United States", "north-america"), "ca": ("Canada", "north-america"),
+    "mx": ("Mexico", "latin-america"), "br": ("Brazil", "latin-america"), "ar": ("Argentina", "latin-america"),
+    "cl": ("Chile", "latin-america"), "co": ("Colombia", "latin-america"), "pe": ("Peru", "latin-america"),
+    "gb": ("United Kingdom", "europe"), "ie": ("Ireland", "europe"), "fr": ("France", "europe"),
+    "de": ("Germany", "europe"), "nl": ("Netherlands", "europe"), "be": ("Belgium", "europe"),
+    "es": ("Spain", "europe"), "pt": ("Portugal", "europe"), "it": ("Italy", "europe"),
+    "ch": ("Switzerland", "europe"), "at": ("Austria", "europe"), "se": ("Sweden", "europe"),
+    "no": ("Norway", "europe"), "dk": ("Denmark", "europe"), "fi": ("Finland", "europe"),
+    "pl": ("Poland", "europe"), "ee": ("Estonia", "europe"), "cz": ("Czech Republic", "europe"),
+    "ua": ("Ukraine", "europe"), "ro": ("Romania", "europe"), "gr": ("Greece", "europe"),
+    "il": ("Israel", "middle-east-africa"), "ae": ("United Arab Emirates", "middle-east-africa"),
+    "sa": ("Saudi Arabia", "middle-east-africa"), "tr": ("Turkey", "middle-east-africa"),
+    "eg": ("Egypt", "middle-east-africa"), "za": ("South Africa", "middle-east-africa"),
+    "ng": ("Nigeria", "middle-east-africa"), "ke": ("Kenya", "middle-east-africa"),
+    "in": ("India", "asia-pacific"), "cn": ("China", "asia-pacific"), "jp": ("Japan", "asia-pacific"),
+    "kr": ("South Korea", "asia-pacific"), "sg": ("Singapore", "asia-pacific"), "hk": ("Hong Kong", "asia-pacific"),
+    "tw": ("Taiwan", "asia-pacific"), "id": ("Indonesia", "asia-pacific"), "vn": ("Vietnam", "asia-pacific"),
+    "ph": ("Philippines", "asia-pacific"), "th": ("Thailand", "asia-pacific"), "my": ("Malaysia", "asia-pacific"),
+    "au": ("Australia", "asia-pacific"), "nz": ("New Zealand", "asia-pacific"),
+}
+
+# Names and abbreviations that are not simply the country name
+COUNTRY_ALIASES = {
+    "usa": "us", "u.s": "us", "u.s.a": "us", "united states of america": "us", "america": "us",
+    "uk": "gb", "u.k": "gb", "england": "gb", "scotland": "gb", "wales": "gb", "great britain": "gb",
+    "uae": "ae", "holland": "nl", "the netherlands": "nl", "deutschland": "de", "korea": "kr",
+    "czechia": "cz",
+}
+
+# Country -> {state code: state name}
+STATES = {
+    "us": {
+        "al": "Alabama", "ak": "Alaska", "az": "Arizona", "ar": "Arkansas", "ca": "California",
+        "co": "Colorado", "ct": "Connecticut", "de": "Delaware", "dc": "District of Columbia",
+        "fl": "Florida", "ga": "Georgia", "hi": "Hawaii", "id": "Idaho", "il": "Illinois", "in": "Indiana",
+        "ia": "Iowa", "ks": "Kansas", "ky": "Kentucky", "la": "Louisiana", "me": "Maine", "md": "Maryland",
+        "ma": "Massachusetts", "mi": "Michigan", "mn": "Minnesota", "ms": "Mississippi", "mo": "Missouri",
+        "mt": "Montana", "ne": "Nebraska", "nv": "Nevada", "nh": "New Hampshire", "nj": "New Jersey",
+        "nm": "New Mexico", "ny": "New York", "nc": "North Carolina", "nd": "North Dakota", "oh": "Ohio",
+        "ok": "Oklahoma", "or": "Oregon", "pa": "Pennsylvania", "ri": "Rhode Island", "sc": "South Carolina",
+        "sd": "South Dakota", "tn": "Tennessee", "tx": "Texas", "ut": "Utah", "vt": "Vermont",
+        "va": "Virginia", "wa": "Washington", "wv": "West Virginia", "wi": "Wisconsin", "wy": "Wyoming",
+    },
+    "ca": {
+        "ab": "Alberta", "bc": "British Columbia", "mb": "Manitoba", "nb": "New Brunswick",
+        "nl": "Newfoundland and Labrador", "ns": "Nova Scotia", "on": "Ontario", "pe": "Prince Edward Island",
+        "qc": "Quebec", "sk": "Saskatchewan", "nt": "Northwest Territories", "nu": "Nunavut", "yt": "Yukon",
+    },
+}
+
+# Well-known cities, so "Toronto" alone resolves like "Toronto, ON": name -> (country, state)
+CITIES = {
+    "san francisco": ("us", "ca"), "los angeles": ("us", "ca"),
+    "san jose": ("us", "ca"), "palo alto": ("us", "ca"), "mountain view": ("us", "ca"),
+    "menlo park": ("us", "ca"), "san diego": ("us", "ca"), "oakland": ("us", "ca"),
+    "new york": ("us", "ny"), "brooklyn": ("us", "ny"),
+    "boston": ("us", "ma"), "cambridge": ("us", "ma"), "seattle": ("us", "wa"), "austin": ("us", "tx"),
+    "dallas": ("us", "tx"), "houston": ("us", "tx"), "chicago": ("us", "il"), "denver": ("us", "co"),
+    "boulder": ("us", "co"), "miami": ("us", "fl"), "atlanta": ("us", "ga"), "washington": ("us", "dc"),
+    "philadelphia": ("us", "pa"), "pittsburgh": ("us", "pa"), "phoenix": ("us", "az"),
+    "salt lake city": ("us", "ut"), "portland": ("us", "or"), "nashville": ("us", "tn"),
+    "raleigh": ("us", "nc"), "minneapolis": ("us", "mn"), "detroit": ("us", "mi"),
+    "toronto": ("ca", "on"), "vancouver": ("ca", "bc"), "montreal": ("ca", "qc"), "waterloo": ("ca", "on"),
+    "london": ("gb", None), "manchester": ("gb", None), "edinburgh": ("gb", None), "dublin": ("ie", None),
+    "paris": ("fr", None), "berlin": ("de", None), "munich": ("de", None), "amsterdam": ("nl", None),
+    "stockholm": ("se", None), "copenhagen": ("dk", None), "helsinki": ("fi", None), "madrid": ("es", None),
+    "barcelona": ("es", None), "lisbon": ("pt", None), "zurich": ("ch", None), "tallinn": ("ee", None),
+    "tel aviv": ("il", None), "dubai": ("ae", None), "bengaluru": ("in", None),
+    "mumbai": ("in", None), "singapore": ("sg", None), "hong kong": ("hk", None), "tokyo": ("jp", None),
+    "seoul": ("kr", None), "sydney": ("au", None), "melbourne": ("au", None), "sao paulo": ("br", None),
+    "mexico city": ("mx", None), "buenos aires": ("ar", None), "lagos": ("ng", None), "nairobi": ("ke", None),
+}
+
+# Other names of the cities above -> their canonical name, so both get the same key.
+# Two-letter ones win over the state abbreviation when given alone ("LA")
+CITY_ALIASES = {
+    "sf": "san francisco", "san fran": "san francisco", "la": "los angeles",
+    "nyc": "new york", "new york city": "new york", "ny city": "new york",
+    "bangalore": "bengaluru", "washington dc": "washington", "washington d.c": "washington",
+}
+
+
+def _norm(text: str) -> str:
+    # Lowercase, accents stripped ("São Paulo" -> "sao paulo"), whitespace collapsed
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return " ".join(text.lower().split()).strip(" .")
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", _norm(text)).strip("-")
+
+
+_COUNTRY_NAMES = {_norm(name): code for code, (name, _) in COUNTRIES.items()}
+_COUNTRY_NAMES.update(COUNTRY_ALIASES)
+_STATE_NAMES: Dict[str, Tuple[str, str]] = {
+    _norm(name): (country, code) for country, states in STATES.items() for code, name in states.items()
+}
+
+
+class Location(NamedTuple):
+    city: Optional[str] = None
+    state: Optional[str] = None  # "CA"
+    country: Optional[str] = None  # ISO code, "us"
+    region: Optional[str] = None  # region slug, "north-america"
+
+    def keys(self) -> List[str]:
+        """Hierarchy keys, broadest first"""
+        keys = []
+        if self.region:
+            keys.append(f"region:{self.region}")
+        if self.country:
+            keys.append(f"country:{self.country}")
+        if self.state:
+            keys.append(f"state:{self.country}-{self.state.lower()}")
+        if self.city:
+            parent = f"{self.country}-{self.state.lower()}" if self.state else self.country or ""
+            keys.append(f"city:{parent}:{_slug(self.city)}")
+        return keys
+
+    def fields(self) -> Dict[str, Optional[str]]:
+        """Denormalized display fields stored on the lead"""
+        return {
+            "city": self.city,
+            "state": self.state,
+            "country": COUNTRIES[self.country][0] if self.country else None,
+            "region": REGIONS[self.region] if self.region else None,
+        }
+
+
+def _country(part: str) -> Optional[str]:
+    """ISO code of a country name, alias or code"""
+    part = _norm(part)
+    if part in _COUNTRY_NAMES:
+        return _COUNTRY_NAMES[part]
+    if part in COUNTRIES:
+        return part
+    return None
+
+
+def _means_country(part: str, city: Optional[str]) -> bool:
+    """Whether a country name or code is meant as the country. A code that is also a
+    state abbreviation ("DE", "IN", "CA") is the state unless the city before it is
+    known to be in that country ("Berlin, DE", but "Dover, DE")."""
+    part = _norm(part)
+    if not any(part in states for states in STATES.values()):
+        return True
+    known = CITIES.get(_city(_norm(city))) if city else None
+    return known is not None and known[0] == part
+
+
+def _state(part: str, country: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(country, state code) for a state name or abbreviation"""
+    part = _norm(part)
+    if part in _STATE_NAMES and (country is None or _STATE_NAMES[part][0] == country):
+        return _STATE_NAMES[part]
+    # Two-letter abbreviations are ambiguous ("CA"); prefer the given country, else the US
+    for candidate in ([country] if country else ["us", "ca"]):
+        if part in STATES.get(candidate, {}):
+            return candidate, part
+    return None
+
+
+def _city(part: str) -> str:
+    """Canonical name of a city"""
+    return CITY_ALIASES.get(part, part)
+
+
+def _complete(city: Optional[str], state: Optional[str], country: Optional[str]) -> Location:
+    known = CITIES.get(_norm(city)) if city else None
+    if known and country in (None, known[0]) and state in (None, known[1]):
+        country, state = known
+    region = COUNTRIES[country][1] if country else None
+    return Location(city, state.upper() if state else None, country, region)
+
+
+def parse(geography: Optional[str]) -> Location:
+    """Best-effort city / state / country / region of a free-text geography"""
+    if not geography:
+        return Location()
+    text = _norm(re.sub(r"\((.*?)\)", r", \1", geography))
+    if text in REGION_ALIASES:
+        return Location(region=REGION_ALIASES[text])
+    if text in REGION_GROUPS:
+        return Location(region=REGION_GROUPS[text][0])
+    parts = [p.strip() for p in re.split(r"[,/|;]| - ", text) if p.strip() and p.strip() != "remote"]
+    parts = [p[len("remote "):] if p.startswith("remote ") else p for p in parts]
+
+    city = state = country = None
+    region = None
+    # Read from the end: "<city>, <state>, <country>"
+    while parts:
+        part = parts[-1]
+        if len(parts) == 1 and country is None and state is None and part in CITY_ALIASES:
+            # A lone "LA" is the city, not Louisiana
+            break
+        before = parts[-2] if len(parts) > 1 else None
+        if country is None and state is None and _country(part) and _means_country(part, before):
+            country = _country(part)
+        elif state is None and _state(part, country):
+            country, state = _state(part, country)
+        elif region is None and country is None and state is None and part in REGION_ALIASES:
+            region = REGION_ALIASES[part]
+        else:
+            break
+        parts.pop()
+    if parts:
+        city = _city(parts[-1]).title()
+    location = _complete(city, state, country)
+    if location.region is None and region is not None:
+        location = location._replace(region=region)
+    if location.country is None and location.region is None:
+        # Nothing recognized; do not guess a city either
+        return Location()
+    return location
+
+
+def filter_keys(query: Optional[str]) -> List[str]:
+    """The geo keys a geography filter resolves to; a lead matches if it has any.
+
+    That is the filter's most specific level, or each region of a grouping
+    such as "EMEA"; empty when nothing is recognized.
+    """
+    text = _norm(query or "")
+    if text in REGION_GROUPS:
+        return [f"region:{region}" for region in REGION_GROUPS[text]]
+    keys = parse(query).keys()
+    return keys[-1:]
+
+
+def annotate(document: Dict) -> Dict:
+    """Add parsed location fields and ``geo_keys`` to a lead document in place"""
+    location = parse(document.get("geography"))
+    document.update(location.fields())
+    document["geo_keys"] = location.keys()
+    return document
@@ -0,0 +1,155 @@
+"""Event-loop health: scheduling lag and blocking-call detection.
+
+A task on the loop sleeps for ``interval`` and records how late it wakes up
+(the scheduling lag every other coroutine sees too). A watchdog thread
+notices when that heartbeat is overdue by more than ``threshold`` and
+captures the loop thread's stack at that moment - the code holding the
+loop, e.g. a sync client call or a large encode inside a coroutine.
+
+Lag percentiles over the recent window and block counts are exported
+through /api/metrics; the most recent blocking stacks (collapsed format,
+as in profiling.py) are listed at /api/admin/loop/blocks.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from fastapi import APIRouter, FastAPI, Request
+
+import metrics
+from profiling import check_admin, collapse
+
+
+def enabled() -> bool:
+    return os.environ.get("LOOP_MONITOR_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class LoopMonitor:
+    """Measures lag of the running event loop and records stacks of blocking calls"""
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, window: int = 1200, keep: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags: Deque[float] = deque(maxlen=window)
+        self.blocks: Deque[Dict] = deque(maxlen=keep)
+        self.blocked_total = 0
+        self._expected = float("inf")
+        self._reported = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._lock = threading.Lock()
+
+    def start(self) -> "LoopMonitor":
+        """Start monitoring the running loop (call from a coroutine on it)"""
+        self._loop_thread = threading.get_ident()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._watchdog.start()
+        return self
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._watchdog.join()
+
+    async def _tick(self):
+        while True:
+            expected = self._expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - expected, 0.0)
+            self._expected = float("inf")
+            with self._lock:
+                self.lags.append(lag * 1000)
+                if lag >= self.threshold:
+                    self.blocked_total += 1
+                    if self.blocks and self.blocks[-1]["expected"] == expected:
+                        # The watchdog caught this block; record how long it really lasted
+                        self.blocks[-1]["blocked_ms"] = round(lag * 1000, 1)
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold / 4):
+            expected = self._expected
+            overdue = time.monotonic() - expected
+            if overdue < self.threshold or expected == self._reported:
+                continue
+            self._reported = expected
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = collapse(frame)
+            del frame
+            with self._lock:
+                self.blocks.append({
+                    "at": datetime.utcnow().isoformat(),
+                    "expected": expected,
+                    "blocked_ms": round(overdue * 1000, 1),
+                    "stack": stack,
+                })
+            logging.warning(
+                f"Event loop blocked for {overdue * 1000:.0f}+ ms in {' <- '.join(reversed(stack.split(';')[-3:]))}"
+            )
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            ordered = sorted(self.lags)
+            blocked = self.blocked_total
+        return {
+            "loop.lag_ms.p50": round(percentile(ordered, 0.5), 2),
+            "loop.lag_ms.p90": round(percentile(ordered, 0.9), 2),
+            "loop.lag_ms.p99": round(percentile(ordered, 0.99), 2),
+            "loop.lag_ms.max": round(ordered[-1], 2) if ordered else 0.0,
+            "loop.blocked_total": blocked,
+        }
+
+    def recent_blocks(self) -> List[Dict]:
+        with self._lock:
+            return [{k: v for k, v in block.items() if k != "expected"} for block in reversed(self.blocks)]
+
+
+_monitor: Optional[LoopMonitor] = None
+
+metrics.register_collector(lambda: _monitor.stats() if _monitor is not None else {})
+
+
+def install(app: FastAPI, router: APIRouter):
+    """Run the monitor for the app's lifetime and register the admin endpoint"""
+    interval = float(os.environ.get("LOOP_MONITOR_INTERVAL_MS", "50")) / 1000
+    threshold = float(os.environ.get("LOOP_BLOCK_THRESHOLD_MS", "100")) / 1000
+
+    async def start_monitor():
+        global _monitor
+        _monitor = LoopMonitor(interval, threshold).start()
+        logging.info(f"Event loop monitor started (blocking threshold {threshold * 1000:.0f} ms)")
+
+    async def stop_monitor():
+        if _monitor is not None:
+            await _monitor.stop()
+
+    app.add_event_handler("startup", start_monitor)
+    app.add_event_handler("shutdown", stop_monitor)
+
+    @router.get("/admin/loop/blocks")
+    async def loop_blocks(request: Request):
+        """Most recent blocking calls seen on the event loop, newest first"""
+        check_admin(request)
+        if _monitor is None:
+            return {"blocks": [], "stats": {}}
+        return {"blocks": _monitor.recent_blocks(), "stats": _monitor.stats()}
@@ -0,0 +1,169 @@
+"""Allocation tracking per endpoint (debug only, off by default).
+
+With MEMPROFILE_ENABLED set, tracemalloc is started and a sample of requests
+(MEMPROFILE_SAMPLE_RATE) is measured: peak traced memory above the level at
+the start of the request, and the net number of allocated blocks. Results
+are aggregated per route and exported through /api/metrics. Admin routes
+(guarded by ADMIN_TOKEN) expose the top allocation sites and a diff against a
+stored heap snapshot. Concurrent requests share the process heap, so sampled
+figures are upper bounds.
+"""
+import logging
+import os
+import random
+import sys
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import APIRouter, FastAPI, Query, Request
+
+import metrics
+from profiling import check_admin
+
+
+def enabled() -> bool:
+    return os.environ.get("MEMPROFILE_ENABLED", "").lower() in ("1", "true", "yes")
+
+
+_measure_lock = threading.Lock()
+
+
+def measure(fn: Callable[[], Any]) -> Tuple[Any, int, int]:
+    """Run ``fn`` and return (result, peak bytes allocated above the start level, net blocks allocated)"""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        with _measure_lock:
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            blocks = sys.getallocatedblocks()
+            result = fn()
+            _, peak = tracemalloc.get_traced_memory()
+            blocks = sys.getallocatedblocks() - blocks
+    finally:
+        if started:
+            tracemalloc.stop()
+    return result, max(peak - baseline, 0), blocks
+
+
+class EndpointStats:
+    __slots__ = ("samples", "peak_max", "peak_total", "blocks_total")
+
+    def __init__(self):
+        self.samples = 0
+        self.peak_max = 0
+        self.peak_total = 0
+        self.blocks_total = 0
+
+    def add(self, peak: int, blocks: int):
+        self.samples += 1
+        self.peak_max = max(self.peak_max, peak)
+        self.peak_total += peak
+        self.blocks_total += blocks
+
+    def as_dict(self) -> Dict[str, float]:
+        n = self.samples or 1
+        return {
+            "samples": self.samples,
+            "peak_kb_max": round(self.peak_max / 1024, 1),
+            "peak_kb_avg": round(self.peak_total / n / 1024, 1),
+            "blocks_avg": round(self.blocks_total / n, 1),
+        }
+
+
+_stats: Dict[str, EndpointStats] = {}
+_baseline: Optional[tracemalloc.Snapshot] = None
+
+
+def _collect() -> Dict[str, float]:
+    values = {}
+    for route, stats in _stats.items():
+        for name, value in stats.as_dict().items():
+            values[f"memory.{route}.{name}"] = value
+    if tracemalloc.is_tracing():
+        current, _ = tracemalloc.get_traced_memory()
+        values["memory.traced_kb"] = round(current / 1024, 1)
+    return values
+
+
+_NOISE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+)
+
+
+def _top(snapshot: tracemalloc.Snapshot, group_by: str, limit: int, baseline=None):
+    snapshot = snapshot.filter_traces(_NOISE)
+    if baseline is not None:
+        stats = snapshot.compare_to(baseline.filter_traces(_NOISE), group_by)
+        return [
+            {"site": str(s.traceback), "size_kb": round(s.size / 1024, 1), "size_diff_kb": round(s.size_diff / 1024, 1),
+             "count": s.count, "count_diff": s.count_diff}
+            for s in stats[:limit]
+        ]
+    return [
+        {"site": str(s.traceback), "size_kb": round(s.size / 1024, 1), "count": s.count}
+        for s in snapshot.statistics(group_by)[:limit]
+    ]
+
+
+def install(app: FastAPI, router: APIRouter):
+    """Start tracemalloc and register the sampling middleware and admin routes"""
+    sample_rate = float(os.environ.get("MEMPROFILE_SAMPLE_RATE", "0.01"))
+    tracemalloc.start(int(os.environ.get("MEMPROFILE_FRAMES", "10")))
+    metrics.register_collector(_collect)
+
+    @app.middleware("http")
+    async def sample_memory(request: Request, call_next):
+        if random.random() >= sample_rate or request.url.path.startswith("/api/admin/"):
+            return await call_next(request)
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        blocks = sys.getallocatedblocks()
+        response = await call_next(request)
+        _, peak = tracemalloc.get_traced_memory()
+        route = request.scope.get("route")
+        name = getattr(route, "path", "unmatched")
+        _stats.setdefault(name, EndpointStats()).add(max(peak - baseline, 0), sys.getallocatedblocks() - blocks)
+        return response
+
+    @router.get("/admin/memory/top")
+    async def memory_top(
+        request: Request,
+        limit: int = Query(25, ge=1, le=500),
+        group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$")
+    ):
+        """Largest live allocation sites right now"""
+        check_admin(request)
+        return {"sites": _top(tracemalloc.take_snapshot(), group_by, limit)}
+
+    @router.post("/admin/memory/snapshot")
+    async def memory_snapshot(request: Request):
+        """Store a heap snapshot to diff later ones against"""
+        global _baseline
+        check_admin(request)
+        _baseline = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        return {"traced_kb": round(current / 1024, 1), "peak_kb": round(peak / 1024, 1)}
+
+    @router.get("/admin/memory/diff")
+    async def memory_diff(
+        request: Request,
+        limit: int = Query(25, ge=1, le=500),
+        group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$")
+    ):
+        """Allocation sites that grew the most since the stored snapshot"""
+        check_admin(request)
+        if _baseline is None:
+            return {"sites": [], "detail": "No snapshot stored; POST /api/admin/memory/snapshot first"}
+        return {"sites": _top(tracemalloc.take_snapshot(), group_by, limit, _baseline)}
+
+    @router.get("/admin/memory/endpoints")
+    async def memory_endpoints(request: Request):
+        """Per-endpoint peak memory and allocated blocks of sampled requests"""
+        check_admin(request)
+        return {route: stats.as_dict() for route, stats in sorted(_stats.items())}
+
+    logging.info(f"Memory profiling enabled (sampling {sample_rate:.1%} of requests)")
@@ -0,0 +1,431 @@
+"""In-memory stand-in for the Motor database.
+
+Used when MONGO_URL is not configured so the API still boots and serves
+(fallback data, and anything written during the process lifetime). Supports
+the subset of the Motor collection API the server uses.
+"""
+import heapq
+import re
+import uuid
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+DUPLICATE_KEY = 11000
+
+
+# _get_path's result for a field the document does not have, where that
+# differs from an explicit None ($exists)
+_MISSING = object()
+
+
+def _get_path(doc: Dict, path: str, missing: Any = None):
+    value: Any = doc
+    for part in path.split("."):
+        if isinstance(value, dict):
+            if part not in value:
+                return missing
+            value = value[part]
+        elif isinstance(value, list):
+            value = [v.get(part) for v in value if isinstance(v, dict)]
+        else:
+            return missing
+    return value
+
+
+def _candidates(value) -> List:
+    # Like Mongo, a condition on an array field matches any of its elements
+    return value if isinstance(value, list) else [value]
+
+
+def _match_condition(value, condition) -> bool:
+    present = value is not _MISSING
+    if not present:
+        value = None  # otherwise a missing field compares like null, as in Mongo
+    if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+        for op, arg in condition.items():
+            if op == "$options":
+                continue
+            if op == "$regex":
+                flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+                pattern = re.compile(arg, flags)
+                if not any(isinstance(v, str) and pattern.search(v) for v in _candidates(value)):
+                    return False
+            elif op == "$in":
+                if not any(v in arg for v in _candidates(value)):
+                    return False
+            elif op == "$nin":
+                if any(v in arg for v in _candidates(value)):
+                    return False
+            elif op == "$ne":
+                if any(v == arg for v in _candidates(value)):
+                    return False
+            elif op == "$exists":
+                if present != bool(arg):
+                    return False
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                ok = False
+                for v in _candidates(value):
+                    try:
+                        if op == "$gt":
+                            ok = v > arg
+                        elif op == "$gte":
+                            ok = v >= arg
+                        elif op == "$lt":
+                            ok = v < arg
+                        else:
+                            ok = v <= arg
+                    except TypeError:
+                        ok = False
+                    if ok:
+                        break
+                if not ok:
+                    return False
+            else:
+                raise ValueError(f"unsupported query operator {op}")
+        return True
+    return value == condition or (isinstance(value, list) and condition in value)
+
+
+def matches(doc: Dict, query: Optional[Dict]) -> bool:
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            if not all(matches(doc, q) for q in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+        elif not _match_condition(_get_path(doc, key, _MISSING), condition):
+            return False
+    return True
+
+
+def _project(doc: Dict, projection: Optional[Dict]) -> Dict:
+    if not projection:
+        return dict(doc)
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        out = {k: doc[k] for k in include if k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        return out
+    return {k: v for k, v in doc.items() if projection.get(k, 1)}
+
+
+class MemoryCursor:
+    def __init__(self, docs: List[Dict], projection: Optional[Dict] = None):
+        self._docs = docs
+        self._projection = projection
+        self._sort: List = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction: int = 1):
+        self._sort = list(key) if isinstance(key, (list, tuple)) else [(key, direction)]
+        return self
+
+    def skip(self, n: int):
+        self._skip = n
+        return self
+
+    def limit(self, n: int):
+        self._limit = n
+        return self
+
+    def batch_size(self, n: int):
+        return self
+
+    def _results(self, length: Optional[int] = None) -> List[Dict]:
+        docs = self._docs
+        sort = self._sort
+        limits = [n for n in (self._limit, length) if n]
+        if len(sort) == 1 and limits:
+            # Top-k of a single-key sort (what an index serves in Mongo): keep
+            # only skip + limit references instead of sorting the collection
+            key, direction = sort[0]
+            k = self._skip + min(limits)
+            present = (d for d in docs if _get_path(d, key) is not None)
+            missing = [d for d in docs if _get_path(d, key) is None]
+            if direction > 0:
+                docs = (missing + heapq.nsmallest(k, present, key=lambda d: _get_path(d, key)))[:k]
+            else:
+                docs = (heapq.nlargest(k, present, key=lambda d: _get_path(d, key)) + missing)[:k]
+            sort = []
+        for key, direction in reversed(sort):
+            present = [d for d in docs if _get_path(d, key) is not None]
+            missing = [d for d in docs if _get_path(d, key) is None]
+            present.sort(key=lambda d: _get_path(d, key), reverse=direction < 0)
+            # Missing values sort lowest, as in Mongo
+            docs = missing + present if direction > 0 else present + missing
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        if length:
+            # Like a Mongo cursor, only copy the documents actually returned
+            docs = docs[:length]
+        return [_project(d, self._projection) for d in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict]:
+        return self._results(length)
+
+    def __aiter__(self):
+        self._iter = iter(self._results())
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def _unique_key(doc: Dict, fields: Tuple[str, ...]) -> Optional[Tuple]:
+    key = tuple(_get_path(doc, field) for field in fields)
+    return key if all(isinstance(value, Hashable) for value in key) else None
+
+
+def _write_error(index: int, error: Exception) -> Dict:
+    details = getattr(error, "details", None) or {}
+    return {
+        "index": index, "code": getattr(error, "code", None), "errmsg": str(error),
+        **({"keyValue": details["keyValue"]} if "keyValue" in details else {}),
+    }
+
+
+class _Operations(list):
+    """Collects pymongo write models through ``_add_to_bulk``, the hook
+    Collection.bulk_write itself uses, as ("insert", document) and
+    ("update", filter, update, upsert) tuples"""
+
+    def add_insert(self, document: Dict):
+        self.append(("insert", document))
+
+    def add_update(self, selector: Dict, update: Dict, multi: bool = False, upsert: bool = False, **kwargs):
+        if multi:
+            raise ValueError("unsupported bulk operation UpdateMany")
+        self.append(("update", selector, update, bool(upsert)))
+
+    def add_replace(self, *args, **kwargs):
+        raise ValueError("unsupported bulk operation ReplaceOne")
+
+    def add_delete(self, *args, **kwargs):
+        raise ValueError("unsupported bulk operation DeleteOne/DeleteMany")
+
+
+class Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class MemoryCollection:
+    def __init__(self, name: str):
+        self.name = name
+        self._docs: List[Dict] = []
+        # Single-field equality indexes: field -> value -> {id(doc): doc}.
+        # Array values are indexed per element (multikey), as in Mongo.
+        self._indexes: Dict[str, Dict[Any, Dict[int, Dict]]] = {}
+        # Unique indexes: field tuple -> key tuple -> the document holding it
+        self._unique: Dict[Tuple[str, ...], Dict[Tuple, Dict]] = {}
+
+    def _index_add(self, doc: Dict):
+        for field, index in self._indexes.items():
+            for value in _candidates(_get_path(doc, field)):
+                if isinstance(value, Hashable):
+                    index.setdefault(value, {})[id(doc)] = doc
+        for fields, index in self._unique.items():
+            key = _unique_key(doc, fields)
+            if key is not None:
+                index[key] = doc
+
+    def _index_remove(self, doc: Dict):
+        for field, index in self._indexes.items():
+            for value in _candidates(_get_path(doc, field)):
+                if isinstance(value, Hashable):
+                    bucket = index.get(value)
+                    if bucket is not None:
+                        bucket.pop(id(doc), None)
+        for fields, index in self._unique.items():
+            key = _unique_key(doc, fields)
+            if key is not None and index.get(key) is doc:
+                del index[key]
+
+    def _check_unique(self, doc: Dict, current: Optional[Dict] = None):
+        """Raise DuplicateKeyError, as Mongo does, if ``doc`` would repeat a
+        unique key held by a document other than ``current``"""
+        for fields, index in self._unique.items():
+            key = _unique_key(doc, fields)
+            holder = index.get(key) if key is not None else None
+            if holder is not None and holder is not current:
+                from pymongo.errors import DuplicateKeyError
+
+                key_value = dict(zip(fields, key))
+                message = f"E11000 duplicate key error collection: {self.name} dup key: {key_value}"
+                raise DuplicateKeyError(
+                    message, DUPLICATE_KEY, {"code": DUPLICATE_KEY, "errmsg": message, "keyValue": key_value}
+                )
+
+    def _scan(self, query: Optional[Dict]) -> Iterable[Dict]:
+        """Documents that may match: an index bucket when the query has an
+        equality condition on an indexed field (or on every field of a unique
+        index), else the whole collection"""
+        for key, condition in (query or {}).items():
+            index = self._indexes.get(key)
+            if index is not None and not isinstance(condition, (dict, list)):
+                return list(index.get(condition, {}).values())
+        for fields, index in self._unique.items():
+            if query and all(field in query for field in fields):
+                key = _unique_key(query, fields)  # None for operator conditions
+                if key is not None:
+                    doc = index.get(key)
+                    return [doc] if doc is not None else []
+        return self._docs
+
+    def find(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> MemoryCursor:
+        return MemoryCursor([d for d in self._scan(query) if matches(d, query)], projection)
+
+    async def find_one(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> Optional[Dict]:
+        for doc in self._scan(query):
+            if matches(doc, query):
+                return _project(doc, projection)
+        return None
+
+    async def count_documents(self, query: Optional[Dict] = None) -> int:
+        return sum(1 for d in self._scan(query) if matches(d, query))
+
+    def _prepare(self, doc: Dict) -> Dict:
+        doc = dict(doc)
+        doc.setdefault("_id", uuid.uuid4().hex)
+        return doc
+
+    async def insert_one(self, doc: Dict) -> Result:
+        doc = self._prepare(doc)
+        self._check_unique(doc)
+        self._docs.append(doc)
+        self._index_add(doc)
+        return Result(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs: Iterable[Dict], ordered: bool = True) -> Result:
+        inserted_ids = []
+        write_errors = []
+        for index, doc in enumerate(docs):
+            try:
+                inserted_ids.append((await self.insert_one(doc)).inserted_id)
+            except Exception as e:
+                if getattr(e, "code", None) != DUPLICATE_KEY:
+                    raise
+                write_errors.append(_write_error(index, e))
+                if ordered:
+                    break
+        if write_errors:
+            from pymongo.errors import BulkWriteError
+
+            raise BulkWriteError({"writeErrors": write_errors, "nInserted": len(inserted_ids)})
+        return Result(inserted_ids=inserted_ids)
+
+    async def update_one(self, query: Dict, update: Dict, upsert: bool = False) -> Result:
+        for doc in self._scan(query):
+            if matches(doc, query):
+                self._check_unique({**doc, **update.get("$set", {})}, current=doc)
+                self._index_remove(doc)
+                doc.update(update.get("$set", {}))
+                self._index_add(doc)
+                return Result(matched_count=1, modified_count=1, upserted_id=None)
+        if not upsert:
+            return Result(matched_count=0, modified_count=0, upserted_id=None)
+        doc = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+        doc.update(update.get("$setOnInsert", {}))
+        doc.update(update.get("$set", {}))
+        doc = self._prepare(doc)
+        self._check_unique(doc)
+        self._docs.append(doc)
+        self._index_add(doc)
+        return Result(matched_count=0, modified_count=0, upserted_id=doc["_id"])
+
+    async def bulk_write(self, requests: Iterable[Any], ordered: bool = True) -> Result:
+        """Apply pymongo InsertOne / UpdateOne operations"""
+        operations = _Operations()
+        for request in requests:
+            request._add_to_bulk(operations)
+        inserted = matched = modified = 0
+        upserted_ids = {}
+        write_errors = []
+        for index, (kind, *args) in enumerate(operations):
+            try:
+                if kind == "update":
+                    result = await self.update_one(*args)
+                    matched += result.matched_count
+                    modified += result.modified_count
+                    if result.upserted_id is not None:
+                        upserted_ids[index] = result.upserted_id
+                else:
+                    await self.insert_one(*args)
+                    inserted += 1
+            except Exception as e:
+                if getattr(e, "code", None) != DUPLICATE_KEY:
+                    raise
+                write_errors.append(_write_error(index, e))
+                if ordered:
+                    break
+        if write_errors:
+            from pymongo.errors import BulkWriteError
+
+            raise BulkWriteError({
+                "writeErrors": write_errors, "nInserted": inserted, "nUpserted": len(upserted_ids),
+                "nMatched": matched, "nModified": modified,
+            })
+        return Result(
+            inserted_count=inserted, matched_count=matched, modified_count=modified,
+            upserted_count=len(upserted_ids), upserted_ids=upserted_ids,
+        )
+
+    async def delete_many(self, query: Optional[Dict] = None) -> Result:
+        before = len(self._docs)
+        kept = []
+        for doc in self._docs:
+            if matches(doc, query):
+                self._index_remove(doc)
+            else:
+                kept.append(doc)
+        self._docs = kept
+        return Result(deleted_count=before - len(self._docs))
+
+    async def create_index(self, keys, unique: bool = False, **kwargs) -> str:
+        """Single-field indexes are kept for equality lookups and unique ones
+        are enforced; other compound indexes are accepted and ignored"""
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        fields = tuple(field for field, _ in keys)
+        if unique and fields not in self._unique:
+            index: Dict[Tuple, Dict] = {}
+            for doc in self._docs:
+                key = _unique_key(doc, fields)
+                if key is None:
+                    continue
+                if key in index:
+                    from pymongo.errors import DuplicateKeyError
+
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} dup key: "
+                                            f"{dict(zip(fields, key))}", DUPLICATE_KEY)
+                index[key] = doc
+            self._unique[fields] = index
+        if len(keys) == 1 and keys[0][0] not in self._indexes:
+            field = keys[0][0]
+            self._indexes[field] = {}
+            for doc in self._docs:
+                self._index_add(doc)
+        return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+class MemoryDatabase:
+    def __init__(self, name: str = "memory"):
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = MemoryCollection(name)
+        return collection
@@ -0,0 +1,32 @@
+"""Minimal in-process metrics registry, exposed at /api/metrics"""
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+_gauges: Dict[str, float] = {}
+_collectors: List[Callable[[], Dict[str, float]]] = []
+
+
+def inc(name: str, value: float = 1.0):
+    with _lock:
+        _counters[name] += value
+
+
+def set_gauge(name: str, value: float):
+    _gauges[name] = value
+
+
+def register_collector(collector: Callable[[], Dict[str, float]]):
+    """Register a callable whose metrics are computed when a snapshot is taken"""
+    _collectors.append(collector)
+
+
+def snapshot() -> Dict[str, float]:
+    with _lock:
+        values = dict(_counters)
+    values.update(_gauges)
+    for collector in _collectors:
+        values.update(collector())
+    return dict(sorted(values.items()))
@@ -0,0 +1,142 @@
+"""On-demand sampling profiler (debug only, off by default).
+
+Nothing here is installed unless PROFILING_ENABLED is set and an
+ADMIN_TOKEN is configured, so a normal worker pays nothing for it. When
+installed:
+
+- a request carrying ``X-Profile: 1`` (plus ``X-Admin-Token``) is sampled
+  while it runs and answered with the profile instead of its body;
+- ``POST /api/admin/profile?seconds=N`` samples every thread of the worker
+  for N seconds.
+
+Profiles are in collapsed-stack format (one ``frame;frame;frame count`` line
+per stack), ready for flamegraph.pl or speedscope. Samples are taken from a
+background thread, so time the event loop spends blocked shows up as well;
+other requests running concurrently on the worker are included too.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+MAX_PROFILE_SECONDS = 60.0
+
+
+def enabled() -> bool:
+    return os.environ.get("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+
+
+def check_admin(request: Request):
+    """Reject requests without the configured admin token"""
+    token = os.environ.get("ADMIN_TOKEN")
+    if not token or request.headers.get("x-admin-token") != token:
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse(frame, prefix: str = "") -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    if prefix:
+        labels.append(prefix)
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Samples the Python stacks of selected threads (all by default) at a fixed interval"""
+
+    def __init__(self, interval: float = 0.005, thread_ids: Optional[Iterable[int]] = None):
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                self.samples[collapse(frame, names.get(thread_id, str(thread_id)))] += 1
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+
+def render(samples: Dict[str, int]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(samples.items()))
+
+
+def install(app: FastAPI, router: APIRouter):
+    """Register the profiling middleware and admin endpoint"""
+    if not os.environ.get("ADMIN_TOKEN"):
+        logging.warning("PROFILING_ENABLED is set but ADMIN_TOKEN is not - profiling stays off")
+        return
+    interval = float(os.environ.get("PROFILING_INTERVAL_MS", "5")) / 1000
+    worker_profile = asyncio.Lock()
+
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        if request.headers.get("x-profile") != "1":
+            return await call_next(request)
+        try:
+            check_admin(request)
+        except HTTPException as e:
+            return PlainTextResponse(e.detail, status_code=e.status_code)
+
+        # Only the event loop thread: that is where this request's handler runs
+        sampler = StackSampler(interval, thread_ids=[threading.get_ident()]).start()
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+            async for _ in response.body_iterator:
+                pass  # include time spent producing (streamed) bodies
+        finally:
+            samples = sampler.stop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return PlainTextResponse(render(samples), headers={
+            "X-Profile-Status": str(response.status_code),
+            "X-Profile-Elapsed-Ms": f"{elapsed_ms:.1f}",
+            "X-Profile-Samples": str(sum(samples.values())),
+        })
+
+    @router.post("/admin/profile")
+    async def profile_worker(
+        request: Request,
+        seconds: float = Query(10.0, gt=0, le=MAX_PROFILE_SECONDS),
+        interval_ms: float = Query(10.0, ge=1, le=1000)
+    ):
+        """Sample every thread of this worker for ``seconds``; collapsed stacks"""
+        check_admin(request)
+        if worker_profile.locked():
+            raise HTTPException(status_code=409, detail="A profile is already running")
+        async with worker_profile:
+            sampler = StackSampler(interval_ms / 1000).start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                samples = sampler.stop()
+        return PlainTextResponse(render(samples))
+
+    logging.info("Profiling endpoints enabled")
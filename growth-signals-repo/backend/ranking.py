@@ -0,0 +1,175 @@
+"""Freshness-aware lead ranking, maintained incrementally.
+
+A lead's relevance at time ``t`` is its stored score times its intent signal
+confidences, each decayed exponentially from when the signal was seen::
+
+    relevance(t) = score / 10 * sum_i confidence_i * exp(-rate * (t - t_i))
+
+All leads decay at the same rate, so ``exp(-rate * t)`` factors out and the
+order of leads never changes as time passes: it is the order of the
+time-independent key ::
+
+    key = log(score / 10) + logsumexp_i(log(confidence_i) + rate * t_i)
+
+A key only changes when the lead's signals do. The ranker keeps every lead's
+key and a sorted top-K; written leads are marked dirty and only those are
+rescored, and decay is applied lazily, ``relevance(t) = exp(key - rate * t)``,
+for just the leads a query returns.
+"""
+import heapq
+import itertools
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+# A lead without (positive) signals ranks as one signal of this confidence
+BASELINE_CONFIDENCE = 0.05
+MIN_SCORE = 0.1
+
+
+def epoch(value) -> Optional[float]:
+    """Seconds since the epoch of a datetime (naive means UTC), ISO string or number"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return None
+
+
+class LeadRanker:
+    """Leads ordered by time-decayed relevance, best ``k`` kept sorted.
+
+    ``half_life`` is in seconds. Leads are identified by ``key(lead)``;
+    ``load`` scores leads immediately, ``mark_dirty`` defers it until the
+    next ``top`` (so a burst of writes costs one rescore per lead).
+    """
+
+    def __init__(self, key: Callable[[Mapping], Hashable], half_life: float, k: int = 100):
+        self.key = key
+        self.rate = math.log(2) / half_life
+        self.k = k
+        self.built_at = time.monotonic()
+        self._keys: Dict[Hashable, float] = {}
+        # Top-k entries (-key, seq, identity), ascending, so best first
+        self._top: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[float, int, Hashable]] = {}
+        self._seq = itertools.count()
+        self._refill = False
+        self._dirty: Dict[Hashable, Mapping] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def score_key(self, lead: Mapping, now: Optional[float] = None) -> float:
+        """The lead's time-independent ranking key"""
+        lead_time = epoch(lead.get("signals_at")) or epoch(lead.get("timestamp")) or now or time.time()
+        terms = []
+        for signal in lead.get("intent_signals") or []:
+            confidence = signal.get("confidence") if isinstance(signal, Mapping) else None
+            if isinstance(confidence, (int, float)) and confidence > 0:
+                seen = epoch(signal.get("detected_at")) or lead_time
+                terms.append(math.log(confidence) + self.rate * seen)
+        if not terms:
+            terms.append(math.log(BASELINE_CONFIDENCE) + self.rate * lead_time)
+        peak = max(terms)
+        signals = peak + math.log(sum(math.exp(term - peak) for term in terms))
+        score = lead.get("score")
+        score = score if isinstance(score, (int, float)) else 5.0
+        return math.log(max(score, MIN_SCORE) / 10) + signals
+
+    def relevance(self, key: float, now: Optional[float] = None) -> float:
+        """Decayed relevance at ``now`` of a lead with ranking key ``key``"""
+        return math.exp(key - self.rate * (now if now is not None else time.time()))
+
+    def load(self, leads: Iterable[Mapping]):
+        """Score leads now; the top-k is rebuilt once at the end"""
+        with self._lock:
+            for lead in leads:
+                self._keys[self.key(lead)] = self.score_key(lead)
+            self._refill = True
+
+    def mark_dirty(self, leads: Iterable[Mapping]):
+        with self._lock:
+            for lead in leads:
+                self._dirty[self.key(lead)] = lead
+
+    def remove(self, identity: Hashable):
+        with self._lock:
+            self._dirty.pop(identity, None)
+            if self._keys.pop(identity, None) is not None and identity in self._entries:
+                entry = self._entries.pop(identity)
+                del self._top[bisect_left(self._top, entry)]
+                if len(self._keys) > len(self._top):
+                    # Another lead takes its place
+                    self._refill = True
+
+    def rescore(self) -> int:
+        """Rescore the dirty leads; returns how many there were"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            for identity, lead in dirty.items():
+                self._place(identity, self.score_key(lead))
+            return len(dirty)
+
+    def _place(self, identity: Hashable, key: float):
+        old = self._keys.get(identity)
+        self._keys[identity] = key
+        if self._refill:
+            return
+        entry = self._entries.pop(identity, None)
+        if entry is not None:
+            del self._top[bisect_left(self._top, entry)]
+            if key < old and len(self._keys) > len(self._top) + 1:
+                # Dropped within or out of the top: an outsider may now beat it
+                self._refill = True
+                return
+        if len(self._top) < self.k or -key < self._top[-1][0]:
+            entry = self._entries[identity] = (-key, next(self._seq), identity)
+            insort(self._top, entry)
+            if len(self._top) > self.k:
+                del self._entries[self._top.pop()[2]]
+
+    def _rebuild_top(self):
+        best = heapq.nlargest(self.k, self._keys.items(), key=lambda item: item[1])
+        self._top = [(-key, next(self._seq), identity) for identity, key in best]
+        self._entries = {entry[2]: entry for entry in self._top}
+        self._refill = False
+
+    def top(self, n: Optional[int] = None, now: Optional[float] = None) -> List[Tuple[Hashable, float]]:
+        """The best ``n`` (at most k) leads with their relevance at ``now``, best first"""
+        self.rescore()
+        with self._lock:
+            if self._refill:
+                self._rebuild_top()
+            now = now if now is not None else time.time()
+            return [(identity, self.relevance(-neg_key, now)) for neg_key, _, identity in self._top[:n]]
+
+    def top_among(self, identities: Iterable[Hashable], n: int,
+                  now: Optional[float] = None) -> List[Tuple[Hashable, float]]:
+        """The best ``n`` of the given leads (e.g. a filter's matches), best first"""
+        self.rescore()
+        with self._lock:
+            keys = self._keys
+            best = heapq.nlargest(n, ((keys[i], i) for i in identities if i in keys), key=lambda item: item[0])
+            now = now if now is not None else time.time()
+            return [(identity, self.relevance(key, now)) for key, identity in best]
+
+    def ranked(self, leads: Iterable[Mapping], now: Optional[float] = None) -> List[Tuple[Mapping, float]]:
+        """Arbitrary leads (e.g. a filtered page) ordered by relevance at ``now``"""
+        now = now if now is not None else time.time()
+        scored = [(lead, self.relevance(self.score_key(lead, now), now)) for lead in leads]
+        scored.sort(key=lambda item: -item[1])
+        return scored
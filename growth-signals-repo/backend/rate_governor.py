@@ -0,0 +1,230 @@
+"""Per-upstream outbound rate governor.
+
+Each upstream gets one or more token buckets (e.g. requests and tokens per
+minute for OpenAI). Callers queue FIFO for tokens up to a deadline. The
+buckets follow the upstream's own rate-limit headers: the remaining quota is
+spread evenly over the time left in the window, and a 429 pauses the bucket
+with exponential backoff. The headers report the quota shared by all
+workers, so each bucket claims only its ``workers`` share of it.
+"""
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Deque, Dict, Mapping, Optional, Tuple
+
+import metrics
+
+
+class Throttled(Exception):
+    """Raised when no capacity frees up before the caller's deadline"""
+
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parse OpenAI-style reset durations such as '20ms', '1s' or '6m0s'"""
+    parts = _DURATION_RE.findall(value or "")
+    if not parts:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+class TokenBucket:
+    def __init__(self, name: str, capacity: float, window_seconds: float, max_queue: int = 100,
+                 workers: int = 1):
+        self.name = name
+        self.workers = max(workers, 1)
+        self.capacity = capacity
+        self.base_rate = capacity / window_seconds
+        self.rate = self.base_rate
+        self.tokens = capacity
+        self.max_queue = max_queue
+        self.paused_until = 0.0
+        self.window_ends = 0.0
+        self.backoff = 0.0
+        self.throttled = 0
+        self._updated = time.monotonic()
+        self._waiters: Deque[Tuple[asyncio.Future, float]] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for fut, _ in self._waiters if not fut.done())
+
+    def _refill(self, now: float):
+        if self.window_ends and now >= self.window_ends:
+            # The upstream window has rolled over; go back to the configured rate
+            self.rate = self.base_rate
+            self.window_ends = 0.0
+        if now > self.paused_until:
+            start = max(self._updated, self.paused_until)
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self._updated = now
+
+    def _try_take(self, cost: float) -> bool:
+        now = time.monotonic()
+        self._refill(now)
+        if now >= self.paused_until and self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+    def refund(self, cost: float):
+        """Return tokens taken for a call that was not made"""
+        self._refill(time.monotonic())
+        self.tokens = min(self.capacity, self.tokens + cost)
+        if self._timer is not None:
+            self._timer.cancel()
+        self._drain()
+
+    def _drain(self):
+        self._timer = None
+        while self._waiters:
+            fut, cost = self._waiters[0]
+            if fut.done():
+                self._waiters.popleft()
+                continue
+            if not self._try_take(cost):
+                break
+            self._waiters.popleft()
+            fut.set_result(None)
+        if self._waiters:
+            now = time.monotonic()
+            _, cost = self._waiters[0]
+            wait = max(self.paused_until - now, 0.0) + max(cost - self.tokens, 0.0) / max(self.rate, 1e-6)
+            self._timer = asyncio.get_running_loop().call_later(max(wait, 0.001), self._drain)
+
+    async def acquire(self, cost: float = 1.0, deadline: Optional[float] = None):
+        """Wait for ``cost`` tokens; ``deadline`` is a time.monotonic() value"""
+        cost = min(cost, self.capacity)
+        if not self._waiters and self._try_take(cost):
+            return
+        if self.queue_depth >= self.max_queue:
+            self._throttle()
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append((fut, cost))
+        if self._timer is None:
+            self._drain()
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        try:
+            await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            self._throttle()
+        finally:
+            # Let the next waiter in if we gave up while at the head of the queue
+            if not fut.done() or fut.cancelled():
+                fut.cancel()
+                if self._timer is None and self._waiters:
+                    self._drain()
+
+    def _throttle(self):
+        self.throttled += 1
+        metrics.inc(f"governor.{self.name}.throttled")
+        raise Throttled(self.name)
+
+    def observe(self, remaining: Optional[float], reset_after: Optional[float], limit: Optional[float] = None):
+        """Align the bucket with quota reported by the upstream (for all workers)"""
+        now = time.monotonic()
+        self._refill(now)
+        if limit:
+            self.capacity = limit / self.workers
+        if remaining is None:
+            return
+        self.tokens = min(self.tokens, remaining / self.workers)
+        if reset_after is not None and reset_after > 0:
+            if remaining <= 0:
+                self.paused_until = max(self.paused_until, now + reset_after)
+            # Spend this worker's share of what is left evenly over the rest of the window
+            self.rate = max(remaining / self.workers / reset_after, self.base_rate * 0.05)
+            self.window_ends = now + reset_after
+        self.backoff = 0.0
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """Back off after the upstream rejected a call with a rate-limit error"""
+        now = time.monotonic()
+        self.backoff = min(max(self.backoff * 2, 1.0), 60.0)
+        self.tokens = 0.0
+        self._updated = now
+        self.paused_until = max(self.paused_until, now + max(retry_after or 0.0, self.backoff))
+        metrics.inc(f"governor.{self.name}.rate_limited")
+
+
+class Governor:
+    """Token buckets for one upstream, one per limited dimension"""
+
+    def __init__(self, name: str, buckets: Dict[str, TokenBucket]):
+        self.name = name
+        self.buckets = buckets
+
+    async def acquire(self, deadline: Optional[float] = None, **costs: float):
+        """Take from every bucket, or (when throttled or cancelled) from none"""
+        taken = []
+        try:
+            for dimension, bucket in self.buckets.items():
+                cost = min(costs.get(dimension, 1.0 if dimension == "requests" else 0.0), bucket.capacity)
+                await bucket.acquire(cost, deadline)
+                taken.append((bucket, cost))
+        except BaseException:
+            for bucket, cost in taken:
+                bucket.refund(cost)
+            raise
+
+    def stats(self) -> Dict[str, float]:
+        values = {}
+        for dimension, bucket in self.buckets.items():
+            prefix = f"governor.{self.name}.{dimension}"
+            values[f"{prefix}.queue_depth"] = bucket.queue_depth
+            values[f"{prefix}.tokens"] = round(bucket.tokens, 2)
+            values[f"{prefix}.rate_per_s"] = round(bucket.rate, 4)
+        return values
+
+
+def _header(headers: Mapping[str, str], name: str) -> Optional[float]:
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def observe_twitter_headers(governor: Governor, headers: Mapping[str, str]):
+    """x-rate-limit-remaining / x-rate-limit-reset (epoch seconds)"""
+    reset_at = _header(headers, "x-rate-limit-reset")
+    reset_after = None if reset_at is None else max(reset_at - time.time(), 0.0)
+    governor.buckets["requests"].observe(
+        _header(headers, "x-rate-limit-remaining"), reset_after, _header(headers, "x-rate-limit-limit")
+    )
+
+
+def observe_openai_headers(governor: Governor, headers: Mapping[str, str]):
+    """x-ratelimit-{remaining,reset,limit}-{requests,tokens}"""
+    for dimension, bucket in governor.buckets.items():
+        bucket.observe(
+            _header(headers, f"x-ratelimit-remaining-{dimension}"),
+            parse_duration(headers.get(f"x-ratelimit-reset-{dimension}")),
+            _header(headers, f"x-ratelimit-limit-{dimension}"),
+        )
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    return parse_duration(headers.get("retry-after")) if headers else None
+
+
+_governors: Dict[str, Governor] = {}
+
+
+def register(governor: Governor) -> Governor:
+    _governors[governor.name] = governor
+    return governor
+
+
+def get_governor(name: str) -> Governor:
+    return _governors[name]
+
+
+metrics.register_collector(lambda: {k: v for g in _governors.values() for k, v in g.stats().items()})
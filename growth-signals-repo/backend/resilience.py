@@ -0,0 +1,121 @@
+"""Circuit breakers and hedged calls for upstream dependencies"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+import metrics
+
+
+class CircuitBreaker:
+    """Classic closed -> open -> half-open breaker.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``reset_timeout`` seconds, then lets a single trial
+    call through; its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        metrics.inc(f"breaker.{self.name}.rejected")
+        return False
+
+    def release(self):
+        """The allowed call ended without a verdict (cancelled, throttled)"""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                metrics.inc(f"breaker.{self.name}.opened")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+_breakers: List[CircuitBreaker] = []
+
+
+def register_breaker(breaker: CircuitBreaker) -> CircuitBreaker:
+    _breakers.append(breaker)
+    return breaker
+
+
+metrics.register_collector(lambda: {
+    f"breaker.{b.name}.open": 1 if b.state != CircuitBreaker.CLOSED else 0 for b in _breakers
+})
+
+
+async def hedged(
+    factory: Callable[[], Awaitable[Any]],
+    hedge_after: float,
+    attempts: int = 2,
+    is_success: Callable[[Any], bool] = lambda result: result is not None,
+) -> Any:
+    """Run ``factory()`` and, if it has not succeeded within ``hedge_after``
+    seconds, race a duplicate attempt against it (up to ``attempts`` in
+    total). The first successful result wins and the losers are cancelled.
+    If nothing succeeds, the last result is returned (or its error raised).
+    """
+    pending = set()
+    last: Optional[asyncio.Task] = None
+    started = 0
+    try:
+        while True:
+            if started < attempts:
+                pending.add(asyncio.ensure_future(factory()))
+                started += 1
+                if started > 1:
+                    metrics.inc("hedged.extra_attempts")
+            timeout = hedge_after if started < attempts else None
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                last = task
+                if task.exception() is None and is_success(task.result()):
+                    return task.result()
+            if not pending and started >= attempts:
+                return last.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+_background: set = set()
+
+
+def _background_done(task: asyncio.Task):
+    _background.discard(task)
+    if not task.cancelled():
+        # Mark the exception as retrieved; callers that still care awaited it already
+        task.exception()
+
+
+def run_in_background(coro: Awaitable[Any]) -> asyncio.Task:
+    """Start a task the caller may stop waiting for; it is kept alive until done"""
+    task = asyncio.ensure_future(coro)
+    _background.add(task)
+    task.add_done_callback(_background_done)
+    return task
@@ -0,0 +1,82 @@
+"""Lazily initialized upstream clients and database.
+
+Nothing here is imported or connected at module import time, so a worker
+boots without paying for openai/httpx/motor; each subsystem is created on
+first use (or warmed in the background after startup).
+"""
+import logging
+import os
+import threading
+from typing import Any, Optional
+
+_lock = threading.Lock()
+_db = None
+_mongo_client = None
+_openai_client = None
+_http_client = None
+
+
+def get_db():
+    """Motor database, or an in-memory store when MONGO_URL is not set"""
+    global _db, _mongo_client
+    if _db is None:
+        with _lock:
+            if _db is None:
+                mongo_url = os.environ.get("MONGO_URL")
+                db_name = os.environ.get("DB_NAME", "growth_signals")
+                if mongo_url:
+                    from motor.motor_asyncio import AsyncIOMotorClient
+
+                    _mongo_client = AsyncIOMotorClient(mongo_url)
+                    _db = _mongo_client[db_name]
+                else:
+                    from memstore import MemoryDatabase
+
+                    logging.warning("MONGO_URL not set - using in-memory store")
+                    _db = MemoryDatabase(db_name)
+    return _db
+
+
+def get_openai_client() -> Optional[Any]:
+    """Async OpenAI client, or None when no API key is configured"""
+    global _openai_client
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if _openai_client is None and api_key:
+        with _lock:
+            if _openai_client is None:
+                from openai import AsyncOpenAI
+
+                _openai_client = AsyncOpenAI(api_key=api_key)
+    return _openai_client
+
+
+def get_http_client():
+    """Shared httpx.AsyncClient with connection pooling"""
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        _http_client = httpx.AsyncClient(timeout=10.0)
+    return _http_client
+
+
+def warm_up():
+    """Create configured clients ahead of the first request (run off the event loop)"""
+    try:
+        get_openai_client()
+        if os.environ.get("TWITTER_BEARER_TOKEN"):
+            import httpx  # noqa: F401
+        get_db()
+    except Exception as e:
+        logging.warning(f"Warm-up failed: {e}")
+
+
+async def close():
+    global _db, _mongo_client, _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _mongo_client is not None:
+        _mongo_client.close()
+        _mongo_client = None
+    _db = None
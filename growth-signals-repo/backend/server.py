@@ -1,40 +1,154 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 import asyncio
+from functools import lru_cache
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Sequence
+import hashlib
+import re
 import uuid
 from datetime import datetime, timedelta
 import json
-import requests
-import httpx
-from openai import OpenAI
+import time
+
+from runtime import get_db, get_http_client, get_openai_client
+from admission import AdmissionMiddleware, parse_limits
+from bulk_import import BulkImporter, ImportFormatError, detect_format, iter_csv, iter_lines, iter_ndjson
+from exporter import EXPORTERS, MEDIA_TYPES, ExportUnavailable, ensure_available
+from ranking import LeadRanker
+import fast_json
+from fast_json import FastJSONResponse
+from rate_governor import (
+    Governor, Throttled, TokenBucket, observe_openai_headers, observe_twitter_headers,
+    register as register_governor, retry_after_seconds,
+)
+from resilience import CircuitBreaker, hedged, register_breaker, run_in_background
+from shared_cache import get_shared_cache
+from singleflight import endpoint_flight, request_signature, upstream_flight
+from write_behind import WriteBehind
+import loop_monitor
+import geo
+import memprofile
+import metrics
+import profiling
+import runtime
+
+if TYPE_CHECKING:
+    from facets import FacetIndex
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# Configuration
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
 # API Keys
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
 TWITTER_BEARER_TOKEN = os.environ.get('TWITTER_BEARER_TOKEN')
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+# The database, OpenAI and HTTP clients are created on first use (see runtime.py)
+
+# Shared (cross-worker) cache lifetimes, in seconds
+TWEETS_CACHE_TTL = float(os.environ.get('TWEETS_CACHE_TTL', '60'))
+ANALYSIS_CACHE_TTL = float(os.environ.get('ANALYSIS_CACHE_TTL', '86400'))
+
+# Outbound rate limits (per worker until the upstream's headers say otherwise).
+# The headers report the quota of all GOVERNOR_WORKERS workers together (set
+# it to gunicorn's -w; WEB_CONCURRENCY is gunicorn's own default for -w)
+GOVERNOR_WORKERS = int(os.environ.get('GOVERNOR_WORKERS', os.environ.get('WEB_CONCURRENCY', '1')))
+TWITTER_GOVERNOR = register_governor(Governor("twitter", {
+    "requests": TokenBucket("twitter.requests", float(os.environ.get('TWITTER_REQUESTS_PER_15MIN', '60')), 900.0,
+                            workers=GOVERNOR_WORKERS),
+}))
+OPENAI_GOVERNOR = register_governor(Governor("openai", {
+    "requests": TokenBucket("openai.requests", float(os.environ.get('OPENAI_REQUESTS_PER_MIN', '500')), 60.0,
+                            workers=GOVERNOR_WORKERS),
+    "tokens": TokenBucket("openai.tokens", float(os.environ.get('OPENAI_TOKENS_PER_MIN', '10000')), 60.0,
+                          workers=GOVERNOR_WORKERS),
+}))
+# How long a call may queue for rate budget before falling back
+TWITTER_QUEUE_TIMEOUT = float(os.environ.get('TWITTER_QUEUE_TIMEOUT', '5'))
+OPENAI_QUEUE_TIMEOUT = float(os.environ.get('OPENAI_QUEUE_TIMEOUT', '10'))
+
+# Per-upstream circuit breakers, call timeout and (Twitter reads only) hedging delay, seconds
+TWITTER_BREAKER = register_breaker(CircuitBreaker("twitter"))
+OPENAI_BREAKER = register_breaker(CircuitBreaker("openai"))
+OPENAI_TIMEOUT = float(os.environ.get('OPENAI_TIMEOUT', '15'))
+TWITTER_HEDGE_AFTER = float(os.environ.get('TWITTER_HEDGE_AFTER', '1.5'))
+
+# Default end-to-end latency budget for /api/live-tweets
+LIVE_TWEETS_BUDGET_MS = int(os.environ.get('LIVE_TWEETS_BUDGET_MS', '800'))
+
+# Bulk lead import: rows validated and written per batch, errors reported per row
+BULK_IMPORT_BATCH_SIZE = int(os.environ.get('BULK_IMPORT_BATCH_SIZE', '1000'))
+BULK_IMPORT_MAX_ERRORS = int(os.environ.get('BULK_IMPORT_MAX_ERRORS', '1000'))
+LEAD_KEY_FIELDS = ("company", "name")
+# Mongo's error codes for an index that exists with other options
+INDEX_OPTIONS_CONFLICT, INDEX_KEY_SPECS_CONFLICT = 85, 86
+
+# Lead facet counts come from in-memory bitmap indexes, updated as leads are
+# imported and rebuilt from the database when older than this (seconds)
+FACETS_MAX_AGE = float(os.environ.get('FACETS_MAX_AGE', '300'))
+
+# /leads ranks by intent signal confidence decayed with this half-life (hours).
+# The top RANKING_TOP_K are kept sorted, imported leads are rescored as they are
+# written, and the whole ranking is rebuilt when older than RANKING_MAX_AGE (seconds)
+RANKING_HALF_LIFE_HOURS = float(os.environ.get('RANKING_HALF_LIFE_HOURS', '72'))
+RANKING_TOP_K = int(os.environ.get('RANKING_TOP_K', '100'))
+RANKING_MAX_AGE = float(os.environ.get('RANKING_MAX_AGE', '3600'))
+
+# Leads written by other workers (or straight to the database) reach the ranking
+# and facet index through a query for leads whose signals_at/timestamp is newer
+# than the last one, run by /leads at most every LEADS_SYNC_INTERVAL seconds and
+# reaching back LEADS_SYNC_OVERLAP seconds further for clock skew and slow writes
+LEADS_SYNC_INTERVAL = float(os.environ.get('LEADS_SYNC_INTERVAL', '1'))
+LEADS_SYNC_OVERLAP = float(os.environ.get('LEADS_SYNC_OVERLAP', '30'))
+
+# Exports stream this many documents per cursor batch (and Parquet row group)
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '5000'))
+
+# Admission control for expensive routes: "prefix=concurrency:queue" per route.
+# Saturated routes serve their last good response (up to ADMISSION_STALE_MAX_AGE
+# seconds old, marked X-Stale) or answer 503 with Retry-After
+ADMISSION_LIMITS = parse_limits(os.environ.get(
+    'ADMISSION_LIMITS', '/api/live-tweets=8:16,/api/market-data=16:32,/api/export=2:2,/api/leads/bulk=2:0'
+))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', '2'))
+ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', '5'))
+ADMISSION_STALE_MAX_AGE = float(os.environ.get('ADMISSION_STALE_MAX_AGE', '600'))
+
+# Analyzed tweets and AI analyses are persisted write-behind: bulk-upserted every
+# WRITE_BEHIND_BATCH_SIZE documents or WRITE_BEHIND_FLUSH_MS, at most
+# WRITE_BEHIND_CAPACITY buffered per collection (requests never wait for room:
+# documents that don't fit are dropped)
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('WRITE_BEHIND_BATCH_SIZE', '100'))
+WRITE_BEHIND_FLUSH_MS = int(os.environ.get('WRITE_BEHIND_FLUSH_MS', '500'))
+WRITE_BEHIND_CAPACITY = int(os.environ.get('WRITE_BEHIND_CAPACITY', '5000'))
+
+def write_behind_buffer(name: str, key_field: str) -> WriteBehind:
+    return WriteBehind(
+        name, lambda: getattr(get_db(), name), (key_field,), batch_size=WRITE_BEHIND_BATCH_SIZE,
+        flush_interval=WRITE_BEHIND_FLUSH_MS / 1000, capacity=WRITE_BEHIND_CAPACITY,
+    )
+
+tweet_writes = write_behind_buffer("tweets", "tweet_id")
+analysis_writes = write_behind_buffer("analyses", "key")
 
 # Create the main app
-app = FastAPI(title="Growth Signals API", version="1.0.0")
+app = FastAPI(title="Growth Signals API", version="1.0.0", default_response_class=FastJSONResponse)
 api_router = APIRouter(prefix="/api")
 
+# Added before CORS so shed responses still carry CORS headers
+app.add_middleware(
+    AdmissionMiddleware,
+    limits=ADMISSION_LIMITS,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    retry_after=ADMISSION_RETRY_AFTER,
+    stale_max_age=ADMISSION_STALE_MAX_AGE,
+)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -44,13 +158,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Custom JSON encoder to handle datetime objects
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
-
 # Intent Signals Configuration
 INTENT_SIGNALS = [
     "Series A Fundraising", "Series B Fundraising", "Seed Funding",
@@ -85,6 +192,22 @@ class Lead(BaseModel):
     twitter_handle: Optional[str] = None
     linkedin_url: Optional[str] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    # When intent_signals were last written; their freshness decays from here
+    signals_at: datetime = Field(default_factory=datetime.utcnow)
+    # Derived from ``geography`` on write (see geo.py); geo_keys is indexed
+    city: Optional[str] = None
+    state: Optional[str] = None
+    country: Optional[str] = None
+    region: Optional[str] = None
+    geo_keys: List[str] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def normalize_geography(self) -> "Lead":
+        location = geo.parse(self.geography)
+        for name, value in location.fields().items():
+            setattr(self, name, value)
+        self.geo_keys = location.keys()
+        return self
 
 class Tweet(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -107,6 +230,53 @@ class NewsItem(BaseModel):
     relevance_score: float = Field(ge=0.0, le=10.0)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+class IntentAnalysis(BaseModel):
+    intent_signals: List[IntentSignal] = []
+    priority: str = "Low"
+    score: float = 0
+    relevance_score: Optional[float] = None
+
+# Response envelopes. Handlers return FastJSONResponse directly, so these
+# document the API (OpenAPI schema) without a per-request validation pass;
+# tests/test_response_models.py checks the handlers' output against them.
+class LeadResult(Lead):
+    # Time-decayed relevance the leads are ordered by
+    freshness: Optional[float] = None
+    # Only the fallback leads have it
+    company_website: Optional[str] = None
+
+class LeadsResponse(BaseModel):
+    leads: List[LeadResult]
+    total: int
+
+class TweetResult(Tweet):
+    intent_analysis: Optional[IntentAnalysis] = None
+    # "ai", or "local" for the keyword analysis; "pending" when the AI analysis missed the budget
+    analysis_source: Optional[str] = None
+    analysis_status: Optional[str] = None
+
+class TweetsResponse(BaseModel):
+    tweets: List[TweetResult]
+    total: int
+    # /live-tweets only: whether any analysis missed the latency budget, and the budget
+    partial: Optional[bool] = None
+    budget_ms: Optional[int] = None
+
+class NewsResponse(BaseModel):
+    news: List[NewsItem]
+    total: int
+
+class DashboardStats(BaseModel):
+    total_leads: int
+    high_priority_leads: int
+    new_leads_today: int
+    avg_lead_score: float
+    total_signals_detected: int
+    active_campaigns: int
+
+# Collections exposed by /api/export and the model defining their columns
+EXPORT_MODELS = {"leads": Lead, "tweets": Tweet}
+
 class MarketData(BaseModel):
     symbol: str
     price: float
@@ -114,6 +284,9 @@ class MarketData(BaseModel):
     change_percent: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+class MarketDataResponse(BaseModel):
+    market_data: List[MarketData]
+
 class ContentAnalysisRequest(BaseModel):
     content: str
     company_context: Optional[str] = None
@@ -121,7 +294,6 @@ class ContentAnalysisRequest(BaseModel):
 # Fallback Data
 FALLBACK_LEADS = [
     {
-        "id": str(uuid.uuid4()),
         "company": "Stripe",
         "name": "Patrick Collison",
         "role": "CEO",
@@ -136,11 +308,9 @@ FALLBACK_LEADS = [
         "twitter_handle": "@patrickc",
         "linkedin_url": "https://linkedin.com/in/patrickcollison",
         "company_website": "https://stripe.com",
-        "status": "New",
-        "timestamp": datetime.utcnow().isoformat()
+        "status": "New"
     },
     {
-        "id": str(uuid.uuid4()),
         "company": "Notion",
         "name": "Ivan Zhao",
         "role": "CEO",
@@ -155,11 +325,9 @@ FALLBACK_LEADS = [
         "twitter_handle": "@ivanhzhao",
         "linkedin_url": "https://linkedin.com/in/ivanhzhao",
         "company_website": "https://notion.so",
-        "status": "New",
-        "timestamp": datetime.utcnow().isoformat()
+        "status": "New"
     },
     {
-        "id": str(uuid.uuid4()),
         "company": "Airtable",
         "name": "Howie Liu",
         "role": "CEO",
@@ -174,11 +342,9 @@ FALLBACK_LEADS = [
         "twitter_handle": "@howieliu",
         "linkedin_url": "https://linkedin.com/in/howieliu",
         "company_website": "https://airtable.com",
-        "status": "New",
-        "timestamp": datetime.utcnow().isoformat()
+        "status": "New"
     },
     {
-        "id": str(uuid.uuid4()),
         "company": "Figma",
         "name": "Dylan Field",
         "role": "CEO",
@@ -193,11 +359,9 @@ FALLBACK_LEADS = [
         "twitter_handle": "@dylfield",
         "linkedin_url": "https://linkedin.com/in/dylanfield",
         "company_website": "https://figma.com",
-        "status": "New",
-        "timestamp": datetime.utcnow().isoformat()
+        "status": "New"
     },
     {
-        "id": str(uuid.uuid4()),
         "company": "Linear",
         "name": "Karri Saarinen",
         "role": "CEO",
@@ -212,11 +376,9 @@ FALLBACK_LEADS = [
         "twitter_handle": "@karrisaarinen",
         "linkedin_url": "https://linkedin.com/in/karrisaarinen",
         "company_website": "https://linear.app",
-        "status": "New",
-        "timestamp": datetime.utcnow().isoformat()
+        "status": "New"
     },
     {
-        "id": str(uuid.uuid4()),
         "company": "Vercel",
         "name": "Guillermo Rauch",
         "role": "CEO",
@@ -231,11 +393,9 @@ FALLBACK_LEADS = [
         "twitter_handle": "@rauchg",
         "linkedin_url": "https://linkedin.com/in/guillermor",
         "company_website": "https://vercel.com",
-        "status": "New",
-        "timestamp": datetime.utcnow().isoformat()
+        "status": "New"
     },
     {
-        "id": str(uuid.uuid4()),
         "company": "Retool",
         "name": "David Hsu",
         "role": "CEO",
@@ -250,11 +410,9 @@ FALLBACK_LEADS = [
         "twitter_handle": "@dvdhsu",
         "linkedin_url": "https://linkedin.com/in/davidhsu42",
         "company_website": "https://retool.com",
-        "status": "New",
-        "timestamp": datetime.utcnow().isoformat()
+        "status": "New"
     },
     {
-        "id": str(uuid.uuid4()),
         "company": "Webflow",
         "name": "Vlad Magdalin",
         "role": "CEO",
@@ -269,11 +427,9 @@ FALLBACK_LEADS = [
         "twitter_handle": "@callmevlad",
         "linkedin_url": "https://linkedin.com/in/vladmagdalin",
         "company_website": "https://webflow.com",
-        "status": "New",
-        "timestamp": datetime.utcnow().isoformat()
+        "status": "New"
     },
     {
-        "id": str(uuid.uuid4()),
         "company": "Supabase",
         "name": "Paul Copplestone",
         "role": "CEO",
@@ -288,11 +444,9 @@ FALLBACK_LEADS = [
         "twitter_handle": "@kiwicopple",
         "linkedin_url": "https://linkedin.com/in/paulcopplestone",
         "company_website": "https://supabase.com",
-        "status": "New",
-        "timestamp": datetime.utcnow().isoformat()
+        "status": "New"
     },
     {
-        "id": str(uuid.uuid4()),
         "company": "Planetscale",
         "name": "Sam Lambert",
         "role": "CEO",
@@ -307,8 +461,7 @@ FALLBACK_LEADS = [
         "twitter_handle": "@iamsamlambert",
         "linkedin_url": "https://linkedin.com/in/samlambert",
         "company_website": "https://planetscale.com",
-        "status": "New",
-        "timestamp": datetime.utcnow().isoformat()
+        "status": "New"
     }
 ]
 
@@ -357,38 +510,153 @@ FALLBACK_NEWS = [
 
 FALLBACK_TWEETS = [
     {
-        "id": str(uuid.uuid4()),
         "tweet_id": "1234567890",
         "content": "Just closed our Series A! $15M to scale our B2B sales platform. Hiring VP Sales and RevOps team. Exciting times ahead! #startup #funding #hiring",
         "author_name": "Alex Thompson", 
         "author_handle": "@alexthompson_ceo",
         "engagement_metrics": {"likes": 234, "retweets": 45, "replies": 28},
-        "relevance_score": 9.1,
-        "timestamp": datetime.utcnow().isoformat()
+        "relevance_score": 9.1
     },
     {
-        "id": str(uuid.uuid4()),
         "tweet_id": "1234567891",
         "content": "Our current CRM is a bottleneck. Looking for enterprise-grade solutions with better analytics. Any recommendations for scaling B2B sales teams?",
         "author_name": "Lisa Chen",
         "author_handle": "@lisachen_ops", 
         "engagement_metrics": {"likes": 156, "retweets": 32, "replies": 67},
-        "relevance_score": 8.3,
-        "timestamp": datetime.utcnow().isoformat()
+        "relevance_score": 8.3
     }
 ]
 
+FALLBACK_CACHED_TWEETS = [
+    {
+        "tweet_id": "1935409307442426011",
+        "content": "Just hired our first VP of Sales! Excited to scale our B2B sales motion and break into enterprise. The SaaS journey continues 🚀 #hiring #sales #startup",
+        "author_name": "Alex Chen",
+        "author_handle": "@alexchen_ceo",
+        "engagement_metrics": {"like_count": 245, "retweet_count": 67, "reply_count": 34},
+        "relevance_score": 9.2,
+        "intent_analysis": {
+            "intent_signals": [
+                {"signal": "VP Sales Hiring", "confidence": 0.95, "reasoning": "Explicitly mentions hiring VP of Sales"}
+            ],
+            "priority": "High",
+            "score": 9.2,
+            "relevance_score": 9.2
+        }
+    },
+    {
+        "tweet_id": "1935409303441023008",
+        "content": "Series A closed! 💰 $25M to scale our go-to-market engine. Time to build that dream sales team and expand internationally. Thank you to our amazing investors!",
+        "author_name": "Sarah Rodriguez",
+        "author_handle": "@sarah_builds",
+        "engagement_metrics": {"like_count": 892, "retweet_count": 156, "reply_count": 78},
+        "relevance_score": 9.5,
+        "intent_analysis": {
+            "intent_signals": [
+                {"signal": "Series A Fundraising", "confidence": 0.98, "reasoning": "Announces Series A completion"},
+                {"signal": "GTM Expansion", "confidence": 0.92, "reasoning": "Plans to scale go-to-market engine"}
+            ],
+            "priority": "High",
+            "score": 9.5,
+            "relevance_score": 9.5
+        }
+    },
+    {
+        "tweet_id": "1935409294343618837",
+        "content": "Our CRM is maxed out. Looking for enterprise-grade solutions that can handle complex sales processes. Any recommendations for scaling B2B ops? #CRM #salesops",
+        "author_name": "Mike Thompson",
+        "author_handle": "@mikethompson_ops",
+        "engagement_metrics": {"like_count": 134, "retweet_count": 45, "reply_count": 89},
+        "relevance_score": 8.8,
+        "intent_analysis": {
+            "intent_signals": [
+                {"signal": "CRM Migration", "confidence": 0.94, "reasoning": "Actively seeking new CRM solution"},
+                {"signal": "Sales Process Optimization", "confidence": 0.87, "reasoning": "Mentions complex sales processes"}
+            ],
+            "priority": "High",
+            "score": 8.8,
+            "relevance_score": 8.8
+        }
+    }
+]
+
+FALLBACK_NAMESPACE = uuid.UUID("3b8f6a2e-4c1d-5e7f-8a9b-0c1d2e3f4a5b")
+
+def stable_id(record: Dict, key_fields: Sequence[str]) -> str:
+    """An id derived from the record's natural key, the same on every request"""
+    key = "/".join(str(record.get(field, "")) for field in key_fields)
+    return str(uuid.uuid5(FALLBACK_NAMESPACE, key))
+
+def stamp_records(records: List[Dict], *key_fields: str) -> List[Dict]:
+    """Give fallback records a stable id and a timestamp"""
+    now = datetime.utcnow().isoformat()
+    return [{"id": stable_id(record, key_fields), **record, "timestamp": now} for record in records]
+
+# Fallback records are stamped on first use rather than at import
+@lru_cache(maxsize=None)
+def fallback_leads() -> List[Dict]:
+    return stamp_records(FALLBACK_LEADS, "company", "name")
+
+@lru_cache(maxsize=None)
+def fallback_tweets() -> List[Dict]:
+    return stamp_records(FALLBACK_TWEETS, "tweet_id")
+
+@lru_cache(maxsize=None)
+def fallback_cached_tweets() -> List[Dict]:
+    return stamp_records(FALLBACK_CACHED_TWEETS, "tweet_id")
+
 # Utility Functions
 async def analyze_content_with_ai(content: str, context: str = "") -> Dict[str, Any]:
     """Analyze content for intent signals using AI"""
-    if not openai_client:
+    if not get_openai_client():
         # Fallback analysis - be more conservative
         return {
             "intent_signals": [],
             "priority": "Low",
             "score": 0
         }
-    
+
+    analysis = await ai_analysis(content, context)
+    if analysis is None:
+        return {
+            "intent_signals": [],
+            "priority": "Low",
+            "score": 0,
+            "relevance_score": 0
+        }
+    return analysis
+
+async def ai_analysis(content: str, context: str = "") -> Optional[Dict[str, Any]]:
+    """AI analysis of content, or None when the AI path is unavailable"""
+    openai_client = get_openai_client()
+    if not openai_client:
+        return None
+
+    # Identical content is analyzed once per host, whichever worker asks first
+    key = "analysis:" + hashlib.sha256(f"{context}\n{content}".encode()).hexdigest()
+    return await upstream_flight.do(key, lambda: get_shared_cache().get_or_compute(
+        key, lambda: stored_or_new_analysis(key, openai_client, content, context), ttl=ANALYSIS_CACHE_TTL,
+    ))
+
+async def stored_or_new_analysis(key: str, openai_client, content: str, context: str) -> Optional[Dict[str, Any]]:
+    """The persisted analysis of this content if there is one, else a new one (persisted write-behind)"""
+    try:
+        stored = await get_db().analyses.find_one({"key": key}, {"_id": 0, "analysis": 1})
+    except Exception as e:
+        logging.warning(f"Stored analysis lookup failed: {e}")
+        stored = None
+    if stored:
+        return stored["analysis"]
+    # Not hedged: every OpenAI attempt is a paid call
+    analysis = await request_ai_analysis(openai_client, content, context)
+    if analysis is not None:
+        analysis_writes.put_nowait({
+            "key": key, "content": content, "context": context, "analysis": analysis, "timestamp": datetime.utcnow(),
+        })
+    return analysis
+
+async def request_ai_analysis(openai_client, content: str, context: str) -> Optional[Dict[str, Any]]:
+    """Run one OpenAI analysis; None if the call fails or returns unusable output"""
     try:
         prompt = f"""
         You are a B2B sales intelligence analyst. Analyze the following social media content for genuine business growth intent signals.
@@ -420,12 +688,37 @@ async def analyze_content_with_ai(content: str, context: str = "") -> Dict[str,
         If content is not business-related, return: {{"intent_signals": [], "priority": "Low", "score": 0, "relevance_score": 0}}
         """
         
-        response = openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=300,
-            temperature=0.1  # Lower temperature for more consistent results
-        )
+        # An open breaker fails fast without spending rate budget
+        if not OPENAI_BREAKER.allow():
+            return None
+        try:
+            # Budget requests and (roughly estimated) tokens per minute
+            await OPENAI_GOVERNOR.acquire(
+                deadline=time.monotonic() + OPENAI_QUEUE_TIMEOUT, requests=1, tokens=len(prompt) / 4 + 300
+            )
+        except BaseException:
+            OPENAI_BREAKER.release()
+            raise
+        try:
+            raw_response = await asyncio.wait_for(openai_client.chat.completions.with_raw_response.create(
+                model="gpt-4",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=300,
+                temperature=0.1  # Lower temperature for more consistent results
+            ), OPENAI_TIMEOUT)
+        except asyncio.CancelledError:
+            OPENAI_BREAKER.release()
+            raise
+        except Exception as e:
+            # Rate limiting is the governor's business, not a sign of an unhealthy upstream
+            if getattr(e, "status_code", None) == 429:
+                OPENAI_BREAKER.release()
+            else:
+                OPENAI_BREAKER.record_failure()
+            raise
+        OPENAI_BREAKER.record_success()
+        observe_openai_headers(OPENAI_GOVERNOR, raw_response.headers)
+        response = raw_response.parse()
         
         # Parse AI response
         try:
@@ -442,26 +735,49 @@ async def analyze_content_with_ai(content: str, context: str = "") -> Dict[str,
             return analysis
         except json.JSONDecodeError:
             logging.warning("GPT returned invalid JSON, using fallback")
-            return {
-                "intent_signals": [],
-                "priority": "Low",
-                "score": 0,
-                "relevance_score": 0
-            }
-            
+            return None
+
+    except Throttled:
+        logging.warning("OpenAI budget exhausted, using fallback")
+        return None
     except Exception as e:
+        if getattr(e, "status_code", None) == 429:
+            OPENAI_GOVERNOR.buckets["requests"].penalize(retry_after_seconds(e.response.headers))
         logging.error(f"AI analysis failed: {e}")
-        return {
-            "intent_signals": [],
-            "priority": "Low",
-            "score": 0,
-            "relevance_score": 0
-        }
+        return None
+
+# Keyword rules standing in for the AI analysis when it is unavailable or too slow
+LOCAL_SIGNAL_RULES = [
+    ("Series A Fundraising", ["series a"], 0.8),
+    ("Series B Fundraising", ["series b"], 0.8),
+    ("Seed Funding", ["seed round", "pre-seed", "seed funding"], 0.75),
+    ("VP Sales Hiring", ["vp sales", "vp of sales", "head of sales"], 0.8),
+    ("CRO Hiring", ["hiring cro", "chief revenue officer"], 0.8),
+    ("RevOps Hiring", ["revops", "revenue operations"], 0.7),
+    ("CRM Migration", ["crm"], 0.7),
+    ("Sales Enablement", ["sales enablement"], 0.7),
+    ("GTM Expansion", ["go-to-market", "gtm"], 0.7),
+    ("International Expansion", ["internationally", "international expansion", "new markets"], 0.7),
+    ("Enterprise Sales", ["enterprise sales", "enterprise customers"], 0.7),
+    ("Sales Process Optimization", ["sales process", "scaling sales", "scale our sales"], 0.7),
+]
+
+def local_intent_analysis(content: str) -> Dict[str, Any]:
+    """Cheap keyword-based stand-in for the AI analysis"""
+    text = f" {content.lower()} "
+    signals = [
+        {"signal": signal, "confidence": confidence, "reasoning": "Keyword match (local analysis)"}
+        for signal, phrases, confidence in LOCAL_SIGNAL_RULES
+        if any(f" {phrase}" in text for phrase in phrases)
+    ]
+    score = min(10, 3 + 2 * len(signals)) if signals else 0
+    priority = "High" if score >= 7 else "Medium" if score >= 5 else "Low"
+    return {"intent_signals": signals, "priority": priority, "score": score, "relevance_score": score}
 
 async def fetch_twitter_data(query: str = None, count: int = 10) -> List[Dict]:
     """Fetch tweets using Twitter API with B2B-specific queries"""
     if not TWITTER_BEARER_TOKEN:
-        return FALLBACK_TWEETS
+        return [dict(t) for t in fallback_tweets()]
     
     # Define specific B2B growth signal queries
     if not query:
@@ -480,7 +796,17 @@ async def fetch_twitter_data(query: str = None, count: int = 10) -> List[Dict]:
         # Rotate through queries or pick one randomly
         import random
         query = random.choice(b2b_queries)
-    
+
+    # One worker per host fetches a query; the others reuse its batch
+    key = f"tweets:{count}:{query}"
+    tweets = await upstream_flight.do(key, lambda: get_shared_cache().get_or_compute(
+        key, lambda: hedged(lambda: search_recent_tweets(query, count), TWITTER_HEDGE_AFTER), ttl=TWEETS_CACHE_TTL
+    ))
+    # Coalesced callers share the fetched list, and analysis annotates tweets in place
+    return [dict(t) for t in tweets] if tweets else [dict(t) for t in fallback_tweets()]
+
+async def search_recent_tweets(query: str, count: int) -> Optional[List[Dict]]:
+    """Call the Twitter recent search API; None if the request fails"""
     try:
         headers = {
             "Authorization": f"Bearer {TWITTER_BEARER_TOKEN}",
@@ -495,68 +821,93 @@ async def fetch_twitter_data(query: str = None, count: int = 10) -> List[Dict]:
             "expansions": "author_id"
         }
         
-        async with httpx.AsyncClient() as client:
+        if not TWITTER_BREAKER.allow():
+            return None
+        try:
+            await TWITTER_GOVERNOR.acquire(deadline=time.monotonic() + TWITTER_QUEUE_TIMEOUT)
+        except BaseException:
+            TWITTER_BREAKER.release()
+            raise
+        client = get_http_client()
+        try:
             response = await client.get(
                 "https://api.twitter.com/2/tweets/search/recent",
                 headers=headers,
                 params=params,
                 timeout=10.0
             )
+        except asyncio.CancelledError:
+            TWITTER_BREAKER.release()
+            raise
+        except Exception:
+            TWITTER_BREAKER.record_failure()
+            raise
+        observe_twitter_headers(TWITTER_GOVERNOR, response.headers)
+        if response.status_code == 429:
+            TWITTER_GOVERNOR.buckets["requests"].penalize(retry_after_seconds(response.headers))
+            TWITTER_BREAKER.release()
+        elif response.status_code == 200:
+            TWITTER_BREAKER.record_success()
+        else:
+            TWITTER_BREAKER.record_failure()
+
+        if response.status_code == 200:
+            data = response.json()
+            tweets = []
             
-            if response.status_code == 200:
-                data = response.json()
-                tweets = []
-                
-                if not data.get('data'):
-                    # If no data, return fallback
-                    return FALLBACK_TWEETS
+            if not data.get('data'):
+                # If no data, the caller falls back
+                return []
+            
+            users = {user['id']: user for user in data.get('includes', {}).get('users', [])}
+            
+            for tweet in data.get('data', []):
+                user = users.get(tweet['author_id'], {})
                 
-                users = {user['id']: user for user in data.get('includes', {}).get('users', [])}
-                
-                for tweet in data.get('data', []):
-                    user = users.get(tweet['author_id'], {})
-                    
-                    # Only include tweets that seem business-related
-                    content = tweet['text'].lower()
-                    business_keywords = ['ceo', 'founder', 'startup', 'company', 'business', 'sales', 'revenue', 'growth', 'team', 'hiring', 'saas', 'b2b']
-                    
-                    if any(keyword in content for keyword in business_keywords):
-                        tweets.append({
-                            "id": str(uuid.uuid4()),
-                            "tweet_id": tweet['id'],
-                            "content": tweet['text'],
-                            "author_name": user.get('name', 'Unknown'),
-                            "author_handle": f"@{user.get('username', 'unknown')}",
-                            "engagement_metrics": tweet.get('public_metrics', {}),
-                            "relevance_score": 7.5,  # Will be updated by AI analysis
-                            "timestamp": datetime.utcnow().isoformat()
-                        })
-                
-                return tweets if tweets else FALLBACK_TWEETS
-            else:
-                logging.warning(f"Twitter API error: {response.status_code} - {response.text}")
-                return FALLBACK_TWEETS
+                # Only include tweets that seem business-related
+                content = tweet['text'].lower()
+                business_keywords = ['ceo', 'founder', 'startup', 'company', 'business', 'sales', 'revenue', 'growth', 'team', 'hiring', 'saas', 'b2b']
                 
+                if any(keyword in content for keyword in business_keywords):
+                    tweets.append({
+                        "id": str(uuid.uuid4()),
+                        "tweet_id": tweet['id'],
+                        "content": tweet['text'],
+                        "author_name": user.get('name', 'Unknown'),
+                        "author_handle": f"@{user.get('username', 'unknown')}",
+                        "engagement_metrics": tweet.get('public_metrics', {}),
+                        "relevance_score": 7.5,  # Will be updated by AI analysis
+                        "timestamp": datetime.utcnow().isoformat()
+                    })
+            
+            return tweets
+        else:
+            logging.warning(f"Twitter API error: {response.status_code} - {response.text}")
+            return None
+
+    except Throttled:
+        logging.warning("Twitter rate budget exhausted, using fallback")
+        return None
     except Exception as e:
         logging.error(f"Twitter fetch failed: {e}")
-        return FALLBACK_TWEETS
+        return None
 
 # API Endpoints
 @api_router.get("/")
 async def root():
     return {"message": "Growth Signals API v1.0.0", "status": "operational"}
 
-@api_router.post("/analyze-content")
+@api_router.post("/analyze-content", response_model=IntentAnalysis, response_model_exclude_none=True)
 async def analyze_content(request: ContentAnalysisRequest):
     """Analyze content for growth intent signals"""
     try:
         analysis = await analyze_content_with_ai(request.content, request.company_context or "")
-        return JSONResponse(content=analysis)
+        return FastJSONResponse(content=analysis)
     except Exception as e:
         logging.error(f"Content analysis failed: {e}")
         raise HTTPException(status_code=500, detail="Analysis failed")
 
-@api_router.get("/leads")
+@api_router.get("/leads", response_model=LeadsResponse, response_model_exclude_none=True)
 async def get_leads(
     role: Optional[str] = Query(None),
     geography: Optional[str] = Query(None), 
@@ -565,166 +916,481 @@ async def get_leads(
 ):
     """Get leads with optional filtering"""
     try:
-        # Try to get from database first
-        query = {}
+        payload = await endpoint_flight.do(
+            request_signature("leads", role, geography, priority, min_score),
+            lambda: build_leads(role, geography, priority, min_score),
+        )
+        return FastJSONResponse(content=payload)
+    except Exception as e:
+        logging.error(f"Failed to get leads: {e}")
+        leads = fallback_leads()
+        return FastJSONResponse(content={"leads": leads, "total": len(leads)})
+
+@api_router.post("/leads/bulk")
+async def bulk_import_leads(
+    request: Request,
+    format: Optional[str] = Query(None),
+    mode: str = Query("upsert", pattern="^(upsert|insert)$")
+):
+    """Import leads from a streamed CSV or NDJSON body.
+
+    The format comes from ``?format=`` or the Content-Type (text/csv, otherwise
+    NDJSON). In upsert mode rows are matched on (company, name); insert mode
+    adds every valid row, and reports rows whose (company, name) is already
+    stored as duplicates.
+    """
+    try:
+        fmt = detect_format(request.headers.get("content-type"), format)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    collection = get_db().leads
+    key_fields = LEAD_KEY_FIELDS if mode == "upsert" else ()
+    if not _lead_indexes_created:
+        # The unique (company, name) index must exist before the first write
+        await endpoint_flight.do("lead-indexes", create_lead_indexes)
+
+    parse = iter_csv if fmt == "csv" else iter_ndjson
+    importer = BulkImporter(
+        collection, Lead, key_fields, insert_only=("id", "timestamp"),
+        batch_size=BULK_IMPORT_BATCH_SIZE, max_errors=BULK_IMPORT_MAX_ERRORS, on_written=leads_written,
+    )
+    try:
+        report = await importer.run(parse(iter_lines(request.stream())))
+    except (ImportFormatError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logging.info(f"Bulk import ({fmt}, {mode}): {report['received']} rows, {report['failed']} failed")
+    return FastJSONResponse(content=report)
+
+def leads_query(
+    role: Optional[str], geography: Optional[str], priority: Optional[str], min_score: Optional[float]
+) -> Dict[str, Any]:
+    """Mongo filter for the lead filters shared by /leads and /export/leads"""
+    query = {}
+    if role:
+        query["role"] = {"$regex": role, "$options": "i"}
+    if geography:
+        keys = geo.filter_keys(geography)
+        if keys:
+            # Any level of the region hierarchy is a lookup on the geo_keys index
+            query["geo_keys"] = keys[0] if len(keys) == 1 else {"$in": keys}
+        else:
+            query["geography"] = {"$regex": geography, "$options": "i"}
+    if priority:
+        query["priority"] = priority
+    if min_score:
+        query["score"] = {"$gte": min_score}
+    return query
+
+async def build_leads(
+    role: Optional[str], geography: Optional[str], priority: Optional[str], min_score: Optional[float]
+) -> Dict[str, Any]:
+    # Try to get from database first
+    query = leads_query(role, geography, priority, min_score)
+    await sync_leads()
+    ranker = await lead_ranker()
+    if _lead_ranking_from_fallback:
+        leads = await get_db().leads.find(query).to_list(100)
+    elif query:
+        # Filtered: the freshest 100 of all the matches, not of an arbitrary page of them
+        candidates = await filtered_lead_keys(role, geography, priority, min_score)
+        leads = await fetch_leads([identity for identity, _ in ranker.top_among(candidates, 100)])
+    else:
+        # Unfiltered: the maintained top-K, whatever the size of the table
+        leads = await fetch_leads([identity for identity, _ in ranker.top(100)])
+
+    if not leads:
+        # Use fallback data
+        leads = [dict(l) for l in fallback_leads()]
+        
+        # Apply filters to fallback data
         if role:
-            query["role"] = {"$regex": role, "$options": "i"}
+            leads = [l for l in leads if role.lower() in l["role"].lower()]
         if geography:
-            query["geography"] = {"$regex": geography, "$options": "i"}
+            keys = geo.filter_keys(geography)
+            if keys:
+                leads = [l for l in leads if set(keys) & set(geo.parse(l["geography"]).keys())]
+            else:
+                leads = [l for l in leads if geography.lower() in l["geography"].lower()]
         if priority:
-            query["priority"] = priority
+            leads = [l for l in leads if l["priority"] == priority]
         if min_score:
-            query["score"] = {"$gte": min_score}
-            
-        leads = await db.leads.find(query).to_list(100)
-        
-        if not leads:
-            # Use fallback data
-            leads = FALLBACK_LEADS.copy()
-            
-            # Apply filters to fallback data
-            if role:
-                leads = [l for l in leads if role.lower() in l["role"].lower()]
-            if geography:
-                leads = [l for l in leads if geography.lower() in l["geography"].lower()]
-            if priority:
-                leads = [l for l in leads if l["priority"] == priority]
-            if min_score:
-                leads = [l for l in leads if l["score"] >= min_score]
-        
-        # Convert to Lead models
-        formatted_leads = []
-        for lead_data in leads:
-            # Ensure timestamp is a string
-            if isinstance(lead_data.get("timestamp"), datetime):
-                lead_data["timestamp"] = lead_data["timestamp"].isoformat()
-            
-            lead_data["id"] = lead_data.get("id", str(uuid.uuid4()))
-            formatted_leads.append(lead_data)
-            
-        return JSONResponse(content={"leads": formatted_leads, "total": len(formatted_leads)})
+            leads = [l for l in leads if l["score"] >= min_score]
+    
+    # Freshest first; decay is applied now, to just these leads
+    leads = [dict(lead, freshness=round(freshness, 6)) for lead, freshness in ranker.ranked(leads)]
+
+    # Timestamps, ObjectIds etc. are encoded by FastJSONResponse
+    for lead_data in leads:
+        lead_data.setdefault("id", stable_id(lead_data, LEAD_KEY_FIELDS))
         
-    except Exception as e:
-        logging.error(f"Failed to get leads: {e}")
-        return JSONResponse(content={"leads": FALLBACK_LEADS, "total": len(FALLBACK_LEADS)})
+    return {"leads": leads, "total": len(leads)}
+
+async def filtered_lead_keys(
+    role: Optional[str], geography: Optional[str], priority: Optional[str], min_score: Optional[float]
+) -> List[tuple]:
+    """Natural keys of the leads matching the /leads filters, for the ranker to pick the freshest of.
 
-@api_router.get("/live-tweets")
-async def get_live_tweets(query: Optional[str] = Query(None)):
+    Role, priority and resolvable geography come from the facet bitmaps; the
+    rest (score, free-text geography) is one query projected to the key.
+    """
+    index = await lead_facet_index()
+    filters = {"priority": [priority] if priority else None}
+    if role:
+        try:
+            pattern = re.compile(role, re.IGNORECASE)
+        except re.error:
+            pattern = re.compile(re.escape(role), re.IGNORECASE)
+        # The same match as the $regex query, over the distinct roles
+        filters["role"] = [value for value in index.values("role") if pattern.search(value)]
+        if not filters["role"]:
+            return []
+    residual = {}
+    if geography:
+        keys = geo.filter_keys(geography)
+        if keys:
+            filters["geo"] = keys
+        else:
+            residual["geography"] = {"$regex": geography, "$options": "i"}
+    if min_score:
+        residual["score"] = {"$gte": min_score}
+    candidates = index.keys(filters)
+    if residual:
+        projection = {"_id": 0, **{field: 1 for field in LEAD_KEY_FIELDS}}
+        matching = {lead_identity(lead) async for lead in get_db().leads.find(residual, projection)}
+        candidates = [key for key in candidates if key in matching]
+    return candidates
+
+async def fetch_leads(identities: List[tuple]) -> List[Dict[str, Any]]:
+    """Leads by natural key (one lookup each on the key index), in the given order"""
+    if not identities:
+        return []
+    query = {"$or": [dict(zip(LEAD_KEY_FIELDS, identity)) for identity in identities]}
+    found = {lead_identity(lead): lead for lead in await get_db().leads.find(query).to_list(len(identities))}
+    return [found[identity] for identity in identities if identity in found]
+
+RANKING_FIELDS = ("company", "name", "score", "intent_signals", "signals_at", "timestamp")
+
+_lead_ranking: Optional[LeadRanker] = None
+_lead_ranking_from_fallback = False
+
+async def build_lead_ranking() -> LeadRanker:
+    global _lead_ranking_from_fallback
+    ranker = LeadRanker(lead_identity, RANKING_HALF_LIFE_HOURS * 3600, RANKING_TOP_K)
+    cursor = get_db().leads.find({}, {"_id": 0, **{field: 1 for field in RANKING_FIELDS}})
+    batch = []
+    async for lead in cursor.batch_size(EXPORT_BATCH_SIZE):
+        batch.append(lead)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            await asyncio.to_thread(ranker.load, batch)
+            batch = []
+    await asyncio.to_thread(ranker.load, batch)
+    _lead_ranking_from_fallback = not len(ranker)
+    if _lead_ranking_from_fallback:
+        ranker.load(fallback_leads())
+    logging.info(f"Built lead ranking ({len(ranker)} leads)")
+    return ranker
+
+async def lead_ranker() -> LeadRanker:
+    global _lead_ranking
+    ranker = _lead_ranking
+    if ranker is None:
+        _lead_ranking = ranker = await endpoint_flight.do("lead-ranking", build_lead_ranking)
+        rewind_lead_sync(ranker.built_at)
+    elif time.monotonic() - ranker.built_at > RANKING_MAX_AGE:
+        # As for facets: rebuild in the background, keep serving meanwhile
+        ranker.built_at = time.monotonic()
+        run_in_background(build_lead_ranking()).add_done_callback(_swap_lead_ranking)
+    return ranker
+
+def _swap_lead_ranking(task: asyncio.Task):
+    global _lead_ranking
+    if not task.cancelled() and task.exception() is None:
+        _lead_ranking = task.result()
+        rewind_lead_sync(_lead_ranking.built_at)
+
+# Leads changed at or after this time (less LEADS_SYNC_OVERLAP) are not yet in the in-memory indexes
+_leads_synced_to: Optional[datetime] = None
+_leads_synced_at = 0.0
+
+async def sync_leads():
+    """Apply leads changed since the last sync, by any worker, to the ranking and facet index"""
+    global _leads_synced_at
+    if _leads_synced_to is None or time.monotonic() - _leads_synced_at < LEADS_SYNC_INTERVAL:
+        return
+    _leads_synced_at = time.monotonic()
+    await endpoint_flight.do("lead-sync", _sync_leads)
+
+async def _sync_leads():
+    global _leads_synced_to
+    since = _leads_synced_to - timedelta(seconds=LEADS_SYNC_OVERLAP)
+    _leads_synced_to = datetime.utcnow()
+    query = {"$or": [{"signals_at": {"$gte": since}}, {"timestamp": {"$gte": since}}]}
+    fields = dict.fromkeys(RANKING_FIELDS + FACET_FIELDS, 1)
+    leads = await get_db().leads.find(query, {"_id": 0, **fields}).to_list(None)
+    if leads:
+        leads_written(leads)
+
+def rewind_lead_sync(built_at: float):
+    """An index built from a scan started at ``built_at`` (monotonic) is taken into
+    use: sync again everything changed since then, which the scan may have missed"""
+    global _leads_synced_to
+    started = datetime.utcnow() - timedelta(seconds=time.monotonic() - built_at)
+    if _leads_synced_to is None or started < _leads_synced_to:
+        _leads_synced_to = started
+
+def leads_written(leads: List[Dict[str, Any]]):
+    """Keep the in-memory lead indexes current with imported or synced leads"""
+    global _lead_ranking
+    update_lead_facets(leads)
+    if _lead_ranking_from_fallback:
+        _lead_ranking = None
+    elif _lead_ranking is not None:
+        # Rescored when /leads next asks for the top
+        _lead_ranking.mark_dirty(leads)
+
+# Facet dimensions of a lead; "geo" (every level of its location) is only filtered on
+LEAD_FACETS = {
+    "role": lambda lead: [lead.get("role")],
+    "priority": lambda lead: [lead.get("priority")],
+    "region": lambda lead: [lead.get("region") or geo.parse(lead.get("geography")).fields()["region"]],
+    "intent_signal": lambda lead: [s.get("signal") for s in lead.get("intent_signals") or [] if isinstance(s, dict)],
+    "geo": lambda lead: lead.get("geo_keys") or geo.parse(lead.get("geography")).keys(),
+}
+FACET_DIMENSIONS = ("role", "priority", "region", "intent_signal")
+FACET_FIELDS = ("company", "name", "role", "priority", "region", "geography", "geo_keys", "intent_signals")
+
+_lead_facets: Optional["FacetIndex"] = None
+_lead_facets_from_fallback = False
+
+def lead_identity(lead: Dict[str, Any]) -> tuple:
+    """Leads are identified by their natural key, as bulk upserts are"""
+    return tuple(lead.get(field) for field in LEAD_KEY_FIELDS)
+
+async def build_lead_facets() -> "FacetIndex":
+    global _lead_facets_from_fallback
+    # Imported here: facets needs numpy, which would add ~90 ms to every worker start
+    from facets import FacetIndex
+
+    index = FacetIndex(LEAD_FACETS, lead_identity)
+    cursor = get_db().leads.find({}, {"_id": 0, **{field: 1 for field in FACET_FIELDS}})
+    batch = []
+    async for lead in cursor.batch_size(EXPORT_BATCH_SIZE):
+        batch.append(lead)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            # Indexing is CPU work; keep it off the event loop
+            await asyncio.to_thread(index.load, batch)
+            batch = []
+    await asyncio.to_thread(index.load, batch)
+    _lead_facets_from_fallback = not len(index)
+    if _lead_facets_from_fallback:
+        # Same data /leads serves when the database is empty
+        index.load(fallback_leads())
+    logging.info(f"Built lead facet index ({len(index)} leads)")
+    return index
+
+async def lead_facet_index() -> "FacetIndex":
+    global _lead_facets
+    index = _lead_facets
+    if index is None:
+        # Concurrent first requests share one build
+        _lead_facets = index = await endpoint_flight.do("lead-facets", build_lead_facets)
+        rewind_lead_sync(index.built_at)
+    elif time.monotonic() - index.built_at > FACETS_MAX_AGE:
+        # Rebuild in the background (picking up other workers' writes); the
+        # current index keeps serving, and is not re-triggered, meanwhile
+        index.built_at = time.monotonic()
+        run_in_background(build_lead_facets()).add_done_callback(_swap_lead_facets)
+    return index
+
+def _swap_lead_facets(task: asyncio.Task):
+    global _lead_facets
+    if not task.cancelled() and task.exception() is None:
+        _lead_facets = task.result()
+        rewind_lead_sync(_lead_facets.built_at)
+
+def update_lead_facets(leads: List[Dict[str, Any]]):
+    """Apply written leads to the facet index (if it has been built)"""
+    global _lead_facets
+    if _lead_facets_from_fallback:
+        # The database is no longer empty; index it on the next request
+        _lead_facets = None
+    elif _lead_facets is not None:
+        _lead_facets.load(leads)
+
+@api_router.get("/leads/facets")
+async def get_lead_facets(
+    role: Optional[str] = Query(None),
+    priority: Optional[str] = Query(None),
+    geography: Optional[str] = Query(None),
+    signal: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=500)
+):
+    """Lead counts per role, priority, region and intent signal for a filter combination.
+
+    Each filter accepts comma-separated alternatives; geography matches any
+    level of the region hierarchy ("North America", "Texas", "Austin, TX").
+    """
+    filters = {
+        "role": role.split(",") if role else None,
+        "priority": priority.split(",") if priority else None,
+        "intent_signal": signal.split(",") if signal else None,
+    }
+    if geography:
+        filters["geo"] = [key for part in geography.split(",") for key in geo.filter_keys(part)] or ["unknown"]
+    started = time.perf_counter()
+    await sync_leads()
+    index = await lead_facet_index()
+    result = index.counts(filters, FACET_DIMENSIONS, limit)
+    result["took_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return FastJSONResponse(content=result)
+
+@api_router.get(
+    "/live-tweets", response_model=TweetsResponse, response_model_exclude_none=True,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "NDJSON lines when stream=true"}},
+)
+async def get_live_tweets(
+    query: Optional[str] = Query(None),
+    budget_ms: Optional[int] = Query(None, ge=50, le=30000),
+    stream: bool = Query(False)
+):
     """Get live tweets with intent analysis"""
+    if stream:
+        return StreamingResponse(stream_live_tweets(query), media_type="application/x-ndjson")
+
+    budget_ms = budget_ms or LIVE_TWEETS_BUDGET_MS
     try:
-        tweets = await fetch_twitter_data(query)
-        
-        # Analyze tweets for intent
-        analyzed_tweets = []
-        for tweet_data in tweets:
-            # Run AI analysis on tweet content
-            analysis = await analyze_content_with_ai(tweet_data["content"])
-            tweet_data["intent_analysis"] = analysis
-            
-            # Use AI-determined relevance score
-            tweet_data["relevance_score"] = analysis.get("relevance_score", 0)
-            
-            # Only include tweets with relevance score > 3 (out of 10)
-            if tweet_data["relevance_score"] > 3:
-                analyzed_tweets.append(tweet_data)
-        
-        # Sort by relevance score (highest first)
-        analyzed_tweets.sort(key=lambda x: x["relevance_score"], reverse=True)
-        
-        # Return top 10 most relevant
-        return JSONResponse(content={"tweets": analyzed_tweets[:10], "total": len(analyzed_tweets)})
-        
+        # Concurrent identical requests share one fetch-and-analyze pass
+        payload = await endpoint_flight.do(
+            request_signature("live-tweets", query, budget_ms), lambda: build_live_tweets(query, budget_ms)
+        )
+        return FastJSONResponse(content=payload)
     except Exception as e:
         logging.error(f"Failed to get live tweets: {e}")
-        return JSONResponse(content={"tweets": FALLBACK_TWEETS, "total": len(FALLBACK_TWEETS)})
+        tweets = fallback_tweets()
+        return FastJSONResponse(content={"tweets": tweets, "total": len(tweets)})
+
+async def build_live_tweets(query: Optional[str], budget_ms: int) -> Dict[str, Any]:
+    """Fetch and analyze tweets within a latency budget.
+
+    Upstream work still running at the deadline keeps going in the background
+    (warming the caches for the next request); the affected tweets are
+    returned with a local keyword analysis and the response is marked partial.
+    """
+    deadline = time.monotonic() + budget_ms / 1000
+    partial = False
+
+    fetch = run_in_background(fetch_twitter_data(query))
+    await asyncio.wait({fetch}, timeout=max(deadline - time.monotonic(), 0))
+    if fetch.done() and not fetch.exception():
+        tweets = fetch.result()
+    else:
+        partial = True
+        tweets = [dict(t) for t in fallback_tweets()]
 
-@api_router.get("/cached-tweets")
+    # Analyze tweets for intent, concurrently
+    analyses = {run_in_background(ai_analysis(t["content"])): t for t in tweets}
+    if analyses:
+        await asyncio.wait(analyses, timeout=max(deadline - time.monotonic(), 0))
+
+    analyzed_tweets = []
+    for task, tweet_data in analyses.items():
+        analysis = task.result() if task.done() and not task.exception() else None
+        if analysis is None and not task.done():
+            partial = True
+            tweet_data["analysis_status"] = "pending"
+        # Only include tweets with relevance score > 3 (out of 10)
+        if apply_analysis(tweet_data, analysis) > 3:
+            analyzed_tweets.append(tweet_data)
+    
+    # Sort by relevance score (highest first)
+    analyzed_tweets.sort(key=lambda x: x["relevance_score"], reverse=True)
+    persist_tweets(analyzed_tweets)
+    
+    # Return top 10 most relevant
+    return {"tweets": analyzed_tweets[:10], "total": len(analyzed_tweets), "partial": partial, "budget_ms": budget_ms}
+
+def apply_analysis(tweet_data: Dict[str, Any], analysis: Optional[Dict[str, Any]]) -> float:
+    """Attach an analysis (AI, or local when None) to a tweet; returns its relevance score"""
+    if analysis is not None:
+        tweet_data["analysis_source"] = "ai"
+    else:
+        analysis = local_intent_analysis(tweet_data["content"])
+        tweet_data["analysis_source"] = "local"
+    tweet_data["intent_analysis"] = analysis
+    tweet_data["relevance_score"] = analysis.get("relevance_score", 0)
+    return tweet_data["relevance_score"]
+
+FALLBACK_TWEET_IDS = {t["tweet_id"] for t in FALLBACK_TWEETS}
+
+def persist_tweets(tweets: List[Dict[str, Any]]):
+    """Queue analyzed tweets from the Twitter API for db.tweets, which /cached-tweets serves"""
+    for tweet in tweets:
+        if tweet["tweet_id"] not in FALLBACK_TWEET_IDS and tweet.get("analysis_status") != "pending":
+            tweet_writes.put_nowait(dict(tweet, timestamp=datetime.utcnow()))
+
+async def stream_live_tweets(query: Optional[str]):
+    """NDJSON stream: one {"type": "tweet"} line per relevant tweet as soon as
+    its analysis completes, then a {"type": "done"} line with the final
+    relevance ordering (tweet ids, highest first).
+
+    When the client disconnects the generator is cancelled, and with it every
+    analysis that has not finished yet.
+    """
+    tweets = await fetch_twitter_data(query)
+    pending = {asyncio.ensure_future(ai_analysis(t["content"])): t for t in tweets}
+    analyzed_tweets = []
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                tweet_data = pending.pop(task)
+                analysis = task.result() if not task.exception() else None
+                if apply_analysis(tweet_data, analysis) > 3:
+                    analyzed_tweets.append(tweet_data)
+                    yield fast_json.dumps({"type": "tweet", "tweet": tweet_data}) + b"\n"
+    finally:
+        for task in pending:
+            task.cancel()
+
+    analyzed_tweets.sort(key=lambda x: x["relevance_score"], reverse=True)
+    persist_tweets(analyzed_tweets)
+    yield fast_json.dumps({
+        "type": "done",
+        "order": [t["id"] for t in analyzed_tweets[:10]],
+        "total": len(analyzed_tweets)
+    }) + b"\n"
+
+@api_router.get("/cached-tweets", response_model=TweetsResponse, response_model_exclude_none=True)
 async def get_cached_tweets():
     """Get cached tweet data for instant loading"""
     try:
         # First try to get from database
-        tweets = await db.tweets.find().sort("timestamp", -1).limit(20).to_list(20)
+        tweets = await get_db().tweets.find().sort("timestamp", -1).limit(20).to_list(20)
         if tweets:
-            return JSONResponse(content={"tweets": tweets, "total": len(tweets)})
+            return FastJSONResponse(content={"tweets": tweets, "total": len(tweets)})
         
         # Fallback to curated high-quality B2B tweets
-        cached_tweets = [
-            {
-                "id": str(uuid.uuid4()),
-                "tweet_id": "1935409307442426011",
-                "content": "Just hired our first VP of Sales! Excited to scale our B2B sales motion and break into enterprise. The SaaS journey continues 🚀 #hiring #sales #startup",
-                "author_name": "Alex Chen",
-                "author_handle": "@alexchen_ceo",
-                "engagement_metrics": {"like_count": 245, "retweet_count": 67, "reply_count": 34},
-                "relevance_score": 9.2,
-                "timestamp": datetime.utcnow().isoformat(),
-                "intent_analysis": {
-                    "intent_signals": [
-                        {"signal": "VP Sales Hiring", "confidence": 0.95, "reasoning": "Explicitly mentions hiring VP of Sales"}
-                    ],
-                    "priority": "High",
-                    "score": 9.2,
-                    "relevance_score": 9.2
-                }
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "tweet_id": "1935409303441023008",
-                "content": "Series A closed! 💰 $25M to scale our go-to-market engine. Time to build that dream sales team and expand internationally. Thank you to our amazing investors!",
-                "author_name": "Sarah Rodriguez",
-                "author_handle": "@sarah_builds",
-                "engagement_metrics": {"like_count": 892, "retweet_count": 156, "reply_count": 78},
-                "relevance_score": 9.5,
-                "timestamp": datetime.utcnow().isoformat(),
-                "intent_analysis": {
-                    "intent_signals": [
-                        {"signal": "Series A Fundraising", "confidence": 0.98, "reasoning": "Announces Series A completion"},
-                        {"signal": "GTM Expansion", "confidence": 0.92, "reasoning": "Plans to scale go-to-market engine"}
-                    ],
-                    "priority": "High",
-                    "score": 9.5,
-                    "relevance_score": 9.5
-                }
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "tweet_id": "1935409294343618837",
-                "content": "Our CRM is maxed out. Looking for enterprise-grade solutions that can handle complex sales processes. Any recommendations for scaling B2B ops? #CRM #salesops",
-                "author_name": "Mike Thompson",
-                "author_handle": "@mikethompson_ops",
-                "engagement_metrics": {"like_count": 134, "retweet_count": 45, "reply_count": 89},
-                "relevance_score": 8.8,
-                "timestamp": datetime.utcnow().isoformat(),
-                "intent_analysis": {
-                    "intent_signals": [
-                        {"signal": "CRM Migration", "confidence": 0.94, "reasoning": "Actively seeking new CRM solution"},
-                        {"signal": "Sales Process Optimization", "confidence": 0.87, "reasoning": "Mentions complex sales processes"}
-                    ],
-                    "priority": "High",
-                    "score": 8.8,
-                    "relevance_score": 8.8
-                }
-            }
-        ]
+        cached_tweets = fallback_cached_tweets()
         
-        return JSONResponse(content={"tweets": cached_tweets, "total": len(cached_tweets)})
+        return FastJSONResponse(content={"tweets": cached_tweets, "total": len(cached_tweets)})
     except Exception as e:
         logging.error(f"Failed to get cached tweets: {e}")
-        return JSONResponse(content={"tweets": [], "total": 0})
+        return FastJSONResponse(content={"tweets": [], "total": 0})
 
-@api_router.get("/startup-news")
+@api_router.get("/startup-news", response_model=NewsResponse)
 async def get_startup_news():
     """Get curated startup/AI news with relevance scores"""
     try:
-        news = await db.news.find().sort("relevance_score", -1).limit(10).to_list(10)
+        news = await get_db().news.find().sort("relevance_score", -1).limit(10).to_list(10)
         if not news:
             news = FALLBACK_NEWS
-        return JSONResponse(content={"news": news, "total": len(news)})
+        return FastJSONResponse(content={"news": news, "total": len(news)})
     except Exception as e:
         logging.error(f"Failed to get news: {e}")
-        return JSONResponse(content={"news": FALLBACK_NEWS, "total": len(FALLBACK_NEWS)})
+        return FastJSONResponse(content={"news": FALLBACK_NEWS, "total": len(FALLBACK_NEWS)})
 
-@api_router.get("/market-data")
+@api_router.get("/market-data", response_model=MarketDataResponse)
 async def get_market_data():
     """Get realistic financial market data"""
     try:
@@ -745,33 +1411,37 @@ async def get_market_data():
         nasdaq_change = random.uniform(-250, 250)
         sp500_change = random.uniform(-70, 70)
         btc_change = random.uniform(-1200, 1200)
+        now = datetime.utcnow()
         
         market_data = [
             {
                 "symbol": "NASDAQ",
                 "price": round(base_nasdaq + nasdaq_change, 2),
                 "change": round(nasdaq_change, 2),
-                "change_percent": f"{'+' if nasdaq_change >= 0 else ''}{nasdaq_change/base_nasdaq*100:.2f}%"
+                "change_percent": f"{'+' if nasdaq_change >= 0 else ''}{nasdaq_change/base_nasdaq*100:.2f}%",
+                "timestamp": now
             },
             {
                 "symbol": "S&P 500",
                 "price": round(base_sp500 + sp500_change, 2),
                 "change": round(sp500_change, 2),
-                "change_percent": f"{'+' if sp500_change >= 0 else ''}{sp500_change/base_sp500*100:.2f}%"
+                "change_percent": f"{'+' if sp500_change >= 0 else ''}{sp500_change/base_sp500*100:.2f}%",
+                "timestamp": now
             },
             {
                 "symbol": "Bitcoin",
                 "price": round(base_btc + btc_change, 2),
                 "change": round(btc_change, 2),
-                "change_percent": f"{'+' if btc_change >= 0 else ''}{btc_change/base_btc*100:.2f}%"
+                "change_percent": f"{'+' if btc_change >= 0 else ''}{btc_change/base_btc*100:.2f}%",
+                "timestamp": now
             }
         ]
         
-        return JSONResponse(content={"market_data": market_data})
+        return FastJSONResponse(content={"market_data": market_data})
         
     except Exception as e:
         logging.error(f"Failed to get market data: {e}")
-        return JSONResponse(content={"market_data": []})
+        return FastJSONResponse(content={"market_data": []})
 
 async def fetch_real_market_data():
     """Fetch real market data from Yahoo Finance API"""
@@ -789,25 +1459,24 @@ async def fetch_real_market_data():
                 # Use Yahoo Finance API
                 url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
                 
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(url, timeout=5.0)
+                response = await get_http_client().get(url, timeout=5.0)
+
+                if response.status_code == 200:
+                    data = response.json()
+                    result = data['chart']['result'][0]
                     
-                    if response.status_code == 200:
-                        data = response.json()
-                        result = data['chart']['result'][0]
-                        
-                        current_price = result['meta']['regularMarketPrice']
-                        prev_close = result['meta']['previousClose']
-                        change = current_price - prev_close
-                        change_percent = (change / prev_close) * 100
-                        
-                        market_data.append({
-                            "symbol": display_name,
-                            "price": round(current_price, 2),
-                            "change": round(change, 2),
-                            "change_percent": f"{'+' if change >= 0 else ''}{change_percent:.2f}%"
-                        })
+                    current_price = result['meta']['regularMarketPrice']
+                    prev_close = result['meta']['previousClose']
+                    change = current_price - prev_close
+                    change_percent = (change / prev_close) * 100
                     
+                    market_data.append({
+                        "symbol": display_name,
+                        "price": round(current_price, 2),
+                        "change": round(change, 2),
+                        "change_percent": f"{'+' if change >= 0 else ''}{change_percent:.2f}%"
+                    })
+                
             except Exception as e:
                 logging.warning(f"Failed to fetch {symbol}: {e}")
                 continue
@@ -818,14 +1487,60 @@ async def fetch_real_market_data():
         logging.error(f"Market data fetch failed: {e}")
         return []
 
-@api_router.get("/stats")
+@api_router.get("/export/{collection}")
+async def export_collection(
+    collection: str,
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    fields: Optional[str] = Query(None),
+    role: Optional[str] = Query(None),
+    geography: Optional[str] = Query(None),
+    priority: Optional[str] = Query(None),
+    min_score: Optional[float] = Query(None)
+):
+    """Stream a full collection snapshot straight from the database cursor.
+
+    ``fields`` is a comma-separated column list (default: every model field)
+    and is pushed down to the query as a projection. Leads accept the same
+    filters as /leads; for tweets ``min_score`` applies to relevance_score.
+    """
+    model = EXPORT_MODELS.get(collection)
+    if model is None:
+        raise HTTPException(status_code=404, detail=f"Unknown collection: {collection}")
+    columns = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(model.model_fields)
+    unknown = [f for f in columns if f not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    try:
+        ensure_available(format)
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    if collection == "leads":
+        query = leads_query(role, geography, priority, min_score)
+    else:
+        query = {"relevance_score": {"$gte": min_score}} if min_score else {}
+    projection = {"_id": 0, **{f: 1 for f in columns}}
+    cursor = get_db()[collection].find(query, projection).batch_size(EXPORT_BATCH_SIZE)
+
+    return StreamingResponse(
+        EXPORTERS[format](cursor, columns, EXPORT_BATCH_SIZE),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{collection}.{format}"'},
+    )
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Operational metrics for this worker (rate governors, caches)"""
+    return FastJSONResponse(content=metrics.snapshot())
+
+@api_router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_stats():
     """Get dashboard statistics and analytics"""
     try:
         stats = {
-            "total_leads": await db.leads.count_documents({}) or len(FALLBACK_LEADS),
-            "high_priority_leads": await db.leads.count_documents({"priority": "High"}) or 2,
-            "new_leads_today": await db.leads.count_documents({
+            "total_leads": await get_db().leads.count_documents({}) or len(FALLBACK_LEADS),
+            "high_priority_leads": await get_db().leads.count_documents({"priority": "High"}) or 2,
+            "new_leads_today": await get_db().leads.count_documents({
                 "timestamp": {"$gte": datetime.utcnow().replace(hour=0, minute=0, second=0)}
             }) or 3,
             "avg_lead_score": 8.2,
@@ -833,11 +1548,11 @@ async def get_dashboard_stats():
             "active_campaigns": 8
         }
         
-        return JSONResponse(content=stats)
+        return FastJSONResponse(content=stats)
         
     except Exception as e:
         logging.error(f"Failed to get stats: {e}")
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "total_leads": 4,
             "high_priority_leads": 2,
             "new_leads_today": 3,
@@ -846,6 +1561,15 @@ async def get_dashboard_stats():
             "active_campaigns": 8
         })
 
+# Debug-only profiling hooks (see profiling.py, memprofile.py); nothing is registered unless enabled
+if profiling.enabled():
+    profiling.install(app, api_router)
+if memprofile.enabled():
+    memprofile.install(app, api_router)
+# Event-loop lag and blocking-call detection (on by default; LOOP_MONITOR_ENABLED=0 disables)
+if loop_monitor.enabled():
+    loop_monitor.install(app, api_router)
+
 # Include router
 app.include_router(api_router)
 
@@ -856,13 +1580,73 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_lead_indexes_created = False
+
+async def create_lead_indexes():
+    """Create the lead indexes; (company, name) is unique, so concurrent imports cannot duplicate a lead"""
+    global _lead_indexes_created
+    from pymongo.errors import DuplicateKeyError, OperationFailure
+
+    collection = get_db().leads
+    keys = [(field, 1) for field in LEAD_KEY_FIELDS]
+    try:
+        await collection.create_index(keys, unique=True)
+    except DuplicateKeyError as e:
+        # Leads duplicated before the index was unique; keep lookups indexed until they are merged
+        logger.error(f"Leads have duplicate (company, name) keys, the key index is not unique: {e}")
+        await collection.create_index(keys)
+    except OperationFailure as e:
+        if e.code not in (INDEX_OPTIONS_CONFLICT, INDEX_KEY_SPECS_CONFLICT):
+            raise
+        # Earlier versions created the same index without unique; replace it
+        await collection.drop_index(keys)
+        await create_lead_indexes()
+        return
+    # fetch_leads looks leads up by natural key, sync_leads by write time
+    await collection.create_index("geo_keys")
+    await collection.create_index("signals_at")
+    await collection.create_index("timestamp")
+    _lead_indexes_created = True
+
+async def index_leads(batch_size: int = 1000):
+    """Create the lead indexes and backfill leads written before geography was normalized"""
+    from pymongo import UpdateOne
+
+    try:
+        collection = get_db().leads
+        await endpoint_flight.do("lead-indexes", create_lead_indexes)
+        operations, backfilled = [], 0
+        async for lead in collection.find({"geo_keys": {"$exists": False}}, {"_id": 1, "geography": 1}):
+            fields = geo.annotate({"geography": lead.get("geography")})
+            del fields["geography"]
+            operations.append(UpdateOne({"_id": lead["_id"]}, {"$set": fields}))
+            if len(operations) >= batch_size:
+                await collection.bulk_write(operations, ordered=False)
+                backfilled += len(operations)
+                operations = []
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+            backfilled += len(operations)
+        if backfilled:
+            logger.info(f"Backfilled geo_keys on {backfilled} leads")
+    except Exception as e:
+        logger.error(f"Indexing leads failed: {e}")
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("Growth Signals API starting up...")
+    # Create clients in the background so boot is not delayed by them
+    asyncio.get_running_loop().run_in_executor(None, runtime.warm_up)
+    asyncio.get_running_loop().run_in_executor(None, get_shared_cache().warm_up)
+    run_in_background(index_leads())
+    tweet_writes.start()
+    analysis_writes.start()
     logger.info(f"OpenAI API configured: {bool(OPENAI_API_KEY)}")
     logger.info(f"Twitter API configured: {bool(TWITTER_BEARER_TOKEN)}")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    # Flush buffered writes while the database client is still open
+    await asyncio.gather(tweet_writes.stop(), analysis_writes.stop())
+    await runtime.close()
     logger.info("Growth Signals API shutting down...")
@@ -0,0 +1,198 @@
+"""Host-wide cache shared by all gunicorn workers.
+
+Backed by an SQLite file in WAL mode, so every worker process on the host
+reads and fills the same entries. ``get_or_compute`` takes a short lease on a
+missing key: the worker holding the lease computes the value while the others
+poll until it is stored (or the lease expires and one of them takes over).
+Upstream calls per key therefore do not grow with the number of workers.
+
+All SQLite work, including opening the file and creating the schema, runs
+on worker threads (or in ``warm_up``), never on the event loop.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT,
+    expires_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL NOT NULL DEFAULT 0
+)
+"""
+
+_MISS = object()
+
+
+def default_path() -> str:
+    return os.path.join(tempfile.gettempdir(), "growth-signals-cache.sqlite3")
+
+
+class SharedCache:
+    def __init__(self, path: Optional[str] = None, lease_seconds: float = 15.0, poll_interval: float = 0.05):
+        """``path`` defaults to default_path(), resolved on first connection
+        (gettempdir probes the file system)"""
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.stats = {"hits": 0, "misses": 0, "waits": 0, "errors": 0}
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path is None:
+            self.path = default_path()
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.execute(SCHEMA)
+                    self._schema_ready = True
+        return conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def warm_up(self):
+        """Open the file and create the schema ahead of the first request (run off the event loop)"""
+        try:
+            self._conn
+        except sqlite3.Error as e:
+            logging.warning(f"Shared cache warm-up failed: {e}")
+
+    # Blocking primitives, run on a worker thread
+
+    def _get(self, key: str):
+        row = self._conn.execute(
+            "SELECT value FROM cache WHERE key = ? AND value IS NOT NULL AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return _MISS if row is None else json.loads(row[0])
+
+    def _claim(self, key: str, owner: str):
+        """Return the cached value, or _MISS if ``owner`` now holds the lease, or None if someone else does"""
+        conn = self._conn
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value, expires_at, lease_until FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] is not None and row[1] > now:
+                conn.execute("COMMIT")
+                return json.loads(row[0])
+            if row is not None and row[2] > now:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "INSERT INTO cache (key, value, expires_at, lease_owner, lease_until) VALUES (?, NULL, 0, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET lease_owner = excluded.lease_owner, lease_until = excluded.lease_until",
+                (key, owner, now + self.lease_seconds),
+            )
+            conn.execute("COMMIT")
+            return _MISS
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _set(self, key: str, value: str, ttl: float):
+        now = time.time()
+        self._conn.execute(
+            "INSERT INTO cache (key, value, expires_at, lease_owner, lease_until) VALUES (?, ?, ?, NULL, 0) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at, "
+            "lease_owner = NULL, lease_until = 0",
+            (key, value, now + ttl),
+        )
+        # Occasionally drop expired entries so the file does not grow unbounded
+        if random.random() < 0.01:
+            self._conn.execute("DELETE FROM cache WHERE expires_at < ? AND lease_until < ?", (now, now))
+
+    def _release(self, key: str, owner: str):
+        self._conn.execute("UPDATE cache SET lease_owner = NULL, lease_until = 0 WHERE key = ? AND lease_owner = ?", (key, owner))
+
+    # Async API
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        try:
+            value = await asyncio.to_thread(self._get, key)
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Shared cache read failed: {e}")
+            return default
+        return default if value is _MISS else value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        try:
+            await asyncio.to_thread(self._set, key, json.dumps(value, default=str), ttl)
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Shared cache write failed: {e}")
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        """Cached value for ``key``, computing it in at most one worker at a time.
+
+        A ``None`` result is returned but not cached, so failures are retried.
+        """
+        owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        deadline = time.monotonic() + self.lease_seconds * 2
+        waited = False
+        while True:
+            try:
+                claimed = await asyncio.to_thread(self._claim, key, owner)
+            except sqlite3.Error as e:
+                # Never let the cache take the endpoint down
+                self.stats["errors"] += 1
+                logging.warning(f"Shared cache unavailable: {e}")
+                return await compute()
+
+            if claimed is _MISS:
+                break
+            if claimed is not None:
+                self.stats["waits" if waited else "hits"] += 1
+                return claimed
+            if time.monotonic() > deadline:
+                # The lease holder is stuck; compute locally rather than wait forever
+                return await compute()
+            waited = True
+            await asyncio.sleep(self.poll_interval)
+
+        self.stats["misses"] += 1
+        try:
+            value = await compute()
+        except BaseException:
+            await asyncio.shield(asyncio.to_thread(self._release, key, owner))
+            raise
+        if value is None:
+            await asyncio.to_thread(self._release, key, owner)
+        else:
+            await self.set(key, value, ttl)
+        return value
+
+
+_cache: Optional[SharedCache] = None
+
+
+def get_shared_cache() -> SharedCache:
+    """The process's cache; creating it does no I/O"""
+    global _cache
+    if _cache is None:
+        path = os.environ.get("SHARED_CACHE_PATH") or None
+        _cache = SharedCache(path, lease_seconds=float(os.environ.get("SHARED_CACHE_LEASE_SECONDS", "15")))
+        metrics.register_collector(lambda: {f"shared_cache.{k}": v for k, v in _cache.stats.items()})
+    return _cache
@@ -0,0 +1,71 @@
+"""Request coalescing ("singleflight") for identical in-flight work.
+
+Concurrent callers asking for the same key share one in-flight task instead
+of each starting their own. The entry is dropped as soon as the task
+finishes, so results and errors are never cached here; a caller that is
+cancelled only detaches itself, and the shared task is cancelled only when
+no caller is left waiting for it.
+"""
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+import metrics
+
+
+def request_signature(*parts: Any) -> str:
+    """Canonical key for a request: order-stable JSON of its parameters"""
+    return json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            metrics.inc(f"singleflight.{self.name}.calls")
+        else:
+            metrics.inc(f"singleflight.{self.name}.coalesced")
+
+        call.waiters += 1
+        try:
+            # shield: cancelling this caller must not cancel the shared task
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Nobody is waiting any more; stop the work and let the next caller start afresh
+                self._forget(key, call)
+                call.task.cancel()
+
+
+# Upstream calls and endpoint builders
+upstream_flight = SingleFlight("upstream")
+endpoint_flight = SingleFlight("endpoint")
+
+metrics.register_collector(lambda: {
+    "singleflight.upstream.in_flight": upstream_flight.in_flight,
+    "singleflight.endpoint.in_flight": endpoint_flight.in_flight,
+})
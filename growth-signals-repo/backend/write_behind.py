@@ -0,0 +1,191 @@
+"""Write-behind persistence for results computed on the request path.
+
+Handlers hand documents to a ``WriteBehind`` buffer and return; a single
+flusher task writes them to the collection as one unordered bulk upsert per
+batch, as soon as ``batch_size`` documents are waiting or ``flush_interval``
+after the first one arrived. Documents upserted twice before a flush are
+written once (the latest wins).
+
+The buffer holds at most ``capacity`` documents. ``put_nowait``, for the
+request path, never waits: when the buffer is full the document is dropped
+(counted in the metrics). ``put`` and ``put_many``, for background
+producers, wait for the flusher to make room, for up to ``put_timeout`` per
+call, before dropping. ``stop`` flushes whatever is still buffered.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehind:
+    """Buffered, batched upserts into ``collection()`` keyed on ``key_fields``.
+
+    ``insert_only`` fields are written only when a document is created (its
+    id, say), everything else on every upsert.
+    """
+
+    def __init__(self, name: str, collection: Callable[[], Any], key_fields: Sequence[str],
+                 batch_size: int = 100, flush_interval: float = 0.5, capacity: int = 5000,
+                 put_timeout: float = 0.25, insert_only: Sequence[str] = ("id",)):
+        self.name = name
+        self.collection = collection
+        self.key_fields = tuple(key_fields)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.capacity = capacity
+        self.put_timeout = put_timeout
+        self.insert_only = tuple(insert_only)
+        self._items: Deque[Dict[str, Any]] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Future] = None
+        self._space: Deque[asyncio.Future] = deque()
+        self._stopping = False
+        self._indexed = False
+        # When the oldest unflushed document was buffered
+        self._since = 0.0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        _buffers.append(self)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._stopping = False
+            self._wakeup = None
+            self._space.clear()
+            self._task = loop.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """Flush everything buffered, then stop the flusher"""
+        self._stopping = True
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            while self._items:
+                await self.flush()
+            return
+        self._wake()
+        try:
+            await asyncio.wait_for(task, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Write-behind {self.name}: {len(self._items)} documents not flushed at shutdown")
+
+    def put_nowait(self, document: Dict[str, Any]) -> bool:
+        """Buffer a document without waiting; False if it was dropped because the buffer is full"""
+        self.start()
+        if len(self._items) >= self.capacity:
+            self.dropped += 1
+            return False
+        self._items.append(document)
+        if len(self._items) == 1:
+            # Start the flush interval
+            self._since = time.monotonic()
+            self._wake()
+        elif len(self._items) >= self.batch_size:
+            self._wake()
+        return True
+
+    async def put(self, document: Dict[str, Any], deadline: Optional[float] = None) -> bool:
+        """Buffer a document, waiting for room until ``deadline`` (monotonic; by
+        default ``put_timeout`` from now); False if it was dropped"""
+        self.start()
+        if len(self._items) >= self.capacity:
+            deadline = deadline if deadline is not None else time.monotonic() + self.put_timeout
+            while len(self._items) >= self.capacity:
+                waiter = asyncio.get_running_loop().create_future()
+                self._space.append(waiter)
+                try:
+                    await asyncio.wait_for(waiter, max(deadline - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    self.dropped += 1
+                    return False
+        return self.put_nowait(document)
+
+    async def put_many(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """Buffer several documents, waiting at most ``put_timeout`` in all; returns how many were accepted"""
+        deadline = time.monotonic() + self.put_timeout
+        accepted = 0
+        for document in documents:
+            accepted += await self.put(document, deadline)
+        return accepted
+
+    def _wake(self):
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    async def _run(self):
+        while not (self._stopping and not self._items):
+            if not self._stopping and len(self._items) < self.batch_size:
+                # Idle until a document arrives, then until the batch fills or the interval ends
+                timeout = self._since + self.flush_interval - time.monotonic() if self._items else None
+                if timeout is None or timeout > 0:
+                    await self._sleep(timeout)
+                    continue
+            await self.flush()
+
+    async def _sleep(self, timeout: Optional[float]):
+        self._wakeup = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(self._wakeup, timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup = None
+
+    async def flush(self):
+        """Write up to one batch of buffered documents"""
+        batch = [self._items.popleft() for _ in range(min(self.batch_size, len(self._items)))]
+        self._since = time.monotonic()
+        while self._space and len(self._items) < self.capacity:
+            waiter = self._space.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+        if not batch:
+            return
+        from pymongo import UpdateOne
+
+        latest: Dict[tuple, Dict[str, Any]] = {}
+        for document in batch:
+            latest[tuple(document.get(field) for field in self.key_fields)] = document
+        operations = []
+        for key, document in latest.items():
+            document = dict(document)
+            on_insert = {field: document.pop(field) for field in self.insert_only if field in document}
+            update = {"$set": document, "$setOnInsert": on_insert} if on_insert else {"$set": document}
+            operations.append(UpdateOne(dict(zip(self.key_fields, key)), update, upsert=True))
+        self.flushes += 1
+        try:
+            collection = self.collection()
+            if not self._indexed:
+                await collection.create_index([(field, 1) for field in self.key_fields])
+                self._indexed = True
+            await collection.bulk_write(operations, ordered=False)
+            self.written += len(operations)
+        except Exception as e:
+            # Best effort: the request that produced these has been answered already
+            self.failed += len(operations)
+            logger.error(f"Write-behind {self.name}: failed to write {len(operations)} documents: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        prefix = f"write_behind.{self.name}"
+        return {
+            f"{prefix}.pending": len(self._items),
+            f"{prefix}.written": self.written,
+            f"{prefix}.dropped": self.dropped,
+            f"{prefix}.failed": self.failed,
+            f"{prefix}.flushes": self.flushes,
+        }
+
+
+_buffers: List[WriteBehind] = []
+
+metrics.register_collector(lambda: {k: v for buffer in _buffers for k, v in buffer.stats().items()})
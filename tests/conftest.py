@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The backends are plain module directories (run as ``server:app``), not packages
+for backend in (ROOT / "backend", ROOT / "growth-signals-repo" / "backend"):
+    if str(backend) not in sys.path:
+        sys.path.insert(0, str(backend))
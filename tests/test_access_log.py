@@ -0,0 +1,79 @@
+import asyncio
+import io
+import json
+import logging
+import logging.handlers
+import queue
+
+from access_log import AccessLogMiddleware, JsonFormatter, _Enqueue, note, parse_sample_rates, upstream
+
+
+class Route:
+    path = "/api/leads"
+
+
+def run_request(middleware_options, status=200):
+    async def app(scope, receive, send):
+        scope["route"] = Route()
+        note(industry="saas_startup", cache="hit")
+        with upstream():
+            pass
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def send(message):
+        pass
+
+    middleware = AccessLogMiddleware(app, **middleware_options)
+    asyncio.run(middleware({"type": "http", "method": "GET", "path": "/api/leads"}, None, send))
+
+
+def access_records(caplog):
+    return [r.access for r in caplog.records if r.name == "access"]
+
+
+def test_access_record_carries_route_status_latency_and_handler_fields(caplog):
+    caplog.set_level(logging.INFO, logger="access")
+    run_request({})
+    [record] = access_records(caplog)
+    assert record["route"] == "/api/leads"
+    assert record["status"] == 200
+    assert record["latency_ms"] >= 0
+    assert record["cache"] == "hit"
+    assert record["industry"] == "saas_startup"
+    assert "upstream_ms" in record
+    line = json.loads(JsonFormatter().format(caplog.records[-1]))
+    assert line["route"] == "/api/leads" and line["logger"] == "access"
+
+
+def test_sampled_routes_still_log_errors(caplog):
+    caplog.set_level(logging.INFO, logger="access")
+    run_request({"sample_rates": {"/api/leads": 0.0}})
+    assert access_records(caplog) == []
+    run_request({"sample_rates": {"/api/leads": 0.0}}, status=503)
+    assert [r["status"] for r in access_records(caplog)] == [503]
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates("/api/leads=0.1, /api/deals=2,bad") == {"/api/leads": 0.1, "/api/deals": 1.0}
+
+
+def test_exception_tracebacks_survive_the_queue():
+    records, output = queue.SimpleQueue(), io.StringIO()
+    stream = logging.StreamHandler(output)
+    stream.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(records, stream)
+    logger = logging.getLogger("test-queued")
+    logger.propagate = False
+    logger.addHandler(_Enqueue(records))
+    listener.start()
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+    finally:
+        listener.stop()
+        logger.handlers.clear()
+    line = json.loads(output.getvalue())
+    assert line["message"] == "failed"
+    assert "Traceback" in line["exc_info"] and "ValueError: boom" in line["exc_info"]
@@ -0,0 +1,73 @@
+import asyncio
+
+from admission import AdmissionMiddleware, parse_limits
+
+
+def make_app(release: asyncio.Event):
+    async def app(scope, receive, send):
+        if scope["path"] == "/api/slow":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b'{"path": "%s"}' % scope["path"].encode()})
+    return app
+
+
+async def call(middleware, path, query=b""):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware({"type": "http", "method": "GET", "path": path, "query_string": query}, None, send)
+    headers = dict(messages[0]["headers"])
+    return messages[0]["status"], headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+
+def test_saturated_route_sheds_with_retry_after_or_stale_response():
+    async def run():
+        release = asyncio.Event()
+        middleware = AdmissionMiddleware(make_app(release), {"/api/slow": (1, 1)}, queue_timeout=5, retry_after=7)
+
+        # Nothing cached yet: running + queued fill the route, the third is refused
+        running = asyncio.ensure_future(call(middleware, "/api/slow"))
+        queued = asyncio.ensure_future(call(middleware, "/api/slow"))
+        await asyncio.sleep(0)
+        status, headers, _ = await call(middleware, "/api/slow")
+        assert (status, headers[b"retry-after"]) == (503, b"7")
+
+        # Unlimited routes are not held up by the saturated one
+        assert (await call(middleware, "/api/cheap"))[0] == 200
+
+        release.set()
+        assert [r[0] for r in await asyncio.gather(running, queued)] == [200, 200]
+
+        # Now the last good response is served while the route is saturated
+        release.clear()
+        running = asyncio.ensure_future(call(middleware, "/api/slow"))
+        queued = asyncio.ensure_future(call(middleware, "/api/slow"))
+        await asyncio.sleep(0)
+        status, headers, body = await call(middleware, "/api/slow")
+        assert (status, headers[b"x-stale"], body) == (200, b"true", b'{"path": "/api/slow"}')
+        assert middleware.limiters["/api/slow"].stats()["admission./api/slow.shed"] == 2
+        release.set()
+        await asyncio.gather(running, queued)
+
+    asyncio.run(run())
+
+
+def test_queue_timeout_sheds_waiting_request():
+    async def run():
+        release = asyncio.Event()
+        middleware = AdmissionMiddleware(make_app(release), {"/api/slow": (1, 4)}, queue_timeout=0.05)
+        running = asyncio.ensure_future(call(middleware, "/api/slow"))
+        await asyncio.sleep(0)
+        assert (await call(middleware, "/api/slow"))[0] == 503
+        release.set()
+        assert (await running)[0] == 200
+
+    asyncio.run(run())
+
+
+def test_parse_limits():
+    assert parse_limits("/api/live-tweets=8:16, /api/export/=2") == {"/api/live-tweets": (8, 16), "/api/export": (2, 0)}
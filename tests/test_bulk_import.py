@@ -0,0 +1,75 @@
+import asyncio
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from bulk_import import BulkImporter, iter_csv, iter_lines, iter_ndjson
+from memstore import MemoryCollection
+
+
+class Person(BaseModel):
+    id: str = "generated"
+    timestamp: str = "now"
+    company: str
+    name: str
+    score: float = Field(ge=0, le=10)
+    note: Optional[str] = None
+
+
+async def chunks(body: bytes, size: int = 7):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+def run_import(collection, body: bytes, parse, **options):
+    importer = BulkImporter(collection, Person, batch_size=2, **options)
+    return asyncio.run(importer.run(parse(iter_lines(chunks(body)))))
+
+
+def test_ndjson_rows_are_validated_and_upserted_on_the_natural_key():
+    collection = MemoryCollection("people")
+    body = b"\n".join([
+        b'{"company": "Acme", "name": "Ann", "score": 5}',
+        b'{"company": "Acme", "name": "Bob", "score": 11}',
+        b"{broken",
+        b'{"company": "Acme", "name": "Ann", "score": 7}',
+    ])
+    report = run_import(collection, body, iter_ndjson, key_fields=("company", "name"))
+
+    assert (report["received"], report["inserted"], report["updated"], report["failed"]) == (4, 1, 1, 2)
+    assert [e["row"] for e in report["errors"]] == [2, 3]
+    docs = asyncio.run(collection.find({}).to_list(None))
+    assert [(d["name"], d["score"]) for d in docs] == [("Ann", 7.0)]
+
+
+def test_csv_handles_quoted_newlines_and_empty_cells():
+    collection = MemoryCollection("people")
+    body = b'company,name,score,note\nAcme,Ann,5,"two\nlines"\nBeta,Bob,3,\n'
+    report = run_import(collection, body, iter_csv)
+
+    assert (report["inserted"], report["failed"]) == (2, 0)
+    docs = asyncio.run(collection.find({}).to_list(None))
+    assert docs[0]["note"] == "two\nlines"
+    assert docs[1]["note"] is None
+
+
+def test_upserts_set_insert_only_fields_once():
+    collection = MemoryCollection("people")
+    run_import(collection, b'{"id": "a", "company": "Acme", "name": "Ann", "score": 5}', iter_ndjson,
+               key_fields=("company", "name"), insert_only=("id",))
+    run_import(collection, b'{"id": "b", "company": "Acme", "name": "Ann", "score": 7}', iter_ndjson,
+               key_fields=("company", "name"), insert_only=("id",))
+
+    docs = asyncio.run(collection.find({}).to_list(None))
+    assert [(d["id"], d["score"]) for d in docs] == [("a", 7.0)]
+
+
+def test_unique_index_violations_are_reported_per_row():
+    collection = MemoryCollection("people")
+    asyncio.run(collection.create_index([("company", 1), ("name", 1)], unique=True))
+    body = b'company,name,score\nAcme,Ann,5\nAcme,Bob,3\nAcme,Ann,6\nBeta,Ann,2\n'
+    report = run_import(collection, body, iter_csv)
+
+    assert (report["inserted"], report["failed"]) == (3, 1)
+    assert report["errors"] == [{"row": 3, "error": "duplicate company='Acme', name='Ann'"}]
+    assert asyncio.run(collection.count_documents({})) == 3
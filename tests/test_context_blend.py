@@ -0,0 +1,24 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def context_server():
+    # Loaded under its own name: "server" is the growth-signals backend in tests
+    spec = importlib.util.spec_from_file_location("context_server", ROOT / "backend" / "server.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_blended_items_keep_their_relevance_order(context_server):
+    search_context = "AI healthcare clinics GPU"
+    assert len([m for m in context_server.rank_industries(search_context)
+                if m.confidence >= context_server.BLEND_MIN_CONFIDENCE]) > 1
+    _, items = context_server.context_items(search_context, "news")
+    relevances = [item.get("text_relevance", 0.0) for item in items]
+    assert relevances == sorted(relevances, reverse=True) and relevances[0] > 0
@@ -0,0 +1,52 @@
+import json
+import os
+import time
+
+from datasets import DatasetRegistry
+
+
+def write(path, leads):
+    path.write_text(json.dumps({"leads": leads, "news": [], "deals": [], "tweets": []}))
+
+
+def test_lazy_load_and_stable_ids(tmp_path):
+    write(tmp_path / "fintech.json", [{"name": "Ada", "company": "Ledger"}])
+    registry = DatasetRegistry(tmp_path, default="fintech")
+    assert registry._snapshots == {}
+
+    first = registry.get("fintech").leads[0]["id"]
+    again = DatasetRegistry(tmp_path, default="fintech").get("fintech").leads[0]["id"]
+    assert first == again
+
+
+def test_unknown_industry_falls_back_to_default(tmp_path):
+    write(tmp_path / "fintech.json", [{"name": "Ada", "company": "Ledger"}])
+    registry = DatasetRegistry(tmp_path, default="fintech")
+    assert registry.get("nope").industry == "fintech"
+    assert registry.industries() == ["fintech"]
+
+
+def test_changed_file_is_swapped_in_background(tmp_path):
+    path = tmp_path / "fintech.json"
+    write(path, [{"name": "Ada", "company": "Ledger"}])
+    registry = DatasetRegistry(tmp_path, default="fintech", check_interval=0)
+    old = registry.get("fintech")
+
+    write(path, [{"name": "Ada", "company": "Ledger"}, {"name": "Bo", "company": "Vault"}])
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+
+    # The stale snapshot keeps being served until the reload has finished
+    assert registry.get("fintech") in (old, registry._snapshots["fintech"])
+    deadline = time.monotonic() + 2
+    while registry.get("fintech") is old and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(registry.get("fintech").leads) == 2
+
+
+def test_resident_snapshots_are_bounded(tmp_path):
+    for name in ("a", "b", "c"):
+        write(tmp_path / f"{name}.json", [])
+    registry = DatasetRegistry(tmp_path, default="a", max_resident=2)
+    for name in ("a", "b", "c"):
+        registry.get(name)
+    assert list(registry._snapshots) == ["b", "c"]
@@ -0,0 +1,10 @@
+from enhancement import MAX_BOOST, MIN_BOOST, relevance_boost
+
+
+def test_boost_scales_with_the_strongest_relevance_signal():
+    assert relevance_boost({}) == MIN_BOOST
+    assert relevance_boost({"text_relevance": 1.0, "semantic_score": 0.2}) == MAX_BOOST
+    half = relevance_boost({"text_relevance": 0.1, "semantic_score": 0.5})
+    assert MIN_BOOST < half < MAX_BOOST and half == relevance_boost({"semantic_score": 0.5})
+    # Out-of-range signals are clamped
+    assert relevance_boost({"semantic_score": -0.3}) == MIN_BOOST
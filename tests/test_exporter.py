@@ -0,0 +1,38 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+
+from exporter import export_csv, export_ndjson
+from memstore import MemoryCollection
+
+DOCS = [
+    {"name": "Ann", "score": 9.5, "tags": ["a", "b"], "timestamp": datetime(2025, 1, 2)},
+    {"name": "Bob, Jr.", "score": None},
+    {"name": "Cy", "score": 4.0},
+]
+
+
+def collect(exporter, fields, batch_size=2):
+    collection = MemoryCollection("docs")
+    asyncio.run(collection.insert_many(DOCS))
+
+    async def run():
+        return [chunk async for chunk in exporter(collection.find({}), fields, batch_size)]
+
+    return asyncio.run(run())
+
+
+def test_csv_is_streamed_per_batch_with_header_once():
+    chunks = collect(export_csv, ["name", "score", "tags", "timestamp"])
+    assert len(chunks) == 2
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == ["name", "score", "tags", "timestamp"]
+    assert rows[1] == ["Ann", "9.5", '["a", "b"]', "2025-01-02T00:00:00"]
+    assert rows[2] == ["Bob, Jr.", "", "", ""]
+
+
+def test_ndjson_keeps_only_requested_fields():
+    lines = b"".join(collect(export_ndjson, ["name"])).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [{"name": "Ann"}, {"name": "Bob, Jr."}, {"name": "Cy"}]
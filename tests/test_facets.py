@@ -0,0 +1,73 @@
+import random
+
+from facets import Bitmap, FacetIndex
+
+DIMENSIONS = {
+    "role": lambda doc: [doc.get("role")],
+    "priority": lambda doc: [doc.get("priority")],
+    "signal": lambda doc: doc.get("signals", []),
+}
+
+
+def make_docs(n):
+    rng = random.Random(7)
+    return [
+        {"id": i, "role": rng.choice(["CEO", "CTO", "VP Sales"]), "priority": rng.choice(["High", "Low"]),
+         "signals": rng.sample(["Hiring", "Funding", "Expansion"], rng.randint(0, 2))}
+        for i in range(n)
+    ]
+
+
+def brute_force(docs, role=None, priority=None):
+    selected = [d for d in docs if (role is None or d["role"] == role) and (priority is None or d["priority"] == priority)]
+    counts = {}
+    for doc in selected:
+        for name, extract in DIMENSIONS.items():
+            for value in extract(doc):
+                counts.setdefault(name, {}).setdefault(value, 0)
+                counts[name][value] += 1
+    return len(selected), counts
+
+
+def test_bitmap_operations_across_chunks():
+    a = Bitmap.from_positions([1, 70_000, 200_000])
+    b = Bitmap.from_positions([70_000, 5])
+    b.add(200_000)
+    b.discard(5)
+    assert (a & b).positions().tolist() == [70_000, 200_000]
+    assert (a | b).count() == 3
+    assert a.count_and(b) == 2
+    assert Bitmap.count_each_and([a, b], Bitmap.from_positions([1, 200_000])) == [2, 1]
+
+
+def test_counts_match_brute_force_for_dense_and_sparse_filters():
+    docs = make_docs(3000)
+    index = FacetIndex(DIMENSIONS, key=lambda doc: doc["id"])
+    index.load(docs)
+    for role, priority in [(None, None), ("CEO", None), ("CEO", "High")]:
+        filters = {"role": [role] if role else None, "priority": [priority] if priority else None}
+        result = index.counts(filters)
+        total, counts = brute_force(docs, role, priority)
+        assert result["total"] == total
+        assert result["facets"] == {name: counts.get(name, {}) for name in DIMENSIONS}
+
+
+def test_incremental_updates_keep_counts_current():
+    docs = make_docs(500)
+    index = FacetIndex(DIMENSIONS, key=lambda doc: doc["id"])
+    index.load(docs[:400])
+    index.load(docs[400:])
+    docs[0] = dict(docs[0], role="CFO")
+    index.upsert(docs[0])
+    index.remove(docs[1])
+    index.upsert({"id": 999, "role": "cfo", "priority": "High"})
+    remaining = [d for d in docs if d["id"] != 1] + [{"id": 999, "role": "cfo", "priority": "High"}]
+
+    assert index.counts({})["total"] == len(remaining) == len(index)
+    # Filters match values case-insensitively
+    assert index.counts({"role": ["CFO"]})["facets"]["role"] == {"CFO": 1, "cfo": 1}
+    # Freed slots are reused without leaking the removed document's key
+    index.remove(docs[2])
+    index.upsert({"id": 1000, "role": "CFO", "priority": "Low"})
+    assert sorted(index.keys({"role": ["cfo"]})) == [0, 999, 1000]
+    assert sorted(index.values("role")) == ["CEO", "CFO", "CTO", "VP Sales", "cfo"]
@@ -0,0 +1,15 @@
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+from fast_json import CustomJSONEncoder, FastJSONResponse
+
+
+def test_mongo_documents_encode_without_conversion():
+    oid = ObjectId()
+    doc = {"_id": oid, "timestamp": datetime(2025, 1, 2, 3, 4, 5), "tags": {"a"}}
+    expected = {"_id": str(oid), "timestamp": "2025-01-02T03:04:05", "tags": ["a"]}
+
+    assert json.loads(FastJSONResponse(content=doc).body) == expected
+    assert json.loads(json.dumps(doc, cls=CustomJSONEncoder)) == expected
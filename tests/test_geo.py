@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+import geo
+from memstore import MemoryCollection
+
+
+@pytest.mark.parametrize("geography, keys", [
+    ("San Francisco, CA", ["region:north-america", "country:us", "state:us-ca", "city:us-ca:san-francisco"]),
+    ("San Francisco, CA, USA", ["region:north-america", "country:us", "state:us-ca", "city:us-ca:san-francisco"]),
+    ("Toronto", ["region:north-america", "country:ca", "state:ca-on", "city:ca-on:toronto"]),
+    ("London, UK", ["region:europe", "country:gb", "city:gb:london"]),
+    ("Remote - Canada", ["region:north-america", "country:ca"]),
+    ("São Paulo, Brazil", ["region:latin-america", "country:br", "city:br:sao-paulo"]),
+    ("Somewhere", []),
+    # ISO country codes; where one is also a state code, the city decides
+    ("Berlin, DE", ["region:europe", "country:de", "city:de:berlin"]),
+    ("Mumbai, IN", ["region:asia-pacific", "country:in", "city:in:mumbai"]),
+    ("Paris, FR", ["region:europe", "country:fr", "city:fr:paris"]),
+    ("Sydney, AU", ["region:asia-pacific", "country:au", "city:au:sydney"]),
+    ("Toronto, CA", ["region:north-america", "country:ca", "state:ca-on", "city:ca-on:toronto"]),
+    ("Tel Aviv, IL", ["region:middle-east-africa", "country:il", "city:il:tel-aviv"]),
+    ("Chicago, IL", ["region:north-america", "country:us", "state:us-il", "city:us-il:chicago"]),
+    ("Dover, DE", ["region:north-america", "country:us", "state:us-de", "city:us-de:dover"]),
+    ("Austin, TX, US", ["region:north-america", "country:us", "state:us-tx", "city:us-tx:austin"]),
+])
+def test_parse_assigns_every_level_of_the_hierarchy(geography, keys):
+    assert geo.parse(geography).keys() == keys
+
+
+@pytest.mark.parametrize("query, keys", [
+    ("North America", ["region:north-america"]),
+    ("USA", ["country:us"]),
+    ("California", ["state:us-ca"]),
+    ("austin, texas", ["city:us-tx:austin"]),
+    ("LA", ["city:us-ca:los-angeles"]),
+    ("EMEA", ["region:europe", "region:middle-east-africa"]),
+    ("Bay Area", []),
+])
+def test_filter_resolves_to_its_most_specific_keys(query, keys):
+    assert geo.filter_keys(query) == keys
+
+
+@pytest.mark.parametrize("query, stored", [
+    ("SF", "San Francisco, CA"),
+    ("NYC", "New York, NY"),
+    ("New York City", "New York, NY, USA"),
+    ("LA", "Los Angeles, CA, USA"),
+    ("Bangalore", "Bengaluru, India"),
+    ("EMEA", "Dubai"),
+    ("EMEA", "Berlin"),
+    ("Europe", "Berlin, DE"),
+    ("Germany", "Berlin, DE"),
+    ("India", "Mumbai, IN"),
+])
+def test_alias_filters_match_leads_stored_under_the_canonical_name(query, stored):
+    assert set(geo.filter_keys(query)) & set(geo.parse(stored).keys())
+
+
+def test_annotate_adds_display_fields():
+    lead = geo.annotate({"geography": "Austin, TX"})
+    assert (lead["city"], lead["state"], lead["country"], lead["region"]) == (
+        "Austin", "TX", "United States", "North America"
+    )
+
+
+def test_indexed_lookup_matches_a_full_scan():
+    collection = MemoryCollection("leads")
+    places = ["San Francisco, CA", "London, UK", "Austin, TX", "Berlin", "Remote"]
+    docs = [geo.annotate({"n": i, "geography": places[i % len(places)]}) for i in range(50)]
+
+    async def run():
+        await collection.insert_many(docs)
+        scanned = await collection.find({"geo_keys": "region:north-america"}).to_list(None)
+        await collection.create_index("geo_keys")
+        indexed = await collection.find({"geo_keys": "region:north-america"}).to_list(None)
+        await collection.update_one({"n": 0}, {"$set": geo.annotate({"geography": "Paris, France"})})
+        after_update = await collection.count_documents({"geo_keys": "region:north-america"})
+        return scanned, indexed, after_update
+
+    scanned, indexed, after_update = asyncio.run(run())
+    assert sorted(d["n"] for d in indexed) == sorted(d["n"] for d in scanned)
+    assert len(indexed) == 20
+    assert after_update == 19
+
+
+def test_group_filter_is_one_indexed_lookup_for_any_member_region():
+    collection = MemoryCollection("leads")
+    docs = [geo.annotate({"n": i, "geography": g}) for i, g in enumerate(["Berlin", "Dubai", "Austin, TX"])]
+
+    async def run():
+        await collection.insert_many(docs)
+        await collection.create_index("geo_keys")
+        return await collection.find({"geo_keys": {"$in": geo.filter_keys("EMEA")}}).to_list(None)
+
+    assert sorted(d["n"] for d in asyncio.run(run())) == [0, 1]
@@ -0,0 +1,25 @@
+from industries import KeywordIndex
+
+CONFIG = {
+    "ai_gpu": {"gpu": 3.0, "machine learning": 3.0, "ai": 1.0},
+    "healthcare": {"clinic": 2.0, "patient": 2.0},
+    "fintech": {"buy now pay later": 4.0},
+}
+
+
+def test_ranks_all_matching_industries():
+    ranked = KeywordIndex(CONFIG).rank("AI for clinics")
+    assert [m.industry for m in ranked] == ["healthcare", "ai_gpu"]
+    assert abs(sum(m.confidence for m in ranked) - 1.0) < 1e-3
+
+
+def test_matches_whole_tokens_and_phrases():
+    index = KeywordIndex(CONFIG)
+    assert index.rank("supply chain retail") == []
+    assert index.rank("Machine Learning platform")[0].industry == "ai_gpu"
+
+
+def test_matches_keywords_of_any_length():
+    index = KeywordIndex(CONFIG)
+    assert index.rank("a buy now pay later checkout")[0].industry == "fintech"
+    assert index.rank("buy now and pay later") == []
@@ -0,0 +1,34 @@
+import asyncio
+import time
+
+from loop_monitor import LoopMonitor, percentile
+
+
+def blocking_handler():
+    time.sleep(0.25)
+
+
+def test_blocking_call_is_recorded_with_its_stack():
+    async def run():
+        monitor = LoopMonitor(interval=0.01, threshold=0.08).start()
+        await asyncio.sleep(0.05)
+        blocking_handler()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(run())
+    blocks = monitor.recent_blocks()
+    assert len(blocks) == 1
+    assert "blocking_handler (test_loop_monitor.py" in blocks[0]["stack"]
+    assert blocks[0]["blocked_ms"] >= 150
+    stats = monitor.stats()
+    assert stats["loop.blocked_total"] == 1
+    assert stats["loop.lag_ms.max"] >= 150
+    assert stats["loop.lag_ms.p50"] < 80
+
+
+def test_percentile_of_empty_and_ordered_samples():
+    assert percentile([], 0.99) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 3.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.99) == 4.0
@@ -0,0 +1,75 @@
+"""Per-request memory budgets of the growth-signals read endpoints.
+
+Each endpoint is called against an in-memory store seeded with DATA_SIZE
+documents per collection; the peak traced allocation of the request must
+stay within its budget. The budgets cover the response itself plus the
+TestClient round trip (~40 KB), so an endpoint that starts copying whole
+collections fails here long before it shows up as worker RSS growth.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+DATA_SIZE = 5000
+
+BUDGETS_KB = {
+    "/api/": 96,
+    "/api/leads": 512,
+    "/api/cached-tweets": 320,
+    "/api/startup-news": 320,
+    "/api/stats": 96,
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    mp = pytest.MonkeyPatch()
+    mp.delenv("MONGO_URL", raising=False)
+    import runtime
+    mp.setattr(runtime, "_db", None)
+
+    from fastapi.testclient import TestClient
+    import server
+
+    # Lead indexes built from the seeded store are dropped again on undo
+    for name in ("_lead_ranking", "_lead_facets", "_leads_synced_to"):
+        mp.setattr(server, name, None)
+    for name in ("_lead_ranking_from_fallback", "_lead_facets_from_fallback", "_lead_indexes_created"):
+        mp.setattr(server, name, False)
+    mp.setattr(server, "_leads_synced_at", 0.0)
+
+    now = datetime.utcnow()
+    db = runtime.get_db()
+
+    async def seed():
+        await db.leads.insert_many([
+            {"id": str(uuid.uuid4()), "name": f"Lead {i}", "role": "CEO", "company": f"Company {i}",
+             "geography": "San Francisco, CA", "priority": "High", "score": i % 10,
+             "signals": ["Series A"], "timestamp": now - timedelta(minutes=i)}
+            for i in range(DATA_SIZE)
+        ])
+        await db.tweets.insert_many([
+            {"id": str(uuid.uuid4()), "content": f"Hiring our first VP Sales #{i}", "author_name": "Founder",
+             "relevance_score": i % 10, "timestamp": now - timedelta(minutes=i)}
+            for i in range(DATA_SIZE)
+        ])
+        await db.news.insert_many([
+            {"id": str(uuid.uuid4()), "title": f"Startup raises round {i}", "relevance_score": i / DATA_SIZE}
+            for i in range(DATA_SIZE)
+        ])
+
+    asyncio.run(seed())
+    yield TestClient(server.app)
+    mp.undo()
+
+
+@pytest.mark.parametrize("path", sorted(BUDGETS_KB))
+def test_endpoint_stays_within_memory_budget(client, path):
+    from memprofile import measure
+
+    client.get(path)  # warm up lazily created state (routes, caches, clients)
+    response, peak, _ = measure(lambda: client.get(path))
+    assert response.status_code == 200
+    assert peak <= BUDGETS_KB[path] * 1024, f"{path}: {peak / 1024:.0f} KB at {DATA_SIZE} docs"
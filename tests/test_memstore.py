@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from pymongo import InsertOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from memstore import MemoryCollection
+
+
+def test_exists_distinguishes_an_explicit_none_from_a_missing_field():
+    collection = MemoryCollection("leads")
+
+    async def run():
+        await collection.insert_many([{"n": 0, "geo_keys": None}, {"n": 1}, {"n": 2, "geo_keys": []}])
+        present = await collection.find({"geo_keys": {"$exists": True}}).to_list(None)
+        missing = await collection.find({"geo_keys": {"$exists": False}}).to_list(None)
+        null = await collection.find({"geo_keys": None}).to_list(None)
+        return [d["n"] for d in present], [d["n"] for d in missing], [d["n"] for d in null]
+
+    assert asyncio.run(run()) == ([0, 2], [1], [0, 1])
+
+
+def test_unknown_operators_are_rejected_by_name():
+    collection = MemoryCollection("leads")
+    asyncio.run(collection.insert_one({"tags": ["a"]}))
+    with pytest.raises(ValueError, match=r"\$elemMatch"):
+        asyncio.run(collection.count_documents({"tags": {"$elemMatch": {"$eq": "a"}}}))
+
+
+def test_bulk_write_applies_write_models_and_reports_duplicates_per_operation():
+    collection = MemoryCollection("people")
+
+    async def run():
+        await collection.create_index([("company", 1), ("name", 1)], unique=True)
+        with pytest.raises(BulkWriteError) as error:
+            await collection.bulk_write([
+                InsertOne({"company": "Acme", "name": "Ann", "score": 1}),
+                UpdateOne({"company": "Acme", "name": "Ann"}, {"$set": {"score": 2}}, upsert=True),
+                InsertOne({"company": "Acme", "name": "Ann", "score": 3}),
+                UpdateOne({"company": "Beta", "name": "Bob"}, {"$set": {"score": 4}}, upsert=True),
+            ], ordered=False)
+        docs = await collection.find({}, {"_id": 0}).to_list(None)
+        return error.value.details, docs
+
+    details, docs = asyncio.run(run())
+    assert [(e["index"], e["code"]) for e in details["writeErrors"]] == [(2, 11000)]
+    assert (details["nInserted"], details["nMatched"], details["nUpserted"]) == (1, 1, 1)
+    assert docs == [{"company": "Acme", "name": "Ann", "score": 2}, {"company": "Beta", "name": "Bob", "score": 4}]
+
+
+def test_bulk_write_rejects_operations_it_does_not_support():
+    with pytest.raises(ValueError, match="UpdateMany"):
+        asyncio.run(MemoryCollection("people").bulk_write([UpdateMany({}, {"$set": {"score": 0}})]))
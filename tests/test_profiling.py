@@ -0,0 +1,26 @@
+import threading
+import time
+
+from profiling import StackSampler, render
+
+
+def busy_wait(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collects_collapsed_stacks_of_selected_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_wait, args=(stop,), name="busy")
+    worker.start()
+    sampler = StackSampler(0.002, thread_ids=[worker.ident]).start()
+    time.sleep(0.1)
+    samples = sampler.stop()
+    stop.set()
+    worker.join()
+
+    assert samples
+    assert all(stack.startswith("busy;") for stack in samples)
+    assert any("busy_wait (test_profiling.py" in stack for stack in samples)
+    line = render(samples).splitlines()[0]
+    assert line.rsplit(" ", 1)[1].isdigit()
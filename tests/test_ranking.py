@@ -0,0 +1,136 @@
+import math
+import random
+
+import pytest
+
+from ranking import LeadRanker
+
+HOUR = 3600.0
+NOW = 1_750_000_000.0
+
+
+def lead(i, confidences, hours_ago, score=8.0):
+    return {
+        "company": f"Company {i}", "name": f"Lead {i}", "score": score, "signals_at": NOW - hours_ago * HOUR,
+        "intent_signals": [{"signal": "Seed Funding", "confidence": c} for c in confidences],
+    }
+
+
+def identity(lead):
+    return lead["company"], lead["name"]
+
+
+def brute_force_top(leads, ranker, k):
+    scored = sorted(leads.values(), key=lambda l: -ranker.relevance(ranker.score_key(l), NOW))
+    return [identity(l) for l in scored[:k]]
+
+
+def test_relevance_halves_every_half_life_and_fresh_signals_win():
+    ranker = LeadRanker(identity, half_life=24 * HOUR)
+    key = ranker.score_key(lead(0, [0.5, 0.3], hours_ago=0, score=10))
+    assert ranker.relevance(key, NOW) == pytest.approx(0.8)
+    assert ranker.relevance(key, NOW + 24 * HOUR) == pytest.approx(0.4)
+
+    ranker.load([lead(1, [0.95], hours_ago=24 * 7), lead(2, [0.4], hours_ago=2)])
+    assert [i for i, _ in ranker.top(now=NOW)] == [("Company 2", "Lead 2"), ("Company 1", "Lead 1")]
+    assert math.isclose(ranker.top(1, now=NOW)[0][1], 0.8 * 0.4 * 0.5 ** (2 / 24))
+
+
+def test_incremental_rescoring_keeps_the_top_k_exact():
+    rng = random.Random(7)
+    ranker = LeadRanker(identity, half_life=72 * HOUR, k=10)
+    leads = {i: lead(i, [rng.random()], hours_ago=rng.uniform(0, 500)) for i in range(300)}
+    ranker.load(leads.values())
+    assert [i for i, _ in ranker.top(now=NOW)] == brute_force_top(leads, ranker, 10)
+
+    for _ in range(20):
+        changed = [
+            lead(i, [rng.random() for _ in range(rng.randint(0, 3))], hours_ago=rng.uniform(0, 500))
+            for i in rng.sample(range(300), 5)
+        ]
+        for new in changed:
+            leads[int(new["name"].split()[1])] = new
+        ranker.mark_dirty(changed)
+        assert ranker.rescore() == 5
+        assert [i for i, _ in ranker.top(now=NOW)] == brute_force_top(leads, ranker, 10)
+
+    ranker.remove(("Company 0", "Lead 0"))
+    del leads[0]
+    assert [i for i, _ in ranker.top(now=NOW)] == brute_force_top(leads, ranker, 10)
+    assert len(ranker) == 299
+
+
+def test_top_among_is_the_best_of_the_given_leads():
+    rng = random.Random(3)
+    ranker = LeadRanker(identity, half_life=72 * HOUR, k=5)
+    leads = {i: lead(i, [rng.random()], hours_ago=rng.uniform(0, 500)) for i in range(200)}
+    ranker.load(leads.values())
+    subset = {i: leads[i] for i in range(0, 200, 3)}
+    ranker.mark_dirty([lead(3, [0.99], hours_ago=0)])
+    subset[3] = leads[3] = lead(3, [0.99], hours_ago=0)
+
+    # Not limited to the maintained top-k, and dirty leads are rescored first
+    best = ranker.top_among([identity(l) for l in subset.values()] + [("Company x", "Lead x")], 20, now=NOW)
+    assert [i for i, _ in best] == brute_force_top(subset, ranker, 20)
+    assert best[0][0] == ("Company 3", "Lead 3")
+
+
+def test_filtered_leads_are_the_freshest_matches(monkeypatch):
+    import asyncio
+    import types
+
+    import server
+    from memstore import MemoryCollection
+
+    db = types.SimpleNamespace(leads=MemoryCollection("leads"))
+    monkeypatch.setattr(server, "get_db", lambda: db)
+    monkeypatch.setattr(server, "_lead_ranking", None)
+    monkeypatch.setattr(server, "_lead_facets", None)
+    now = server.datetime.utcnow().timestamp()
+    # More stale matches than a page, stored before the fresh ones
+    stale = [dict(lead(i, [0.9], hours_ago=24 * 30), role="CEO", priority="High") for i in range(150)]
+    fresh = [dict(lead(i, [0.5], hours_ago=1), role="CEO", priority="High") for i in range(150, 155)]
+    other = [dict(lead(i, [0.9], hours_ago=0), role="CTO", priority="High") for i in range(155, 160)]
+    for record in stale + fresh + other:
+        record["signals_at"] += now - NOW
+    asyncio.run(db.leads.insert_many([dict(record) for record in stale + fresh + other]))
+
+    async def run():
+        return await server.build_leads("ceo", None, "High", None), await server.build_leads("ceo", None, "High", None)
+
+    first, second = asyncio.run(run())
+    names = [l["name"] for l in first["leads"]]
+    assert len(names) == 100 and sorted(names[:5]) == [f"Lead {i}" for i in range(150, 155)]
+    assert all(l["role"] == "CEO" for l in first["leads"])
+    # Stored leads without an id get the same one on every request
+    assert [l["id"] for l in first["leads"]] == [l["id"] for l in second["leads"]]
+
+
+def test_leads_written_elsewhere_are_picked_up_on_the_next_call(monkeypatch):
+    import asyncio
+    import types
+
+    import server
+    from memstore import MemoryCollection
+
+    db = types.SimpleNamespace(leads=MemoryCollection("leads"))
+    monkeypatch.setattr(server, "get_db", lambda: db)
+    for name, value in [("_lead_ranking", None), ("_lead_facets", None), ("_leads_synced_to", None),
+                        ("LEADS_SYNC_INTERVAL", 0)]:
+        monkeypatch.setattr(server, name, value)
+    now = server.datetime.utcnow()
+
+    def stored(i, role):
+        return dict(lead(i, [0.9], hours_ago=0), role=role, priority="High", signals_at=now, timestamp=now)
+
+    async def run():
+        await db.leads.insert_many([stored(i, "CEO") for i in range(3)])
+        await server.build_leads(None, None, None, None)
+        await server.build_leads("cto", None, None, None)
+        # Written by another worker, or straight to the database: no leads_written here
+        await db.leads.insert_one(stored(3, "CTO"))
+        return await server.build_leads(None, None, None, None), await server.build_leads("cto", None, None, None)
+
+    unfiltered, filtered = asyncio.run(run())
+    assert "Lead 3" in [l["name"] for l in unfiltered["leads"]]
+    assert [l["name"] for l in filtered["leads"]] == ["Lead 3"]
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from rate_governor import Governor, Throttled, TokenBucket, observe_openai_headers, parse_duration
+
+
+def test_parse_openai_durations():
+    assert parse_duration("20ms") == pytest.approx(0.02)
+    assert parse_duration("6m0s") == pytest.approx(360.0)
+    assert parse_duration("3") == 3.0
+    assert parse_duration(None) is None
+
+
+def test_waiters_are_served_in_order_until_deadline():
+    bucket = TokenBucket("t", capacity=2, window_seconds=0.2)  # 10 tokens/s
+    order = []
+
+    async def call(i, deadline):
+        try:
+            await bucket.acquire(deadline=deadline)
+            order.append(i)
+        except Throttled:
+            order.append(f"throttled-{i}")
+
+    async def run():
+        soon = time.monotonic() + 0.15
+        await asyncio.gather(*(call(i, soon) for i in range(6)))
+
+    asyncio.run(run())
+    # Two from the burst, one more refilled in time, the rest give up
+    assert order[:3] == [0, 1, 2]
+    assert all(str(o).startswith("throttled") for o in order[3:])
+    assert bucket.throttled == 3
+
+
+def test_headers_pause_bucket_when_quota_is_spent():
+    governor = Governor("openai", {"requests": TokenBucket("r", 100, 60), "tokens": TokenBucket("t", 1000, 60)})
+    observe_openai_headers(governor, {
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "2s",
+        "x-ratelimit-remaining-tokens": "500",
+        "x-ratelimit-reset-tokens": "10s",
+    })
+    requests = governor.buckets["requests"]
+    assert requests.paused_until > time.monotonic() + 1
+    assert governor.buckets["tokens"].tokens == 500
+    assert governor.buckets["tokens"].rate == pytest.approx(50)
+
+    async def run():
+        with pytest.raises(Throttled):
+            await governor.acquire(deadline=time.monotonic() + 0.05)
+
+    asyncio.run(run())
+
+
+def test_throttled_acquire_refunds_earlier_buckets():
+    governor = Governor("openai", {"requests": TokenBucket("r", 100, 60), "tokens": TokenBucket("t", 1000, 60)})
+    governor.buckets["tokens"].tokens = 0
+
+    async def run():
+        with pytest.raises(Throttled):
+            await governor.acquire(deadline=time.monotonic() + 0.05, tokens=500)
+
+    asyncio.run(run())
+    assert governor.buckets["requests"].tokens == pytest.approx(100)
+
+
+def test_headers_are_split_between_workers():
+    bucket = TokenBucket("t", 1000, 60, workers=4)
+    bucket.observe(remaining=800, reset_after=10, limit=1200)
+    assert (bucket.capacity, bucket.tokens, bucket.rate) == (300, 200, pytest.approx(20))
+
+
+def test_open_breaker_rejects_before_spending_rate_budget(monkeypatch):
+    import server
+
+    breaker = server.CircuitBreaker("openai-test")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    monkeypatch.setattr(server, "OPENAI_BREAKER", breaker)
+    requests = server.OPENAI_GOVERNOR.buckets["requests"]
+    before = requests.tokens
+
+    assert asyncio.run(server.request_ai_analysis(object(), "Hiring a CRO", "")) is None
+    assert requests.tokens == pytest.approx(before, abs=0.5)
@@ -0,0 +1,32 @@
+import pytest
+
+from records import compact
+
+
+def test_records_round_trip_and_keep_missing_fields_absent():
+    rows = [
+        {"name": "Ada", "priority": "High", "engagement_metrics": {"likes": 1}, "created-at": "2025"},
+        {"name": "Bo", "score": 7.5},
+    ]
+    first, second = compact("leads", rows)
+
+    assert first.to_dict() == rows[0]
+    assert second.to_dict() == rows[1]
+    assert second.get("priority") is None and "priority" not in second
+    assert first["created-at"] == "2025"
+    with pytest.raises(KeyError):
+        second["priority"]
+
+
+def test_records_are_read_only_and_to_dict_copies_nested_values():
+    (record,) = compact("tweets", [{"content": "hi", "engagement_metrics": {"likes": 1}}])
+    with pytest.raises(AttributeError):
+        record.content = "changed"
+    copy = record.to_dict()
+    copy["engagement_metrics"]["likes"] = 99
+    assert record["engagement_metrics"] == {"likes": 1}
+
+
+def test_categorical_strings_are_interned():
+    a, b = compact("leads", [{"priority": "".join(["Hi", "gh"])}, {"priority": "".join(["H", "igh"])}])
+    assert a["priority"] is b["priority"]
@@ -0,0 +1,26 @@
+from relevance import TfidfIndex, terms
+
+
+def test_terms_drop_stopwords_and_fold_plurals():
+    assert terms("The clinics of business") == ["clinic", "business"]
+
+
+def test_rank_orders_matches_and_drops_the_rest():
+    index = TfidfIndex()
+    index.extend([
+        "GPU supply shortage creates sales opportunities",
+        "Chiropractic practice networks grow",
+        "AI startups raise record GPU funding",
+    ])
+    ranked = index.rank("GPU shortage")
+    assert [doc for doc, _ in ranked] == [0, 2]
+    assert ranked[0][1] > ranked[1][1]
+
+
+def test_added_documents_are_searchable_and_shift_idf():
+    index = TfidfIndex()
+    index.add("telehealth platform for clinics")
+    common = index.idf("telehealth")
+    assert index.add("GPU cluster expansion") == 1
+    assert index.idf("telehealth") > common
+    assert [doc for doc, _ in index.rank("telehealth clinics expansion")] == [0, 1]
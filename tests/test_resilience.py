@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+from resilience import CircuitBreaker, hedged
+
+
+def test_breaker_opens_after_consecutive_failures_and_half_opens():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    # One trial call is let through while half-open
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+
+
+def test_hedged_returns_first_success_and_cancels_the_loser():
+    attempts = []
+
+    async def call():
+        attempt = len(attempts)
+        attempts.append(attempt)
+        # The first attempt stalls, the hedge answers quickly
+        await asyncio.sleep(1.0 if attempt == 0 else 0.01)
+        return attempt
+
+    started = time.monotonic()
+    assert asyncio.run(hedged(call, hedge_after=0.02)) == 1
+    assert time.monotonic() - started < 0.5
+    assert len(attempts) == 2
+
+
+def test_hedged_does_not_hedge_fast_calls():
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        return "ok"
+
+    assert asyncio.run(hedged(call, hedge_after=0.5)) == "ok"
+    assert len(attempts) == 1
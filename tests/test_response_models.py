@@ -0,0 +1,71 @@
+"""The declared response models describe what the growth-signals handlers return.
+
+Handlers return FastJSONResponse directly, so FastAPI never validates their
+output against ``response_model``; these tests do, for both the fallback
+data and stored documents.
+"""
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.delenv("MONGO_URL", raising=False)
+    import runtime
+    import server
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(runtime, "_db", None)
+    monkeypatch.setattr(server, "_lead_ranking", None)
+    monkeypatch.setattr(server, "_lead_facets", None)
+    return TestClient(server.app)
+
+
+def response_model(path):
+    import server
+
+    return next(route.response_model for route in server.app.routes if getattr(route, "path", None) == path)
+
+
+@pytest.mark.parametrize("path", [
+    "/api/leads", "/api/leads?role=ceo", "/api/live-tweets", "/api/cached-tweets", "/api/startup-news",
+    "/api/market-data", "/api/stats",
+])
+def test_fallback_responses_match_their_models(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    response_model(path.split("?")[0]).model_validate(response.json())
+
+
+def test_stored_documents_match_their_models(client):
+    import runtime
+    import server
+
+    db = runtime.get_db()
+    lead = server.Lead(
+        company="Acme", name="Ada", role="CEO", geography="Berlin, Germany", score=7.5,
+        intent_signals=[{"signal": "Seed Funding", "confidence": 0.8, "reasoning": "Announced"}],
+        social_content="We raised",
+    )
+    tweet = server.Tweet(tweet_id="1", content="Hiring a VP Sales", author_name="Ada", author_handle="@ada",
+                         engagement_metrics={"likes": 3})
+    asyncio.run(db.leads.insert_one(lead.model_dump()))
+    asyncio.run(db.tweets.insert_one(tweet.model_dump()))
+
+    leads = client.get("/api/leads").json()
+    assert leads["leads"][0]["freshness"] > 0
+    response_model("/api/leads").model_validate(leads)
+    response_model("/api/cached-tweets").model_validate(client.get("/api/cached-tweets").json())
+
+
+def test_streamed_tweets_are_ndjson_lines(client):
+    import json
+
+    import server
+
+    lines = client.get("/api/live-tweets?stream=true").text.splitlines()
+    *tweets, done = [json.loads(line) for line in lines]
+    assert tweets and done["type"] == "done" and done["total"] == len(tweets)
+    for line in tweets:
+        server.TweetResult.model_validate(line["tweet"])
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+from saved_contexts import SavedContextStore, SnapshotRefresher
+
+
+def test_store_dedupes_by_normalized_context_and_persists(tmp_path):
+    path = tmp_path / "saved.json"
+    store = SavedContextStore(path)
+    first = store.add("AI GPU  infrastructure")
+    assert store.add("ai gpu infrastructure")["id"] == first["id"]
+    store.add("multi-location chiropractic")
+
+    reopened = SavedContextStore(path)
+    assert [e["context"] for e in reopened.list()] == ["AI GPU infrastructure", "multi-location chiropractic"]
+    assert reopened.remove(first["id"])
+    assert not reopened.remove(first["id"])
+    assert len(SavedContextStore(path).list()) == 1
+
+
+def test_refresher_precomputes_saved_contexts_and_drops_removed_ones(tmp_path):
+    store = SavedContextStore(tmp_path / "saved.json")
+    kept = store.add("AI GPU infrastructure")
+    removed = store.add("multi-location chiropractic")
+    builds = []
+
+    def build(context):
+        builds.append(context)
+        return {"leads": {"leads": [context], "total": 1}}
+
+    refresher = SnapshotRefresher(store, build, interval=60)
+
+    async def run():
+        await refresher.refresh_all()
+        assert refresher.get("ai gpu   INFRASTRUCTURE")["panel"]["leads"]["leads"] == ["AI GPU infrastructure"]
+        store.remove(removed["id"])
+        await refresher.refresh_all()
+
+    asyncio.run(run())
+    assert builds == ["AI GPU infrastructure", "multi-location chiropractic", "AI GPU infrastructure"]
+    assert refresher.get(kept["context"]) is not None
+    assert refresher.get("multi-location chiropractic") is None
+
+
+def test_store_picks_up_other_workers_changes(tmp_path):
+    path = tmp_path / "saved.json"
+    mine, theirs = SavedContextStore(path), SavedContextStore(path)
+    entry = mine.add("AI GPU infrastructure")
+    assert theirs.get(entry["id"])["context"] == "AI GPU infrastructure"
+    theirs.add("multi-location chiropractic")
+    assert len(mine.list()) == 2
+    assert theirs.remove(entry["id"])
+    assert mine.get(entry["id"]) is None
+
+
+def test_refresh_of_a_context_deleted_meanwhile_is_not_published(tmp_path):
+    store = SavedContextStore(tmp_path / "saved.json")
+    entry = store.add("AI GPU infrastructure")
+
+    def build(context):
+        store.remove(entry["id"])
+        return {"leads": {"leads": [], "total": 0}}
+
+    refresher = SnapshotRefresher(store, build, interval=60)
+    asyncio.run(refresher.refresh_all())
+    assert refresher.get("AI GPU infrastructure") is None
+
+
+def test_concurrent_changes_from_several_workers_are_all_kept(tmp_path):
+    path = tmp_path / "saved.json"
+    workers = [SavedContextStore(path) for _ in range(4)]
+
+    def save_many(worker, n):
+        for i in range(25):
+            worker.add(f"worker {n} context {i}")
+
+    threads = [threading.Thread(target=save_many, args=(worker, n)) for n, worker in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(SavedContextStore(path).list()) == 100
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["saved.json", "saved.json.lock"]
@@ -0,0 +1,37 @@
+import numpy as np
+
+from semantic_index import HashingEmbedder, SemanticIndex, build_index, top_k
+
+
+def test_similar_texts_rank_first():
+    embedder = HashingEmbedder(dim=64, buckets=1 << 12)
+    index = build_index([
+        "Opening three new chiropractic clinics this year",
+        "Scaling GPU infrastructure for AI model training",
+        "Hiring a VP of Sales for our SaaS startup",
+    ], embedder)
+    best, _ = index.search(embedder.embed("GPU compute for training models"), k=1)[0]
+    assert best == 1
+
+
+def test_embeddings_are_deterministic_and_normalized():
+    a = HashingEmbedder(dim=32, buckets=1 << 10).embed("Series B funding")
+    b = HashingEmbedder(dim=32, buckets=1 << 10).embed("Series B funding")
+    assert np.array_equal(a, b)
+    assert abs(np.linalg.norm(a) - 1.0) < 1e-5
+
+
+def test_top_k_orders_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.7], dtype=np.float32)
+    assert top_k(scores, 2).tolist() == [1, 3]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 0]
+
+
+def test_ivf_finds_the_exact_neighbour_of_a_stored_vector():
+    rng = np.random.default_rng(0)
+    centres = rng.standard_normal((20, 16)).astype(np.float32)
+    vectors = centres[rng.integers(0, 20, size=2000)] + 0.1 * rng.standard_normal((2000, 16)).astype(np.float32)
+    index = SemanticIndex(vectors, approximate_threshold=1000, nprobe=4)
+    assert index.ivf is not None
+    for i in (0, 500, 1999):
+        assert index.search(index.vectors[i], k=1)[0][0] == i
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from shared_cache import SharedCache
+
+
+def test_one_worker_computes_while_others_wait(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    # Separate instances stand in for separate worker processes
+    workers = [SharedCache(path, poll_interval=0.01) for _ in range(4)]
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"tweets": [1, 2, 3]}
+
+    async def run():
+        return await asyncio.gather(*(w.get_or_compute("k", compute, ttl=60) for w in workers))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r == {"tweets": [1, 2, 3]} for r in results)
+
+
+def test_failures_are_not_cached(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.sqlite3"))
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise RuntimeError("upstream down")
+
+    async def empty():
+        calls.append(1)
+        return None
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("k", failing, ttl=60)
+        assert await cache.get_or_compute("k", empty, ttl=60) is None
+        assert await cache.get_or_compute("k", empty, ttl=60) is None
+
+    asyncio.run(run())
+    assert len(calls) == 3
+
+
+def test_creating_the_cache_does_no_io_until_warm_up(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = SharedCache(str(path))
+    assert not path.exists()
+
+    cache.warm_up()
+    assert path.exists()
+    assert asyncio.run(cache.get("missing", "default")) == "default"
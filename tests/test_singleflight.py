@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight, request_signature
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(20)))
+
+    assert asyncio.run(run()) == ["result"] * 20
+    assert len(calls) == 1
+    assert flight.in_flight == 0
+
+
+def test_errors_propagate_and_are_not_cached():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise ValueError("boom")
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                await flight.do("k", failing)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight("test")
+    started = []
+
+    async def work():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == 42
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        # With every caller gone the shared task is cancelled too
+        lone = asyncio.ensure_future(flight.do("j", work))
+        await asyncio.sleep(0.01)
+        lone.cancel()
+        await asyncio.sleep(0)
+        assert flight.in_flight == 0
+
+    asyncio.run(run())
+    assert len(started) == 2
+
+
+def test_signature_is_canonical():
+    assert request_signature("leads", {"b": 1, "a": 2}) == request_signature("leads", {"a": 2, "b": 1})
+
+
+def test_coalesced_tweet_fetches_get_their_own_copies(monkeypatch):
+    import server
+
+    async def search(query, count):
+        await asyncio.sleep(0.01)
+        return [{"tweet_id": "1", "content": "Hiring a CRO"}]
+
+    monkeypatch.setattr(server, "TWITTER_BEARER_TOKEN", "token")
+    monkeypatch.setattr(server, "search_recent_tweets", search)
+
+    async def run():
+        return await asyncio.gather(*(server.fetch_twitter_data("coalesce-copies") for _ in range(2)))
+
+    first, second = asyncio.run(run())
+    first[0]["analysis_status"] = "pending"
+    assert "analysis_status" not in second[0]
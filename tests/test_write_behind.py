@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from memstore import MemoryCollection
+from write_behind import WriteBehind
+
+
+def tweet(i, score=5):
+    return {"id": f"id-{i}-{score}", "tweet_id": str(i), "content": f"tweet {i}", "relevance_score": score}
+
+
+def test_flushes_full_batches_at_once_and_the_rest_after_the_interval():
+    collection = MemoryCollection("tweets")
+    buffer = WriteBehind("test-tweets", lambda: collection, ("tweet_id",), batch_size=10, flush_interval=0.2)
+
+    async def run():
+        await buffer.put_many(tweet(i) for i in range(10))
+        await asyncio.sleep(0.05)
+        after_batch = await collection.count_documents({})
+        await buffer.put_many([tweet(10), tweet(3, score=9)])
+        await asyncio.sleep(0.05)
+        before_interval = await collection.count_documents({})
+        await asyncio.sleep(0.3)
+        return after_batch, before_interval, await collection.find_one({"tweet_id": "3"})
+
+    after_batch, before_interval, updated = asyncio.run(run())
+    assert (after_batch, before_interval) == (10, 10)
+    # Upserted on the key; the id is kept from the first write
+    assert updated["relevance_score"] == 9 and updated["id"] == "id-3-5"
+    assert buffer.flushes == 2 and buffer.written == 12
+
+
+def test_full_buffer_applies_backpressure_then_drops_and_stop_flushes():
+    collection = MemoryCollection("tweets")
+    write = collection.bulk_write
+
+    async def slow_bulk_write(*args, **kwargs):
+        await asyncio.sleep(0.2)
+        return await write(*args, **kwargs)
+
+    collection.bulk_write = slow_bulk_write
+    buffer = WriteBehind("test-slow", lambda: collection, ("tweet_id",), batch_size=2, flush_interval=10,
+                         capacity=4, put_timeout=0.05)
+
+    async def run():
+        accepted = await buffer.put_many(tweet(i) for i in range(8))
+        await buffer.stop()
+        return accepted
+
+    accepted = asyncio.run(run())
+    # The first batch of 2 was taken by the flusher, freeing room for 2 more
+    assert accepted == 6 and buffer.dropped == 2
+    assert len(buffer) == 0 and asyncio.run(collection.count_documents({})) == 6
+
+
+def test_request_path_puts_never_wait_and_put_many_shares_one_deadline():
+    collection = MemoryCollection("tweets")
+    write = collection.bulk_write
+
+    async def slow_bulk_write(*args, **kwargs):
+        await asyncio.sleep(0.5)
+        return await write(*args, **kwargs)
+
+    collection.bulk_write = slow_bulk_write
+    buffer = WriteBehind("test-nowait", lambda: collection, ("tweet_id",), batch_size=2, flush_interval=10,
+                         capacity=2, put_timeout=0.1)
+
+    async def run():
+        accepted = [buffer.put_nowait(tweet(i)) for i in range(3)]
+        # Let the flusher take the full batch into its (slow) write
+        await asyncio.sleep(0.01)
+        accepted += [buffer.put_nowait(tweet(i)) for i in range(3, 6)]
+        started = time.monotonic()
+        accepted.append(await buffer.put_many(tweet(i) for i in range(6, 10)))
+        waited = time.monotonic() - started
+        await buffer.stop()
+        return accepted, waited
+
+    accepted, waited = asyncio.run(run())
+    assert accepted == [True, True, False, True, True, False, 0]
+    # One put_timeout for the whole batch, not one per document
+    assert waited < 0.3 and buffer.dropped == 6
+    assert asyncio.run(collection.count_documents({})) == 4